@@ -13,6 +13,7 @@ from models.db_models.node_db import Node
 from models.db_models.workflow_nodes import WorkflowNode
 from models.db_models.workflow_connections_db import WorkflowConnection
 from models.db_models.user_credentials_db import UserCredentialDB
+from models.db_models.outbox_event_db import OutboxEventDB
 from config import settings
 
 # this is the Alembic Config object, which provides
@@ -2,15 +2,18 @@
 from http.client import HTTPException
 from fastapi import APIRouter, Depends, HTTPException, Header # type: ignore
 from fastapi.responses import RedirectResponse # type: ignore
-from dependencies import get_user_repository, get_workflow_repository
+from dependencies import get_user_repository, get_workflow_repository, get_async_redis_client
+from core.auth_cache import is_token_revoked, revoke_token
 from repositories.sqlalchemy_user_repository import SqlAlchemyUserRepository
 from repositories.sqlalchemy_workflow_repository import SqlAlchemyWorkflowRepository
 from services.user_service import UserService
 from models.schemas.user import UserCreate, UserRead
 from datetime import datetime, timedelta
 from jose import jwt, JWTError # type: ignore
+from redis.asyncio import Redis as AsyncRedis # type: ignore
 from urllib.parse import urlencode
 import requests
+import uuid
 from config import settings
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -22,6 +25,16 @@ def get_user_service(
 ) -> UserService:
     return UserService(user_repo, workflow_repo)
 
+def create_access_token(db_user) -> str:
+    expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+    payload = {
+        "sub": db_user.email,
+        "user_id": db_user.id,
+        "exp": expire,
+        "jti": uuid.uuid4().hex  # lets /auth/logout revoke this token alone
+    }
+    return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+
 @router.post("/register", response_model=UserRead)
 def register(user: UserCreate, service: UserService = Depends(get_user_service)):
     return service.register_user(user.email, user.password)
@@ -32,22 +45,32 @@ def login(user: UserCreate, service: UserService = Depends(get_user_service)):
     if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+    token = create_access_token(db_user)
+    return {"access_token": token, "token_type": "bearer"}
 
-    payload = {
-        "sub": db_user.email,
-        "user_id": db_user.id, 
-        "exp": expire
-    }
+@router.post("/logout")
+async def logout(authorization: str = Header(...), redis_client: AsyncRedis = Depends(get_async_redis_client)):
+    """
+    Revokes the provided JWT access token until it expires.
+    """
+    if not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
 
-    token = jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
-    return {"access_token": token, "token_type": "bearer"}
+    token = authorization.split(" ")[1]
+
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    await revoke_token(redis_client, payload.get("jti"), payload.get("exp"))
+    return {"message": "Logged out"}
 
 @router.get("/validate-token")
-def validate_token(authorization: str = Header(...)):
+async def validate_token(authorization: str = Header(...), redis_client: AsyncRedis = Depends(get_async_redis_client)):
     """
     Validates the provided JWT access token.
-    Returns success if still valid, otherwise raises 401.
+    Returns success if still valid and not revoked, otherwise raises 401.
     """
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
@@ -61,6 +84,9 @@ def validate_token(authorization: str = Header(...)):
         if exp is None or datetime.utcnow().timestamp() > exp:
             raise HTTPException(status_code=401, detail="Token expired")
 
+        if await is_token_revoked(redis_client, payload.get("jti")):
+            raise HTTPException(status_code=401, detail="Token revoked")
+
         return {"valid": True, "email": payload.get("sub")}
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -144,13 +170,7 @@ def google_callback(code: str, service: UserService = Depends(get_user_service))
         db_user = service.register_user(email, random_password)
     
     # Generate JWT token
-    expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    payload = {
-        "sub": db_user.email,
-        "user_id": db_user.id,
-        "exp": expire
-    }
-    token = jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+    token = create_access_token(db_user)
     
     # Redirect to frontend workflow page with token
     frontend_url = settings.frontend_url.split(",")[0].strip()  # Use first URL if multiple
@@ -1,31 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import List
+from core.node_catalog import NodeCatalog
 from models.schemas.node import NodeCreate, NodeUpdate, NodeResponse
 from services.node_service import NodeService
 from repositories.sqlalchemy_node_repository import SqlAlchemyNodeRepository
-from dependencies import get_node_repository
+from dependencies import get_node_repository, get_node_catalog
 
 router = APIRouter(prefix="/nodes", tags=["Nodes"])
 
+# Definitions change only on deploys and node CRUD: let clients reuse them briefly, then revalidate
+NODES_CACHE_CONTROL = "public, max-age=60"
+
+
+def get_node_service(
+    repo: SqlAlchemyNodeRepository = Depends(get_node_repository),
+    catalog: NodeCatalog = Depends(get_node_catalog)
+) -> NodeService:
+    return NodeService(repo, catalog)
+
 
 @router.get("/", response_model=List[NodeResponse])
-def list_nodes(repo: SqlAlchemyNodeRepository = Depends(get_node_repository)):
-    service = NodeService(repo)
-    return service.list_nodes()
+def list_nodes(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    service: NodeService = Depends(get_node_service)
+):
+    """List node definitions from the catalog, with an ETag of its contents"""
+    headers = {"ETag": service.catalog.etag, "Cache-Control": NODES_CACHE_CONTROL}
+    if headers["ETag"] in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return service.list_nodes(skip=skip, limit=limit)
 
 
 @router.get("/{node_id}", response_model=NodeResponse)
-def get_node(node_id: int, repo: SqlAlchemyNodeRepository = Depends(get_node_repository)):
-    service = NodeService(repo)
+def get_node(node_id: int, response: Response, service: NodeService = Depends(get_node_service)):
     node = service.get_node(node_id)
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
+    response.headers.update({"ETag": service.catalog.etag, "Cache-Control": NODES_CACHE_CONTROL})
     return node
 
 
 @router.post("/", response_model=NodeResponse)
-def create_node(node_data: NodeCreate, repo: SqlAlchemyNodeRepository = Depends(get_node_repository)):
-    service = NodeService(repo)
+def create_node(node_data: NodeCreate, service: NodeService = Depends(get_node_service)):
     return service.create_node(node_data)
 
 
@@ -33,9 +53,8 @@ def create_node(node_data: NodeCreate, repo: SqlAlchemyNodeRepository = Depends(
 def update_node(
     node_id: int,
     node_data: NodeUpdate,
-    repo: SqlAlchemyNodeRepository = Depends(get_node_repository)
+    service: NodeService = Depends(get_node_service)
 ):
-    service = NodeService(repo)
     updated = service.update_node(node_id, node_data)
     if not updated:
         raise HTTPException(status_code=404, detail="Node not found")
@@ -43,8 +62,7 @@ def update_node(
 
 
 @router.delete("/{node_id}")
-def delete_node(node_id: int, repo: SqlAlchemyNodeRepository = Depends(get_node_repository)):
-    service = NodeService(repo)
+def delete_node(node_id: int, service: NodeService = Depends(get_node_service)):
     success = service.delete_node(node_id)
     if not success:
         raise HTTPException(status_code=404, detail="Node not found")
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from dependencies import get_redis_client, get_workflow_node_repository, get_db_session
+from dependencies import get_redis_client, get_async_redis_client, get_workflow_node_repository, get_async_workflow_node_repository, get_db_session
 from services.redis_service import RedisService
-from services.telegram_service import TelegramService
+from services.telegram_service import AsyncTelegramWebhookService, TelegramService
+from services.trigger_coalescer import AsyncTriggerCoalescer
 from repositories.sqlalchemy_workflow_node_repository import SqlAlchemyWorkflowNodeRepository
+from repositories.async_sqlalchemy_workflow_node_repository import AsyncSqlAlchemyWorkflowNodeRepository
 from auth_dependencies import get_current_user, verify_workflow_ownership
 from sqlalchemy.orm import Session # type: ignore
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 
 router = APIRouter(prefix="/telegram", tags=["Telegram"])
 
@@ -19,6 +22,14 @@ def get_telegram_service(
     return TelegramService(workflow_node_repo, redis_service)
 
 
+def get_telegram_webhook_service(
+    workflow_node_repo: AsyncSqlAlchemyWorkflowNodeRepository = Depends(get_async_workflow_node_repository),
+    redis_client: AsyncRedis = Depends(get_async_redis_client)
+) -> AsyncTelegramWebhookService:
+    """Dependency for the webhook, which runs without blocking the event loop"""
+    return AsyncTelegramWebhookService(workflow_node_repo, AsyncTriggerCoalescer(redis_client))
+
+
 @router.get("/webhook-info/{workflow_id}/{node_id}")
 def get_webhook_info(
     workflow_id: int,
@@ -48,7 +59,7 @@ async def telegram_webhook(
     workflow_id: int,
     node_id: int,
     request: Request,
-    service: TelegramService = Depends(get_telegram_service)
+    service: AsyncTelegramWebhookService = Depends(get_telegram_webhook_service)
 ):
     """
     Receives Telegram webhook messages and triggers the associated workflow.
@@ -58,7 +69,7 @@ async def telegram_webhook(
         # Parse the incoming update from Telegram
         update_data = await request.json()
         
-        return service.process_webhook(workflow_id, node_id, update_data)
+        return await service.process_webhook(workflow_id, node_id, update_data)
         
     except Exception as e:
         print(f"[TelegramWebhook] ❌ Error processing webhook: {e}")
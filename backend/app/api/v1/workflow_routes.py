@@ -1,23 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, Body # type: ignore
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Response # type: ignore
+from fastapi.responses import StreamingResponse # type: ignore
 from typing import Dict, List
 
-from models.db_models.workflow_db import WorkflowDB
 from models.schemas.full_workflow import WorkflowConnectionSchema, WorkflowFullSchema, WorkflowNodeFullSchema
 from models.schemas.workflow import Workflow, WorkflowPartialUpdate
 from services.redis_service import RedisService
 from services.workflow_service import WorkflowService
+from services.run_tracker import AsyncRunTracker, sse_message
 from repositories.sqlalchemy_workflow_repository import SqlAlchemyWorkflowRepository
 from repositories.sqlalchemy_workflow_node_repository import SqlAlchemyWorkflowNodeRepository
+from repositories.sqlalchemy_outbox_repository import SqlAlchemyOutboxRepository
+from repositories.async_sqlalchemy_workflow_repository import AsyncSqlAlchemyWorkflowRepository
+from repositories.async_sqlalchemy_workflow_node_repository import AsyncSqlAlchemyWorkflowNodeRepository
 from dependencies import (
     get_db_session,
+    get_async_db_session,
+    get_async_workflow_repository,
+    get_async_workflow_node_repository,
+    get_async_redis_client,
+    get_async_stream_redis_client,
     get_redis_client,
+    get_outbox_repository,
     get_workflow_repository,
     get_workflow_node_repository,
 )
-from auth_dependencies import get_current_user, verify_workflow_ownership
-from core.executor import WorkflowExecutor
+from auth_dependencies import get_current_user, verify_workflow_ownership, verify_workflow_ownership_async
+from config import settings
+from core.workflow_versions import AsyncWorkflowVersions, workflow_etag
+from core.trigger_lanes import RESERVED_CONTEXT_KEYS
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
 from sqlalchemy.orm import Session # type: ignore
 from redis import Redis # type: ignore
+from redis.asyncio import Redis as AsyncRedis # type: ignore
+from redis.exceptions import ConnectionError as RedisConnectionError # type: ignore
 
 router = APIRouter(prefix="/workflow", tags=["Workflow"])
 
@@ -26,10 +41,21 @@ router = APIRouter(prefix="/workflow", tags=["Workflow"])
 def get_workflow_service(
     workflow_repo: SqlAlchemyWorkflowRepository = Depends(get_workflow_repository),
     workflow_node_repo: SqlAlchemyWorkflowNodeRepository = Depends(get_workflow_node_repository),
-    redis_client: Redis = Depends(get_redis_client)
+    redis_client: Redis = Depends(get_redis_client),
+    outbox_repo: SqlAlchemyOutboxRepository = Depends(get_outbox_repository)
 ) -> WorkflowService:
     redis_service = RedisService(redis_client)
-    return WorkflowService(workflow_repo, workflow_node_repo, redis_service)
+    return WorkflowService(workflow_repo, workflow_node_repo, redis_service, outbox_repo)
+
+def get_run_tracker(redis_client: AsyncRedis = Depends(get_async_redis_client)) -> AsyncRunTracker:
+    return AsyncRunTracker(redis_client, settings.workflow_run_ttl_seconds)
+
+def get_run_event_tracker(redis_client: AsyncRedis = Depends(get_async_stream_redis_client)) -> AsyncRunTracker:
+    """Run tracker whose blocking reads use the stream pool, not the shared one"""
+    return AsyncRunTracker(redis_client, settings.workflow_run_ttl_seconds)
+
+def get_workflow_versions(redis_client: AsyncRedis = Depends(get_async_redis_client)) -> AsyncWorkflowVersions:
+    return AsyncWorkflowVersions(redis_client)
 
 @router.get("/", response_model=List[Workflow])
 def list_workflows(
@@ -114,18 +140,35 @@ def delete_workflow(
 
 
 @router.get("/{workflow_id}/full", response_model=WorkflowFullSchema)
-def get_full_workflow(
+async def get_full_workflow(
     workflow_id: int,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session),
+    workflow_repo: AsyncSqlAlchemyWorkflowRepository = Depends(get_async_workflow_repository),
+    versions: AsyncWorkflowVersions = Depends(get_workflow_versions)
 ):
-    """Get full workflow with nodes and connections (requires ownership)"""
-    # Verify ownership
-    verify_workflow_ownership(workflow_id, current_user, db)
-    
-    workflow = db.query(WorkflowDB).filter(WorkflowDB.id == workflow_id).first()
+    """
+    Get full workflow with nodes and connections (requires ownership).
+    Carries an ETag of the workflow's version: a request whose If-None-Match
+    still matches gets 304 without a database query.
+    """
+    version, owner_id = await versions.get(workflow_id)
+    etag = workflow_etag(workflow_id, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if owner_id == current_user["user_id"] and etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    # Ownership is part of the query; nodes, their definitions and connections are
+    # loaded up front: async sessions can't lazy-load
+    workflow = await workflow_repo.get_full(workflow_id, user_id=current_user["user_id"])
     if not workflow:
+        # Missing or someone else's: tell which
+        await verify_workflow_ownership_async(workflow_id, current_user, db)
         raise HTTPException(status_code=404, detail="Workflow not found")
+    await versions.set_owner(workflow_id, workflow.user_id)
+    response.headers.update(headers)
 
     nodes = [
         WorkflowNodeFullSchema.from_orm({
@@ -148,29 +191,88 @@ def get_full_workflow(
     )
 
 
-@router.post("/{workflow_id}/execute")
-def execute_workflow(
+@router.post("/{workflow_id}/execute", status_code=202)
+async def execute_workflow(
     workflow_id: int,
     context: Dict = Body(default={}),
     current_user: dict = Depends(get_current_user),
-    service: WorkflowService = Depends(get_workflow_service),
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session),
+    workflow_node_repo: AsyncSqlAlchemyWorkflowNodeRepository = Depends(get_async_workflow_node_repository),
+    run_tracker: AsyncRunTracker = Depends(get_run_tracker)
 ):
-    """Execute a workflow (requires ownership)"""
-    # Verify ownership
-    verify_workflow_ownership(workflow_id, current_user, db)
-    
-    workflow = service.get_workflow(workflow_id)
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
+    """
+    Execute a workflow (requires ownership).
+    The run is queued on the interactive lane so workers pick it up ahead of scheduled jobs;
+    follow it with the run status and events endpoints.
+    """
+    # Verify ownership (404 if the workflow doesn't exist)
+    await verify_workflow_ownership_async(workflow_id, current_user, db)
+
+    # Reserved keys (injected services) are the worker's to fill
+    context = {k: v for k, v in context.items() if k not in RESERVED_CONTEXT_KEYS}
 
-    executor = WorkflowExecutor(db)
-    try:
-        executor.execute_workflow(workflow_id, context=context)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Execution failed: {str(e)}")
+    # Manual runs honour the trigger node's concurrency settings (the first
+    # trigger that sets any, when the workflow has several)
+    trigger_config = {}
+    for trigger in await workflow_node_repo.list_by_workflow_and_type(workflow_id, "trigger"):
+        config = trigger.custom_config or {}
+        if config.get("max_concurrency") or config.get("serialize_by"):
+            trigger_config = config
+            break
 
-    return {"message": f"Workflow {workflow_id} executed successfully"}
+    run = await run_tracker.enqueue(workflow_id, current_user["user_id"], context, trigger_config=trigger_config)
+    return {"message": f"Workflow {workflow_id} queued for execution", **run}
+
+
+async def _get_owned_run(run_tracker: AsyncRunTracker, workflow_id: int, run_id: str, current_user: dict) -> dict:
+    run = await run_tracker.get(run_id)
+    # Someone else's run reads as missing, like an expired one
+    if not run or run["workflow_id"] != workflow_id or run["user_id"] != current_user["user_id"]:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+
+@router.get("/{workflow_id}/runs/{run_id}")
+async def get_workflow_run(
+    workflow_id: int,
+    run_id: str,
+    current_user: dict = Depends(get_current_user),
+    run_tracker: AsyncRunTracker = Depends(get_run_tracker)
+):
+    """Status of a queued run: queued, running, succeeded or failed, with node counts"""
+    return await _get_owned_run(run_tracker, workflow_id, run_id, current_user)
+
+
+@router.get("/{workflow_id}/runs/{run_id}/events")
+async def stream_workflow_run_events(
+    workflow_id: int,
+    run_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    run_tracker: AsyncRunTracker = Depends(get_run_tracker),
+    event_tracker: AsyncRunTracker = Depends(get_run_event_tracker)
+):
+    """
+    Server-sent events of a run: run_started, one node_finished per node and
+    run_finished, after which the stream ends. Events already recorded are
+    replayed first, so it can be opened at any point of the run; a client
+    reconnecting with Last-Event-ID resumes after that event.
+    """
+    await _get_owned_run(run_tracker, workflow_id, run_id, current_user)
+
+    async def event_source():
+        try:
+            async for event in event_tracker.events(run_id, after_id=request.headers.get("last-event-id")):
+                yield sse_message(event)
+        except RedisConnectionError:
+            # Stream pool exhausted or Redis gone: have the client reconnect later
+            yield "retry: 5000\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/user/{user_id}", response_model=List[Workflow])
@@ -1,31 +1,53 @@
 # dependencies.py (or a new file, e.g., auth_dependencies.py)
-from fastapi import Depends, HTTPException
+import hmac
+from fastapi import Depends, Header, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from datetime import datetime
-from dependencies import get_db_session
+from dependencies import get_async_db_session, get_async_redis_client
 from config import settings
-from repositories.sqlalchemy_user_repository import SqlAlchemyUserRepository
-from repositories.sqlalchemy_workflow_repository import SqlAlchemyWorkflowRepository
+from core.auth_cache import is_token_revoked, owner_cache, user_cache
+from repositories.async_sqlalchemy_user_repository import AsyncSqlAlchemyUserRepository
 from models.db_models.user_credentials_db import UserCredentialDB
 from models.db_models.workflow_nodes import WorkflowNode
 from models.db_models.workflow_db import WorkflowDB
 from models.db_models.workflow_connections_db import WorkflowConnection
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from redis.asyncio import Redis as AsyncRedis
 
 SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")  # login endpoint
 
-def get_current_user(
+
+def require_metrics_token(authorization: str = Header(default="")):
+    """
+    Guard for internal endpoints (metrics scrapers, not users): they need the
+    METRICS_TOKEN bearer token, and don't exist while it isn't configured.
+    """
+    if not settings.metrics_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.metrics_token.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session),
+    redis_client: AsyncRedis = Depends(get_async_redis_client)
 ):
     """
     Dependency to get the current user from JWT token.
-    Verifies token validity, checks expiration, and verifies user exists in database.
-    Raises 401 if token is invalid, expired, or user doesn't exist.
+    Verifies token validity, checks expiration and revocation, and verifies user exists in database.
+    Users found recently are cached, so the common case runs no query.
+    Raises 401 if token is invalid, expired, revoked, or user doesn't exist.
     Returns user info with user_id and email.
     """
     try:
@@ -43,16 +65,23 @@ def get_current_user(
         if email is None or user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token payload")
         
-        # Verify user exists in database
-        user_repo = SqlAlchemyUserRepository(db)
-        db_user = user_repo.get_by_email(email)
-        
-        if not db_user:
-            raise HTTPException(status_code=401, detail="User not found")
+        # Check the token wasn't logged out
+        if await is_token_revoked(redis_client, payload.get("jti")):
+            raise HTTPException(status_code=401, detail="Token revoked")
         
-        # Verify user_id matches
-        if db_user.id != user_id:
-            raise HTTPException(status_code=401, detail="Token user mismatch")
+        # Verify user exists in database, unless it was seen recently
+        if user_cache.get(user_id) != email:
+            user_repo = AsyncSqlAlchemyUserRepository(db)
+            db_user = await user_repo.get_by_email(email)
+            
+            if not db_user:
+                raise HTTPException(status_code=401, detail="User not found")
+            
+            # Verify user_id matches
+            if db_user.id != user_id:
+                raise HTTPException(status_code=401, detail="Token user mismatch")
+            
+            user_cache.set(user_id, email)
         
         return {
             "user_id": user_id,
@@ -68,6 +97,10 @@ def get_current_user(
 
 
 # Authorization helper functions
+#
+# Owners are cached per resource (see core.auth_cache): with a warm cache the
+# checks run no query. They only check; routes load what they need themselves.
+
 def verify_workflow_ownership(
     workflow_id: int,
     current_user: dict,
@@ -78,17 +111,36 @@ def verify_workflow_ownership(
     Raises 403 Forbidden if user doesn't own the workflow.
     Raises 404 Not Found if workflow doesn't exist.
     """
+    owner_id = owner_cache.get(("workflow", workflow_id))
+    if owner_id is None:
+        owner_id = db.query(WorkflowDB.user_id).filter(WorkflowDB.id == workflow_id).scalar()
+        
+        if owner_id is None:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+        
+        owner_cache.set(("workflow", workflow_id), owner_id)
     
-    workflow_repo = SqlAlchemyWorkflowRepository(db)
-    workflow = workflow_repo.get_by_id(workflow_id)
-    
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    
-    if workflow.user_id != current_user["user_id"]:
+    if owner_id != current_user["user_id"]:
         raise HTTPException(status_code=403, detail="Forbidden: You don't have access to this workflow")
+
+
+async def verify_workflow_ownership_async(
+    workflow_id: int,
+    current_user: dict,
+    db: AsyncSession
+):
+    """verify_workflow_ownership for async routes"""
+    owner_id = owner_cache.get(("workflow", workflow_id))
+    if owner_id is None:
+        owner_id = await db.scalar(select(WorkflowDB.user_id).where(WorkflowDB.id == workflow_id))
+        
+        if owner_id is None:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+        
+        owner_cache.set(("workflow", workflow_id), owner_id)
     
-    return workflow
+    if owner_id != current_user["user_id"]:
+        raise HTTPException(status_code=403, detail="Forbidden: You don't have access to this workflow")
 
 
 def verify_credential_ownership(
@@ -101,16 +153,28 @@ def verify_credential_ownership(
     Raises 403 Forbidden if user doesn't own the credential.
     Raises 404 Not Found if credential doesn't exist.
     """
+    owner_id = owner_cache.get(("credential", credential_id))
+    if owner_id is None:
+        owner_id = db.query(UserCredentialDB.user_id).filter(UserCredentialDB.id == credential_id).scalar()
+        
+        if owner_id is None:
+            raise HTTPException(status_code=404, detail="Credential not found")
+        
+        owner_cache.set(("credential", credential_id), owner_id)
     
-    credential = db.query(UserCredentialDB).filter(UserCredentialDB.id == credential_id).first()
-    
-    if not credential:
-        raise HTTPException(status_code=404, detail="Credential not found")
-    
-    if credential.user_id != current_user["user_id"]:
+    if owner_id != current_user["user_id"]:
         raise HTTPException(status_code=403, detail="Forbidden: You don't have access to this credential")
+
+
+def _workflow_owner_of(row, not_found: str):
+    """(child id, owner id) row of an outer join onto workflows, or None"""
+    if not row:
+        raise HTTPException(status_code=404, detail=not_found)
     
-    return credential
+    _, owner_id = row
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return owner_id
 
 
 def verify_workflow_node_ownership(
@@ -123,21 +187,39 @@ def verify_workflow_node_ownership(
     Raises 403 Forbidden if user doesn't own the workflow.
     Raises 404 Not Found if workflow node doesn't exist.
     """
-    
-    workflow_node = db.query(WorkflowNode).filter(WorkflowNode.id == workflow_node_id).first()
-    
-    if not workflow_node:
-        raise HTTPException(status_code=404, detail="Workflow node not found")
-    
-    workflow = db.query(WorkflowDB).filter(WorkflowDB.id == workflow_node.workflow_id).first()
-    
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    
-    if workflow.user_id != current_user["user_id"]:
+    owner_id = owner_cache.get(("workflow_node", workflow_node_id))
+    if owner_id is None:
+        row = (
+            db.query(WorkflowNode.id, WorkflowDB.user_id)
+            .outerjoin(WorkflowDB, WorkflowDB.id == WorkflowNode.workflow_id)
+            .filter(WorkflowNode.id == workflow_node_id)
+            .first()
+        )
+        owner_id = _workflow_owner_of(row, "Workflow node not found")
+        owner_cache.set(("workflow_node", workflow_node_id), owner_id)
+    
+    if owner_id != current_user["user_id"]:
+        raise HTTPException(status_code=403, detail="Forbidden: You don't have access to this workflow node")
+
+
+async def verify_workflow_node_ownership_async(
+    workflow_node_id: int,
+    current_user: dict,
+    db: AsyncSession
+):
+    """verify_workflow_node_ownership for async routes, with the node and its workflow in one query"""
+    owner_id = owner_cache.get(("workflow_node", workflow_node_id))
+    if owner_id is None:
+        result = await db.execute(
+            select(WorkflowNode.id, WorkflowDB.user_id)
+            .join(WorkflowDB, WorkflowDB.id == WorkflowNode.workflow_id, isouter=True)
+            .where(WorkflowNode.id == workflow_node_id)
+        )
+        owner_id = _workflow_owner_of(result.first(), "Workflow node not found")
+        owner_cache.set(("workflow_node", workflow_node_id), owner_id)
+    
+    if owner_id != current_user["user_id"]:
         raise HTTPException(status_code=403, detail="Forbidden: You don't have access to this workflow node")
-    
-    return workflow_node
 
 
 def verify_workflow_connection_ownership(
@@ -150,18 +232,16 @@ def verify_workflow_connection_ownership(
     Raises 403 Forbidden if user doesn't own the workflow.
     Raises 404 Not Found if connection doesn't exist.
     """
-    
-    connection = db.query(WorkflowConnection).filter(WorkflowConnection.id == connection_id).first()
-    
-    if not connection:
-        raise HTTPException(status_code=404, detail="Workflow connection not found")
-    
-    workflow = db.query(WorkflowDB).filter(WorkflowDB.id == connection.workflow_id).first()
-    
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    
-    if workflow.user_id != current_user["user_id"]:
+    owner_id = owner_cache.get(("connection", connection_id))
+    if owner_id is None:
+        row = (
+            db.query(WorkflowConnection.id, WorkflowDB.user_id)
+            .outerjoin(WorkflowDB, WorkflowDB.id == WorkflowConnection.workflow_id)
+            .filter(WorkflowConnection.id == connection_id)
+            .first()
+        )
+        owner_id = _workflow_owner_of(row, "Workflow connection not found")
+        owner_cache.set(("connection", connection_id), owner_id)
+    
+    if owner_id != current_user["user_id"]:
         raise HTTPException(status_code=403, detail="Forbidden: You don't have access to this workflow connection")
-    
-    return connection
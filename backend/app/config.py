@@ -5,7 +5,7 @@ This module provides centralized configuration management with validation
 for all environment variables used throughout the application.
 """
 import base64
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -32,6 +32,36 @@ class Settings(BaseSettings):
         description="Redis connection URL"
     )
     
+    redis_max_connections: int = Field(
+        default=50,
+        ge=1,
+        description="Connections per Redis pool; one sync and one async pool per process"
+    )
+    
+    redis_stream_max_connections: int = Field(
+        default=100,
+        ge=1,
+        description="Connections of the separate async pool serving run event streams; one per open stream"
+    )
+    
+    redis_pool_timeout_seconds: float = Field(
+        default=5,
+        ge=0,
+        description="Seconds a caller waits for a free pooled Redis connection before failing"
+    )
+    
+    redis_health_check_interval_seconds: int = Field(
+        default=30,
+        ge=0,
+        description="Pooled Redis connections idle for longer are pinged before reuse (0 = never)"
+    )
+    
+    redis_socket_connect_timeout_seconds: float = Field(
+        default=5,
+        gt=0,
+        description="Seconds allowed for opening a Redis connection"
+    )
+    
     # JWT Authentication
     secret_key: str = Field(
         ...,
@@ -111,6 +141,144 @@ class Settings(BaseSettings):
         description="Enable SQLAlchemy query logging (useful for debugging)"
     )
     
+    # Trigger Worker Configuration
+    trigger_concurrency_lease_seconds: int = Field(
+        default=600,
+        ge=1,
+        description="Seconds a workflow concurrency slot is held before it is considered abandoned"
+    )
+    
+    trigger_lane_weights: dict[str, int] = Field(
+        default={"interactive": 6, "webhook": 3, "scheduled": 1},
+        description="Entries read per round from each trigger priority lane (JSON object)"
+    )
+    
+    trigger_batch_size: int = Field(
+        default=4,
+        ge=1,
+        description="Multiplier on lane reads; pending triggers of the same workflow in one read run as a micro-batch"
+    )
+    
+    trigger_drain_grace_seconds: int = Field(
+        default=30,
+        ge=0,
+        description="Seconds a stopping worker waits for in-flight runs before handing them to a peer"
+    )
+    
+    trigger_codec: Literal["msgpack", "json"] = Field(
+        default="msgpack",
+        description="Encoding of trigger contexts and workflow events in Redis; entries written in either format always decode"
+    )
+    
+    trigger_codec_compress_min_bytes: int = Field(
+        default=1024,
+        ge=0,
+        description="Encoded values at least this large are zstd-compressed when zstandard is installed (0 = never)"
+    )
+    
+    # Event Outbox Configuration
+    outbox_relay_batch_size: int = Field(
+        default=100,
+        ge=1,
+        description="Outbox events published to the workflow event stream per round trip"
+    )
+    
+    outbox_relay_interval_seconds: float = Field(
+        default=1.0,
+        gt=0,
+        description="Seconds between outbox polls; commits that stage events wake the relay immediately"
+    )
+    
+    # Scheduler Configuration
+    scheduler_claim_batch_size: int = Field(
+        default=500,
+        ge=1,
+        description="Due schedules claimed and fired per atomic Redis call"
+    )
+    
+    scheduler_cron_lookahead: int = Field(
+        default=20,
+        ge=2,
+        description="Cron fire times precomputed per schedule; topped up when half are used"
+    )
+    
+    scheduler_misfire_grace_seconds: float = Field(
+        default=60,
+        ge=0,
+        description="Seconds a run may be late before the schedule's misfire policy applies"
+    )
+    
+    scheduler_misfire_max_catchup: int = Field(
+        default=10,
+        ge=1,
+        description="Default cap on missed runs replayed by the fire_all misfire policy"
+    )
+    
+    scheduler_max_triggers_per_second: float = Field(
+        default=0,
+        ge=0,
+        description="Cap on scheduled triggers emitted per second by one scheduler (0 = no cap)"
+    )
+    
+    scheduler_shard_count: int = Field(
+        default=1,
+        ge=1,
+        description="Schedule sets the schedules are partitioned into; replicas split them through leases. Each shard is hash-tagged into its own Redis Cluster slot; trigger workers must use the same value"
+    )
+    
+    scheduler_shard_lease_seconds: float = Field(
+        default=15,
+        ge=1,
+        description="Seconds a scheduler replica's shard lease lasts without renewal"
+    )
+    
+    scheduler_wheel_horizon_seconds: float = Field(
+        default=0,
+        ge=0,
+        description="Seconds of upcoming schedules kept in an in-memory timing wheel (0 = poll Redis instead)"
+    )
+    
+    scheduler_reconcile_interval_seconds: float = Field(
+        default=300,
+        ge=0,
+        description="Seconds between reconciliations of the Redis schedules against the database (0 = startup only)"
+    )
+    
+    scheduler_side_effect_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Threads running slow trigger-registration side effects (e.g. Telegram webhooks)"
+    )
+    
+    scheduler_side_effect_retries: int = Field(
+        default=3,
+        ge=0,
+        description="Retries, with exponential backoff, for a failed trigger-registration side effect"
+    )
+    
+    auth_cache_ttl_seconds: float = Field(
+        default=60,
+        ge=0,
+        description="Seconds a verified user or resource owner is remembered by the auth checks (0 = always query)"
+    )
+    
+    node_catalog_check_seconds: float = Field(
+        default=5.0,
+        ge=0,
+        description="Seconds between checks for node definitions changed by another process (0 = never)"
+    )
+    
+    workflow_run_ttl_seconds: int = Field(
+        default=86400,
+        ge=60,
+        description="Seconds a queued run's status and node events are kept in Redis"
+    )
+    
+    metrics_token: Optional[str] = Field(
+        default=None,
+        description="Bearer token required by the internal /metrics endpoints; unset disables them"
+    )
+    
     @property
     def allowed_origins(self) -> list[str]:
         """Parse FRONTEND_URL to support multiple comma-separated origins."""
@@ -0,0 +1,78 @@
+# core/auth_cache.py
+# Keeps authentication and ownership checks off the database in the common
+# case. Users that passed the existence check and the owners of workflows,
+# nodes, connections and credentials are remembered in process for a short
+# TTL; owners never change hands, so a stale entry can only let a request
+# reach a route that then finds the row gone. Logged-out tokens are revoked
+# in Redis until they would have expired anyway.
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Hashable, Optional
+from config import settings
+
+TOKEN_REVOKED_KEY_PREFIX = "revoked_token"
+
+
+class TTLCache:
+    """Thread-safe, size-bounded map whose entries expire after `ttl_seconds` (0 disables it)"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.ttl_seconds:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        if not self.ttl_seconds:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+# user_id -> email of a user known to exist
+user_cache = TTLCache(settings.auth_cache_ttl_seconds)
+# (kind, id) -> owner user_id, kind being "workflow", "workflow_node", "connection" or "credential"
+owner_cache = TTLCache(settings.auth_cache_ttl_seconds)
+
+
+def token_revoked_key(jti: str) -> str:
+    return f"{TOKEN_REVOKED_KEY_PREFIX}:{jti}"
+
+
+async def is_token_revoked(redis_client, jti: Optional[str]) -> bool:
+    # Tokens minted before tokens carried an id can't be revoked one by one
+    if not jti:
+        return False
+    return bool(await redis_client.exists(token_revoked_key(jti)))
+
+
+async def revoke_token(redis_client, jti: Optional[str], exp: Optional[float]):
+    """Revoke a token until its expiry; past that it is rejected as expired anyway"""
+    if not jti:
+        return
+    ttl = int((exp or 0) - datetime.utcnow().timestamp()) + 1
+    if ttl > 0:
+        await redis_client.set(token_revoked_key(jti), 1, ex=ttl)
@@ -0,0 +1,62 @@
+# core/codec.py
+# Encoding for trigger contexts and workflow event payloads stored in Redis.
+# Binary values start with a one-byte format tag so the format can change
+# without a flag day: anything untagged is JSON, the only format written
+# before the codec existed, and keeps decoding.
+import json
+from typing import Any, Union
+import msgpack # type: ignore
+
+try:
+    import zstandard # type: ignore
+except ImportError:  # compression is optional
+    zstandard = None
+
+from config import settings
+
+FORMAT_MSGPACK = 0x01
+FORMAT_MSGPACK_ZSTD = 0x02
+
+
+class Codec:
+    """
+    `json` writes plain untagged JSON, readable by workers from before the
+    codec. `msgpack` writes tagged msgpack and, when zstandard is installed,
+    compresses values of at least `compress_min_bytes`.
+    """
+
+    def __init__(self, format: str = "msgpack", compress_min_bytes: int = 1024, compression_level: int = 3):
+        if format not in ("msgpack", "json"):
+            raise ValueError(f"Unknown codec format '{format}'")
+        self.format = format
+        self.compress_min_bytes = max(int(compress_min_bytes), 0)
+        self._compressor = zstandard.ZstdCompressor(level=compression_level) if zstandard else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+    def encode(self, value: Any) -> Union[bytes, str]:
+        if self.format == "json":
+            return json.dumps(value)
+
+        packed = msgpack.packb(value, use_bin_type=True)
+        if self._compressor and self.compress_min_bytes and len(packed) >= self.compress_min_bytes:
+            return bytes([FORMAT_MSGPACK_ZSTD]) + self._compressor.compress(packed)
+        return bytes([FORMAT_MSGPACK]) + packed
+
+    def decode(self, raw: Union[bytes, str, None]) -> Any:
+        """Decode a value written in any format, whatever this codec writes"""
+        if raw is None or raw == b"" or raw == "":
+            return None
+        if isinstance(raw, str):
+            return json.loads(raw)
+
+        tag = raw[0]
+        if tag == FORMAT_MSGPACK:
+            return msgpack.unpackb(raw[1:], raw=False, strict_map_key=False)
+        if tag == FORMAT_MSGPACK_ZSTD:
+            if not self._decompressor:
+                raise ValueError("Value is zstd-compressed but zstandard is not installed")
+            return msgpack.unpackb(self._decompressor.decompress(raw[1:]), raw=False, strict_map_key=False)
+        return json.loads(raw)
+
+
+codec = Codec(settings.trigger_codec, settings.trigger_codec_compress_min_bytes)
@@ -0,0 +1,36 @@
+# core/cron.py
+# Cron expressions for SchedulerNode. Expressions are parsed once per
+# (expression, timezone) and fire times are computed ahead of time, so the
+# scheduler loop only ever deals with plain timestamps.
+import datetime
+import threading
+import time
+from functools import lru_cache
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from croniter import croniter # type: ignore
+
+DEFAULT_TIMEZONE = "UTC"
+
+# croniter instances are stateful; the cached ones are shared between callers
+_iterator_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def _iterator(expression: str, timezone: str):
+    tz = ZoneInfo(timezone)
+    return croniter(expression, datetime.datetime.now(tz)), tz
+
+
+def next_fire_times(expression: str, timezone: Optional[str] = None, after: Optional[float] = None, count: int = 1) -> List[float]:
+    """
+    Next `count` fire times of a cron expression strictly after `after`
+    (epoch seconds, default now), evaluated in `timezone` so DST is honoured.
+    Raises ValueError for a bad expression and KeyError for an unknown zone.
+    """
+    after = time.time() if after is None else after
+    with _iterator_lock:
+        iterator, tz = _iterator(expression.strip(), timezone or DEFAULT_TIMEZONE)
+        iterator.set_current(datetime.datetime.fromtimestamp(after, tz), force=True)
+        return [iterator.get_next(float) for _ in range(count)]
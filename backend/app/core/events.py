@@ -3,3 +3,9 @@ WORKFLOW_ACTIVATED = "workflow_activated"
 WORKFLOW_DEACTIVATED = "workflow_deactivated"
 WORKFLOW_DELETED = "workflow_deleted"
 WORKFLOW_UPDATED = "workflow_updated"
+
+# Lifecycle events travel on a Redis stream read by the schedulers' consumer
+# group, so events published while no scheduler is up are replayed later.
+WORKFLOW_EVENTS_STREAM = "workflow_events"
+WORKFLOW_EVENTS_MAXLEN = 10000
+SCHEDULER_EVENTS_GROUP = "scheduler_group"
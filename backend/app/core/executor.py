@@ -1,7 +1,7 @@
 import re
 import copy
 import threading
-from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import ThreadPoolExecutor
 from core.logger import Logger
 from .node_factory import NodeFactory
 from models.db_models.workflow_nodes import WorkflowNode
@@ -16,14 +16,28 @@ class WorkflowExecutor:
         self.logger = logger or Logger("[Executor]")
         # Track node completion status and results for multiple parent handling
         self.node_results = {}
+        # node_id -> the context a finished node hands to its children
+        self.node_contexts = {}
         self.node_completion_lock = threading.Lock()
+        # Nodes submitted and not finished yet; the run is over at zero
+        self.pending_nodes = 0
+        self.pending_cond = threading.Condition()
+        # Optional observer of the current run (see services.run_tracker.RunListener)
+        self.listener = None
 
-    def execute_workflow(self, workflow_id, context=None):
+    def execute_workflow(self, workflow_id, context=None, listener=None):
+        """
+        Run the workflow for one trigger context and return once every node
+        that was reached has finished. `listener`, if given, is told about
+        each finished node through `node_finished(node_id, error=None)`.
+        """
         context = context or {}
         
         # Reset node tracking for new workflow execution
         with self.node_completion_lock:
             self.node_results = {}
+            self.node_contexts = {}
+        self.listener = listener
 
         # Load nodes and connections
         nodes = self.db.query(WorkflowNode).filter_by(workflow_id=workflow_id).all()
@@ -60,9 +74,8 @@ class WorkflowExecutor:
         self.logger.log(f"Start nodes: {[node.id for node in start_nodes]}")
 
         # Submit start nodes
-        futures = [
-            self.executor_pool.submit(
-                self._run_node,
+        for node in start_nodes:
+            self._submit_node(
                 node,
                 self._safe_copy_context(context),
                 node_map,
@@ -70,12 +83,210 @@ class WorkflowExecutor:
                 parent_map,
                 0
             )
-            for node in start_nodes
-        ]
 
-        wait(futures)
+        # Downstream nodes are submitted as their parents finish: wait for all of them
+        with self.pending_cond:
+            self.pending_cond.wait_for(lambda: self.pending_nodes == 0)
         self.logger.log("=== Workflow Execution Completed ===")
 
+    def _submit_node(self, *args):
+        with self.pending_cond:
+            self.pending_nodes += 1
+        self.executor_pool.submit(self._run_node_tracked, *args)
+
+    def _run_node_tracked(self, *args):
+        try:
+            self._run_node(*args)
+        finally:
+            with self.pending_cond:
+                self.pending_nodes -= 1
+                self.pending_cond.notify_all()
+
+    def _node_finished(self, listener, node_id, error=None):
+        if listener:
+            try:
+                listener.node_finished(node_id, error=error)
+            except Exception as e:
+                self.logger.log(f"Run listener failed for node {node_id}: {e}")
+
+    def execute_workflow_batch(self, workflow_id, contexts, listeners=None):
+        """
+        Execute one workflow for several trigger contexts at once.
+
+        Nodes run in dependency order. Executors that define
+        `run_batch(configs, contexts)` are called once per level with every
+        item; the rest run per item on the pool. `run_batch` returns one result
+        per item, where an Exception marks that item as failed. An item whose
+        node fails stops there, like a single run does, and the other items
+        carry on. Each item's context accumulates from node to node as in a
+        single run, so templates can reach any ancestor's output. `listeners`
+        holds an optional run listener per item.
+        """
+        listeners = listeners or [None] * len(contexts)
+        if len(contexts) == 1:
+            return self.execute_workflow(workflow_id, contexts[0], listener=listeners[0])
+
+        nodes = self.db.query(WorkflowNode).filter_by(workflow_id=workflow_id).all()
+        connections = self.db.query(WorkflowConnection).filter_by(workflow_id=workflow_id).all()
+
+        self.logger.log("=== Workflow Batch Execution Started ===")
+        self.logger.log(f"Workflow ID: {workflow_id}, items: {len(contexts)}")
+
+        node_map = {node.id: node for node in nodes}
+        parent_map = {}
+        for conn in connections:
+            parent_map.setdefault(conn.to_step_id, []).append(conn.from_step_id)
+
+        levels = self._topological_levels(nodes, parent_map)
+        if not levels or not levels[0]:
+            raise ValueError("No starting node found (all nodes are targeted)")
+
+        # Per item: node_id -> result; missing means not run or failed
+        item_results = [{} for _ in contexts]
+        # Per item: node_id -> the context it hands to its children
+        item_contexts = [{} for _ in contexts]
+
+        # Nodes run one after another on this thread; the items of a
+        # non-batch node fan out on the pool.
+        for level in levels:
+            for node_id in level:
+                self._run_batch_node(node_map[node_id], contexts, item_results, item_contexts, parent_map, listeners)
+
+        self.logger.log("=== Workflow Batch Execution Completed ===")
+
+    def _run_batch_node(self, node, contexts, item_results, item_contexts, parent_map, listeners):
+        parents = parent_map.get(node.id, [])
+
+        # Only items whose parents all succeeded continue
+        ready = [
+            i for i in range(len(contexts))
+            if all(p in item_results[i] for p in parents)
+        ]
+        if not ready:
+            self.logger.log(f"Node {node.id} skipped for whole batch, no item reached it")
+            return
+
+        def fail(i, error):
+            self.logger.log(f"ERROR executing node {node.id} for batch item {i}: {error}")
+            self._node_finished(listeners[i], node.id, error=str(error))
+
+        def succeed(i, result, outgoing_context):
+            item_results[i][node.id] = result
+            item_contexts[i][node.id] = outgoing_context
+            self._node_finished(listeners[i], node.id)
+
+        enhanced_contexts = {}
+        for i in list(ready):
+            try:
+                enhanced_contexts[i] = self._build_batch_context(contexts[i], parents, item_results[i], item_contexts[i])
+            except Exception as e:
+                fail(i, e)
+                ready.remove(i)
+
+        if node.node.type.lower() in self.TRIGGER_TYPES:
+            for i in ready:
+                succeed(i, enhanced_contexts[i], enhanced_contexts[i])
+            return
+
+        def with_output(i, result):
+            # What the single path hands downstream: the accumulated context plus this node's output
+            enhanced_contexts[i][f"node_{node.id}_output"] = result
+            return enhanced_contexts[i]
+
+        try:
+            executor_cls = NodeFactory.get_executor(node.node.category)
+        except Exception as e:
+            for i in ready:
+                fail(i, e)
+            return
+
+        configs = {}
+        for i in list(ready):
+            try:
+                configs[i] = resolve_config(node.custom_config or {}, enhanced_contexts[i])
+            except Exception as e:
+                fail(i, e)
+                ready.remove(i)
+        if not ready:
+            return
+
+        if hasattr(executor_cls, "run_batch"):
+            self.logger.log(f"Running node {node.id} ({node.node.category}) as a batch of {len(ready)}")
+            try:
+                results = executor_cls.run_batch(
+                    [configs[i] for i in ready],
+                    [enhanced_contexts[i] for i in ready]
+                )
+            except Exception as e:
+                self.logger.log(f"ERROR executing batch node {node.id}: {e}")
+                for i in ready:
+                    self._node_finished(listeners[i], node.id, error=str(e))
+                return
+            for i, result in zip(ready, results):
+                if isinstance(result, Exception):
+                    fail(i, result)
+                    continue
+                succeed(i, result, with_output(i, result))
+            return
+
+        futures = {
+            i: self.executor_pool.submit(executor_cls.run, configs[i], enhanced_contexts[i])
+            for i in ready
+        }
+        for i, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                fail(i, e)
+                continue
+            succeed(i, result, with_output(i, result))
+
+    def _build_batch_context(self, base_context, parents, results, contexts):
+        """
+        Same shape as _build_enhanced_context, reading one batch item's results.
+        A node with parents starts from the contexts they handed down, like
+        in a single run, so it sees everything accumulated upstream.
+        """
+        if parents:
+            base_context = self._merge_parent_contexts(parents, contexts)
+        enhanced_context = self._safe_copy_context(base_context)
+        for parent_id in parents:
+            enhanced_context[f"parent_{parent_id}_result"] = results[parent_id]
+        if len(parents) == 1:
+            enhanced_context["parent_result"] = results[parents[0]]
+        if len(parents) > 1:
+            enhanced_context["all_parent_results"] = [
+                {"parent_id": parent_id, "result": results[parent_id]}
+                for parent_id in parents
+            ]
+        return enhanced_context
+
+    @staticmethod
+    def _merge_parent_contexts(parents, contexts):
+        """The contexts `parents` handed down, merged in parent order (later parents win)"""
+        merged = {}
+        for parent_id in parents:
+            merged.update(contexts[parent_id])
+        return merged
+
+    @staticmethod
+    def _topological_levels(nodes, parent_map):
+        """Group node ids into levels whose parents all live in earlier levels"""
+        remaining = {node.id for node in nodes}
+        done = set()
+        levels = []
+        while remaining:
+            level = [
+                node_id for node_id in remaining
+                if all(p in done for p in parent_map.get(node_id, []))
+            ]
+            if not level:
+                raise ValueError("Workflow contains a cycle")
+            levels.append(sorted(level))
+            done.update(level)
+            remaining.difference_update(level)
+        return levels
+
     def _run_node(self, node, context, node_map, connection_map, parent_map, indent_level):
         self.logger.log(f"--- Running node {node.id} ({node.node.category}) ---", indent_level)
         self.logger.log(f"Node config: {node.custom_config}", indent_level)
@@ -97,10 +308,12 @@ class WorkflowExecutor:
             # This allows downstream nodes to access trigger data via parent_result.field_name
             with self.node_completion_lock:
                 self.node_results[node.id] = enhanced_context
+                self.node_contexts[node.id] = enhanced_context
                 self.logger.log(f"Trigger node {node.id} marked as completed", indent_level)
+            self._node_finished(self.listener, node.id)
             
             # Now submit downstream nodes (they will see the parent as completed)
-            self._submit_downstream(node, enhanced_context, node_map, connection_map, parent_map, indent_level, parent_result=enhanced_context)
+            self._submit_downstream(node, node_map, connection_map, parent_map, indent_level, parent_result=enhanced_context)
             return
 
         # Resolve config and execute node
@@ -116,17 +329,20 @@ class WorkflowExecutor:
             self.logger.log(f"RESULT: {result}", indent_level)
         except Exception as e:
             self.logger.log(f"ERROR executing node {node.id}: {e}", indent_level)
+            self._node_finished(self.listener, node.id, error=str(e))
             return
 
         # Store result and mark node as completed
+        enhanced_context[f"node_{node.id}_output"] = result
         with self.node_completion_lock:
             self.node_results[node.id] = result
+            self.node_contexts[node.id] = enhanced_context
             self.logger.log(f"Node {node.id} completed and result stored", indent_level)
+        self._node_finished(self.listener, node.id)
 
-        enhanced_context[f"node_{node.id}_output"] = result
-        self._submit_downstream(node, enhanced_context, node_map, connection_map, parent_map, indent_level, parent_result=result)
+        self._submit_downstream(node, node_map, connection_map, parent_map, indent_level, parent_result=result)
 
-    def _submit_downstream(self, node, context, node_map, connection_map, parent_map, indent_level, parent_result=None):
+    def _submit_downstream(self, node, node_map, connection_map, parent_map, indent_level, parent_result=None):
         children = connection_map.get(node.id, [])
         if not children:
             self.logger.log(f"Node {node.id} has no downstream nodes.", indent_level)
@@ -140,15 +356,17 @@ class WorkflowExecutor:
             
             # Check if the child node is ready to run (all parents completed)
             if self._is_node_ready_to_run(next_node.id, parent_map, indent_level + 1):
-                # Build enhanced context for the child node with all parent results
+                # Build enhanced context for the child node with all parent results,
+                # starting from what every parent handed down (not only this one)
                 child_parents = parent_map.get(next_node.id, [])
-                child_context = self._build_enhanced_context(next_node.id, child_parents, context, indent_level + 1)
+                with self.node_completion_lock:
+                    base_context = self._merge_parent_contexts(child_parents, self.node_contexts)
+                child_context = self._build_enhanced_context(next_node.id, child_parents, base_context, indent_level + 1)
 
                 self.logger.log(f"Starting downstream node {next_node.id} from node {node.id} (condition: {conn.condition})", indent_level + 1)
                 
                 # Start the child node in a new thread
-                self.executor_pool.submit(
-                    self._run_node,
+                self._submit_node(
                     next_node,
                     child_context,
                     node_map,
@@ -0,0 +1,103 @@
+# core/node_catalog.py
+# Process-local copy of the Node definitions. They come from
+# nodes_metadata/*.json and almost never change, so lookups are served from a
+# dict instead of a query. Node CRUD invalidates it; other processes notice
+# through a version counter in Redis, checked at most every
+# `check_interval_seconds`. Loading and checking block, so async code goes
+# through get_node_async, which moves them to a worker thread.
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool # type: ignore
+from sqlalchemy.orm import Session # type: ignore
+from models.db_models.node_db import Node
+from models.schemas.node import NodeResponse
+
+NODE_CATALOG_VERSION_KEY = "node_catalog_version"
+
+
+class NodeCatalog:
+    def __init__(self, session_factory: Callable[[], Session], redis_client=None, check_interval_seconds: float = 5.0):
+        self.session_factory = session_factory
+        self.redis_client = redis_client
+        self.check_interval_seconds = check_interval_seconds
+        self._lock = threading.Lock()
+        self._nodes: Optional[Dict[int, NodeResponse]] = None
+        self._etag = None
+        self._remote_version = None
+        self._checked_at = 0.0
+
+    def load(self):
+        """(Re)load every definition; called at startup and after invalidation"""
+        remote_version = self._read_remote_version()
+        session = self.session_factory()
+        try:
+            nodes = session.query(Node).order_by(Node.id).all()
+            definitions = {node.id: NodeResponse.from_orm(node) for node in nodes}
+        finally:
+            session.close()
+
+        # Content hash: every process serving the same definitions hands out the same ETag
+        digest = hashlib.sha1(
+            json.dumps([d.dict() for d in definitions.values()], sort_keys=True, default=str).encode()
+        ).hexdigest()
+        with self._lock:
+            self._nodes = definitions
+            self._etag = f'"{digest[:16]}"'
+            self._remote_version = remote_version
+            self._checked_at = time.monotonic()
+        print(f"[NodeCatalog] ✅ Loaded {len(definitions)} node definitions")
+
+    def invalidate(self):
+        """Drop this process's copy and tell the other processes to drop theirs"""
+        with self._lock:
+            self._nodes = None
+        if self.redis_client is not None:
+            try:
+                self.redis_client.incr(NODE_CATALOG_VERSION_KEY)
+            except Exception as e:
+                print(f"[NodeCatalog] ⚠️ Failed to bump the catalog version: {e}")
+
+    def _read_remote_version(self):
+        if self.redis_client is None or not self.check_interval_seconds:
+            return None
+        try:
+            return self.redis_client.get(NODE_CATALOG_VERSION_KEY)
+        except Exception as e:
+            print(f"[NodeCatalog] ⚠️ Failed to read the catalog version: {e}")
+            return self._remote_version
+
+    def _check_due(self) -> bool:
+        return bool(self.check_interval_seconds) and time.monotonic() - self._checked_at >= self.check_interval_seconds
+
+    def _definitions(self) -> Dict[int, NodeResponse]:
+        nodes = self._nodes
+        if nodes is not None and self._check_due():
+            self._checked_at = time.monotonic()
+            if self._read_remote_version() != self._remote_version:
+                nodes = None
+        if nodes is None:
+            self.load()
+            nodes = self._nodes
+        return nodes
+
+    def get_node(self, node_id: int) -> Optional[NodeResponse]:
+        return self._definitions().get(node_id)
+
+    async def get_node_async(self, node_id: int) -> Optional[NodeResponse]:
+        # Served from memory; only a due version check or a reload leaves the event loop
+        nodes = self._nodes
+        if nodes is None or self._check_due():
+            nodes = await run_in_threadpool(self._definitions)
+        return nodes.get(node_id)
+
+    def list_nodes(self, skip: int = 0, limit: Optional[int] = None) -> List[NodeResponse]:
+        nodes = list(self._definitions().values())
+        return nodes[skip:skip + limit] if limit is not None else nodes[skip:]
+
+    @property
+    def etag(self) -> str:
+        self._definitions()
+        return self._etag
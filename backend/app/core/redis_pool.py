@@ -0,0 +1,123 @@
+# core/redis_pool.py
+# Process-wide Redis connection pools. Every client in a process (API
+# dependencies, repositories, workers, schedulers) shares one bounded pool
+# per URL instead of opening its own connections. Callers that find the
+# pool exhausted wait up to the pool timeout instead of opening more. Long
+# blocking reads (server-sent event streams) get a separate, separately capped
+# async pool so open streams can't starve request handling.
+import threading
+from typing import Dict, Optional
+import redis # type: ignore
+import redis.asyncio as aioredis # type: ignore
+from config import settings
+
+_lock = threading.Lock()
+_pools: Dict[str, redis.BlockingConnectionPool] = {}
+_async_pools: Dict[str, aioredis.BlockingConnectionPool] = {}
+_stream_pools: Dict[str, aioredis.BlockingConnectionPool] = {}
+
+
+def _pool_options(max_connections: Optional[int] = None) -> dict:
+    return {
+        "max_connections": max_connections or settings.redis_max_connections,
+        "timeout": settings.redis_pool_timeout_seconds,
+        "health_check_interval": settings.redis_health_check_interval_seconds,
+        "socket_connect_timeout": settings.redis_socket_connect_timeout_seconds,
+        "socket_keepalive": True,
+        "retry_on_timeout": True,
+    }
+
+
+def get_redis(redis_url: Optional[str] = None) -> redis.Redis:
+    """Client on the process-wide pool for `redis_url` (default: settings.redis_url)"""
+    redis_url = redis_url or settings.redis_url
+    pool = _pools.get(redis_url)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(redis_url)
+            if pool is None:
+                pool = redis.BlockingConnectionPool.from_url(redis_url, **_pool_options())
+                _pools[redis_url] = pool
+    return redis.Redis(connection_pool=pool)
+
+
+def get_async_redis(redis_url: Optional[str] = None) -> aioredis.Redis:
+    """asyncio client on the process-wide async pool; must be used from the app's event loop"""
+    redis_url = redis_url or settings.redis_url
+    pool = _async_pools.get(redis_url)
+    if pool is None:
+        with _lock:
+            pool = _async_pools.get(redis_url)
+            if pool is None:
+                pool = aioredis.BlockingConnectionPool.from_url(redis_url, **_pool_options())
+                _async_pools[redis_url] = pool
+    return aioredis.Redis(connection_pool=pool)
+
+
+def get_async_stream_redis(redis_url: Optional[str] = None) -> aioredis.Redis:
+    """
+    asyncio client for blocking stream reads held open for a long time, on its
+    own pool of at most settings.redis_stream_max_connections connections
+    """
+    redis_url = redis_url or settings.redis_url
+    pool = _stream_pools.get(redis_url)
+    if pool is None:
+        with _lock:
+            pool = _stream_pools.get(redis_url)
+            if pool is None:
+                pool = aioredis.BlockingConnectionPool.from_url(
+                    redis_url, **_pool_options(settings.redis_stream_max_connections)
+                )
+                _stream_pools[redis_url] = pool
+    return aioredis.Redis(connection_pool=pool)
+
+
+def _pool_usage(pool):
+    """(in_use, idle) read from redis-py's pool internals; it has no public counters"""
+    if hasattr(pool, "_in_use_connections"):
+        return len(pool._in_use_connections), len(pool._available_connections)
+    # Queue-based pool: slots hold a connection or None until first used
+    idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+    return len(pool._connections) - idle, idle
+
+
+def _pool_stats(pool) -> dict:
+    max_connections = getattr(pool, "max_connections", None)
+    try:
+        in_use, idle = _pool_usage(pool)
+    except (AttributeError, TypeError):
+        # A redis-py release changed the internals: report the usage as unknown
+        return {"max_connections": max_connections, "in_use": None, "idle": None, "utilization": None}
+    return {
+        "max_connections": max_connections,
+        "in_use": in_use,
+        "idle": idle,
+        "utilization": round(in_use / max_connections, 3) if max_connections else 0,
+    }
+
+
+def _label(redis_url: str) -> str:
+    # Host, port and db only: the URL may carry a password
+    return redis_url.split("@", 1)[-1].split("://", 1)[-1]
+
+
+def pool_metrics() -> dict:
+    """Connection usage of every pool this process opened"""
+    return {
+        "sync": {_label(url): _pool_stats(pool) for url, pool in list(_pools.items())},
+        "async": {_label(url): _pool_stats(pool) for url, pool in list(_async_pools.items())},
+        "stream": {_label(url): _pool_stats(pool) for url, pool in list(_stream_pools.items())},
+    }
+
+
+async def close_pools():
+    with _lock:
+        pools = list(_pools.values())
+        async_pools = list(_async_pools.values()) + list(_stream_pools.values())
+        _pools.clear()
+        _async_pools.clear()
+        _stream_pools.clear()
+    for pool in pools:
+        pool.disconnect()
+    for pool in async_pools:
+        await pool.disconnect()
@@ -0,0 +1,99 @@
+# core/timing_wheel.py
+# Hierarchical timing wheel: O(1) insert and removal, expiry cost proportional
+# to the ticks elapsed. Level 0 slots are one tick wide, every higher level's
+# slots span a full rotation of the level below; items cascade down as their
+# deadline gets closer.
+import math
+import time
+from typing import Hashable, List, Optional
+
+
+class TimingWheel:
+    def __init__(self, tick_seconds: float = 0.05, slots: int = 256, levels: int = 4, now: Optional[float] = None):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self.levels = levels
+        self.wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self.index = {}  # item -> (level, slot, tick)
+        # Next tick still to be expired
+        self.current_tick = self._tick_of(time.time() if now is None else now)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def _tick_of(self, timestamp: float) -> int:
+        return int(timestamp / self.tick_seconds)
+
+    def add(self, item: Hashable, deadline: float):
+        """Schedule (or reschedule) `item`; it expires on the first advance at or after `deadline`"""
+        self.remove(item)
+        self._place(item, max(math.ceil(deadline / self.tick_seconds), self.current_tick))
+
+    def _place(self, item, tick: int):
+        delta = tick - self.current_tick
+        level, span = 0, self.slots
+        while delta >= span and level < self.levels - 1:
+            level += 1
+            span *= self.slots
+        slot = (tick // self.slots ** level) % self.slots
+        self.wheels[level][slot].add(item)
+        self.index[item] = (level, slot, tick)
+
+    def remove(self, item: Hashable):
+        position = self.index.pop(item, None)
+        if position:
+            level, slot, _ = position
+            self.wheels[level][slot].discard(item)
+
+    def clear(self):
+        for wheel in self.wheels:
+            for bucket in wheel:
+                bucket.clear()
+        self.index.clear()
+
+    def advance(self, now: Optional[float] = None) -> List[Hashable]:
+        """Move the wheel up to `now` and return every item that expired"""
+        target = self._tick_of(time.time() if now is None else now)
+        expired = []
+        while self.current_tick <= target:
+            if not self.index:
+                self.current_tick = target + 1
+                break
+
+            # Pull the slots whose span starts now down a level, highest first
+            for level in range(self.levels - 1, 0, -1):
+                span = self.slots ** level
+                if self.current_tick % span == 0:
+                    slot = (self.current_tick // span) % self.slots
+                    bucket = self.wheels[level][slot]
+                    self.wheels[level][slot] = set()
+                    for item in bucket:
+                        _, _, tick = self.index.pop(item)
+                        self._place(item, tick)
+
+            slot = self.current_tick % self.slots
+            bucket = self.wheels[0][slot]
+            self.wheels[0][slot] = set()
+            for item in bucket:
+                self.index.pop(item, None)
+            expired.extend(bucket)
+            self.current_tick += 1
+        return expired
+
+    def next_deadline(self) -> Optional[float]:
+        """
+        When the next advance can expire something: the first occupied level 0
+        slot, else the next rotation, where higher levels cascade down. None
+        when empty.
+        """
+        if not self.index:
+            return None
+        for offset in range(self.slots):
+            if self.wheels[0][(self.current_tick + offset) % self.slots]:
+                return (self.current_tick + offset) * self.tick_seconds
+        # Also covers a cascade that is due on the current tick itself
+        next_rotation = -(-self.current_tick // self.slots) * self.slots
+        return next_rotation * self.tick_seconds
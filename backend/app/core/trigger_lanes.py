@@ -0,0 +1,67 @@
+# core/trigger_lanes.py
+# Priority lanes for workflow triggers. Each lane is its own Redis stream;
+# workers read them with weighted round robin so interactive and webhook runs
+# don't queue behind bulk scheduled jobs. Entries a worker can't admit are
+# moved to a dead-letter stream instead of being retried forever.
+LANE_INTERACTIVE = "interactive"
+LANE_WEBHOOK = "webhook"
+LANE_SCHEDULED = "scheduled"
+
+# Scheduled triggers keep the original stream name so entries enqueued before
+# lanes existed are still consumed. With more than one scheduler shard, each
+# shard emits to its own hash-tagged stream (scheduled_stream), which keeps
+# every key its claim script touches in one Redis Cluster slot.
+TRIGGER_LANE_STREAMS = {
+    LANE_INTERACTIVE: "workflow_triggers:interactive",
+    LANE_WEBHOOK: "workflow_triggers:webhook",
+    LANE_SCHEDULED: "workflow_triggers",
+}
+
+# Highest priority first
+TRIGGER_LANE_ORDER = [LANE_INTERACTIVE, LANE_WEBHOOK, LANE_SCHEDULED]
+
+# Malformed entries (bad workflow id, undecodable context) with the error and their origin
+TRIGGER_DEAD_LETTER_STREAM = "workflow_triggers:dead"
+TRIGGER_DEAD_LETTER_MAXLEN = 10000
+
+# Context keys the worker fills in itself; a trigger supplying them has them dropped
+RESERVED_CONTEXT_KEYS = ("services",)
+
+
+def lane_stream(lane: str) -> str:
+    return TRIGGER_LANE_STREAMS[lane]
+
+
+def slot_tag(key: str) -> str:
+    """
+    Redis Cluster hash tag that puts other keys in `key`'s slot: its own tag
+    if it has one, else the whole name in braces (a key without a tag is
+    hashed by its full name).
+    """
+    start = key.find("{")
+    if start != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            return key[start:end + 1]
+    return "{" + key + "}"
+
+
+def shard_tag(shard: int) -> str:
+    return "{s%d}" % shard
+
+
+def scheduled_stream(shard: int, shard_count: int) -> str:
+    """Stream a scheduler shard emits its triggers to"""
+    if shard_count <= 1:
+        return lane_stream(LANE_SCHEDULED)
+    return f"{lane_stream(LANE_SCHEDULED)}:{shard_tag(shard)}"
+
+
+def lane_streams(lane: str, shard_count: int = 1) -> list:
+    """
+    Every stream of a lane. The scheduled lane has one per scheduler shard,
+    plus the original stream for entries queued before sharding.
+    """
+    if lane != LANE_SCHEDULED or shard_count <= 1:
+        return [lane_stream(lane)]
+    return [lane_stream(lane)] + [scheduled_stream(shard, shard_count) for shard in range(shard_count)]
@@ -0,0 +1,155 @@
+# core/workflow_versions.py
+# Version counters for workflows, kept in Redis. Any commit that touches a
+# workflow, its nodes or its connections bumps its version, so the full
+# workflow endpoint can answer conditional requests without the database.
+import asyncio
+import time
+from typing import Optional, Tuple
+from sqlalchemy import event # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
+from sqlalchemy.orm import Session # type: ignore
+from models.db_models.workflow_db import WorkflowDB
+from models.db_models.workflow_nodes import WorkflowNode
+from models.db_models.workflow_connections_db import WorkflowConnection
+
+# Hash per workflow: version counter and owner, read before the full workflow is served
+WORKFLOW_VERSION_KEY_PREFIX = "workflow_version"
+# Set on a session: ids of workflows its flushes changed
+CHANGED_WORKFLOWS = "changed_workflows"
+# Set on a session committed from the event loop: bumps its commit() awaits
+PENDING_BUMPS = "pending_workflow_version_bumps"
+
+# Only bump a version that exists; a missing one is started fresh on the next read
+_BUMP_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('HINCRBY', key, 'version', 1)
+    end
+end
+return 0
+"""
+
+
+def workflow_version_key(workflow_id: int) -> str:
+    return f"{WORKFLOW_VERSION_KEY_PREFIX}:{workflow_id}"
+
+
+def mark_workflow_changed(session: Session, workflow_id: int):
+    """For changes the flush listener can't see, like bulk query deletes"""
+    session.info.setdefault(CHANGED_WORKFLOWS, set()).add(workflow_id)
+
+
+class WorkflowVersionTracker:
+    """
+    Bumps a workflow's version whenever a transaction that changed it, its
+    nodes or its connections commits. Listens on the Session class, so it
+    sees the sync and async routes alike. Commits of async sessions run on the
+    event loop, where a blocking round trip would stall every request: their
+    bump is left on the session and awaited through the async client by
+    VersionedAsyncSession.commit, before the request can respond.
+    """
+
+    def __init__(self, redis_client, async_redis_client=None):
+        self.redis_client = redis_client
+        self._bump = redis_client.register_script(_BUMP_SCRIPT)
+        self._bump_async = async_redis_client.register_script(_BUMP_SCRIPT) if async_redis_client is not None else None
+
+    def start(self):
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    def stop(self):
+        event.remove(Session, "after_flush", self._after_flush)
+        event.remove(Session, "after_commit", self._after_commit)
+        event.remove(Session, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session: Session, flush_context):
+        # new/dirty/deleted still hold what this flush wrote
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, WorkflowDB):
+                workflow_id = obj.id
+            elif isinstance(obj, (WorkflowNode, WorkflowConnection)):
+                workflow_id = obj.workflow_id
+            else:
+                continue
+            if workflow_id is not None:
+                mark_workflow_changed(session, workflow_id)
+
+    def _after_commit(self, session: Session):
+        workflow_ids = session.info.pop(CHANGED_WORKFLOWS, None)
+        if not workflow_ids:
+            return
+        keys = [workflow_version_key(workflow_id) for workflow_id in workflow_ids]
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None and self._bump_async is not None:
+            session.info.setdefault(PENDING_BUMPS, []).append(lambda: self._bump_now_async(keys, workflow_ids))
+            return
+
+        try:
+            self._bump(keys=keys)
+        except Exception as e:
+            print(f"[WorkflowVersionTracker] ⚠️ Failed to bump workflow versions {sorted(workflow_ids)}: {e}")
+
+    async def _bump_now_async(self, keys, workflow_ids):
+        try:
+            await self._bump_async(keys=keys)
+        except Exception as e:
+            print(f"[WorkflowVersionTracker] ⚠️ Failed to bump workflow versions {sorted(workflow_ids)}: {e}")
+
+    def _after_rollback(self, session: Session):
+        session.info.pop(CHANGED_WORKFLOWS, None)
+
+
+class VersionedAsyncSession(AsyncSession):
+    """
+    AsyncSession whose commit returns only once the workflow versions it
+    changed are bumped, so a request that just saved a workflow never
+    answers before its new version is visible to conditional reads.
+    """
+
+    async def commit(self):
+        await super().commit()
+        await self._run_pending_bumps()
+
+    async def close(self):
+        # Commits that bypassed commit() (e.g. through a transaction block)
+        await self._run_pending_bumps()
+        await super().close()
+
+    async def _run_pending_bumps(self):
+        for bump in self.info.pop(PENDING_BUMPS, []):
+            await bump()
+
+
+class AsyncWorkflowVersions:
+    """Reads workflow versions for the async routes"""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+
+    async def get(self, workflow_id: int) -> Tuple[str, Optional[int]]:
+        """
+        Current version and owner of a workflow. Must be read before the
+        workflow itself, so a change committed in between makes the next
+        read miss instead of caching stale data under the new version.
+        """
+        key = workflow_version_key(workflow_id)
+        pipe = self.redis_client.pipeline(transaction=False)
+        # A version starts from the clock so it never repeats one handed out before the key was lost
+        pipe.hsetnx(key, "version", time.time_ns() // 1000)
+        pipe.hmget(key, "version", "user_id")
+        _, (version, user_id) = await pipe.execute()
+        version = version.decode() if isinstance(version, bytes) else str(version)
+        return version, int(user_id) if user_id is not None else None
+
+    async def set_owner(self, workflow_id: int, user_id: int):
+        await self.redis_client.hset(workflow_version_key(workflow_id), "user_id", user_id)
+
+
+def workflow_etag(workflow_id: int, version: str) -> str:
+    return f'W/"{workflow_id}-{version}"'
@@ -1,5 +1,7 @@
 from fastapi import Depends # type: ignore
 from sqlalchemy import create_engine # type: ignore
+from sqlalchemy.engine import make_url # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine # type: ignore
 from sqlalchemy.orm import sessionmaker # type: ignore
 from repositories.sqlalchemy_user_repository import SqlAlchemyUserRepository
 from repositories.sqlalchemy_node_repository import SqlAlchemyNodeRepository
@@ -7,8 +9,17 @@ from repositories.sqlalchemy_workflow_repository import SqlAlchemyWorkflowReposi
 from repositories.sqlalchemy_workflow_node_repository import SqlAlchemyWorkflowNodeRepository
 from repositories.sqlalchemy_user_credential_repository import SqlAlchemyUserCredentialRepository
 from repositories.sqlalchemy_workflow_connection_repository import SqlAlchemyWorkflowConnectionRepository
+from repositories.sqlalchemy_outbox_repository import SqlAlchemyOutboxRepository
+from repositories.async_sqlalchemy_workflow_repository import AsyncSqlAlchemyWorkflowRepository
+from repositories.async_sqlalchemy_workflow_node_repository import AsyncSqlAlchemyWorkflowNodeRepository
+from repositories.async_sqlalchemy_user_repository import AsyncSqlAlchemyUserRepository
+from repositories.async_sqlalchemy_outbox_repository import AsyncSqlAlchemyOutboxRepository
 from models.db_models.workflow_db import Base
 from redis import Redis # type: ignore
+from redis.asyncio import Redis as AsyncRedis # type: ignore
+from core.redis_pool import get_redis, get_async_redis, get_async_stream_redis
+from core.node_catalog import NodeCatalog
+from core.workflow_versions import VersionedAsyncSession
 from config import settings
 
 # 1. Create engine and session
@@ -22,6 +33,25 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# Async engine for the async routes: same database through asyncpg, so
+# requests don't hold a threadpool slot while waiting on it
+async_engine = create_async_engine(
+    make_url(settings.database_url).set(drivername="postgresql+asyncpg"),
+    echo=settings.db_echo,
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+)
+# Objects stay usable after commit; async sessions can't lazy-load expired attributes.
+# Their commit also awaits the workflow version bumps it triggers.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=VersionedAsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Node definitions, served from memory; loaded at startup, reloaded after node CRUD
+node_catalog = NodeCatalog(SessionLocal, get_redis(), settings.node_catalog_check_seconds)
+
 # 2. Database tables are created via Alembic migrations
 # Run migrations with: alembic upgrade head
 
@@ -33,6 +63,10 @@ def get_db_session():
     finally:
         db.close()
 
+async def get_async_db_session():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # 4. Repository provider (after get_db_session is defined)
 def get_workflow_repository(db = Depends(get_db_session)):
     yield SqlAlchemyWorkflowRepository(db)
@@ -54,5 +88,35 @@ def get_workflow_connection_repository(db=Depends(get_db_session)):
     """Provides Workflow Connection repository dependency"""
     return SqlAlchemyWorkflowConnectionRepository(db)
 
+def get_outbox_repository(db=Depends(get_db_session)):
+    """Provides the event outbox on the request's session, so events commit with the change"""
+    return SqlAlchemyOutboxRepository(db)
+
+# Async repository providers, all on the request's async session
+def get_async_workflow_repository(db: AsyncSession = Depends(get_async_db_session)):
+    return AsyncSqlAlchemyWorkflowRepository(db)
+
+def get_async_workflow_node_repository(db: AsyncSession = Depends(get_async_db_session)):
+    return AsyncSqlAlchemyWorkflowNodeRepository(db)
+
+def get_async_user_repository(db: AsyncSession = Depends(get_async_db_session)):
+    return AsyncSqlAlchemyUserRepository(db)
+
+def get_async_outbox_repository(db: AsyncSession = Depends(get_async_db_session)):
+    return AsyncSqlAlchemyOutboxRepository(db)
+
+def get_node_catalog() -> NodeCatalog:
+    """The process-wide node catalog"""
+    return node_catalog
+
 def get_redis_client() -> Redis:
-    return Redis.from_url(settings.redis_url)
\ No newline at end of file
+    """Client on the process-wide connection pool"""
+    return get_redis()
+
+def get_async_redis_client() -> AsyncRedis:
+    """asyncio client on the process-wide async connection pool"""
+    return get_async_redis()
+
+def get_async_stream_redis_client() -> AsyncRedis:
+    """asyncio client for long blocking reads, on its own pool"""
+    return get_async_stream_redis()
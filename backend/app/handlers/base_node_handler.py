@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
 
 class BaseNodeHandler(ABC):
+    # Handlers that call external services set this so their work runs on the
+    # side-effect pool instead of the scheduler loop. They should raise on
+    # failure; the pool retries them.
+    blocking = False
+
     @abstractmethod
     def handle(self, node: dict, workflow_id: int):
         pass
@@ -9,17 +9,54 @@ class SchedulerNodeHandler(BaseNodeHandler):
         self.scheduler: SchedulerService = scheduler_service
 
     def handle(self, node: dict, workflow_id: int):
-        config = node.get("custom_config", {})
-        next_run = datetime.datetime.utcnow() + datetime.timedelta(seconds=config.get("delay_seconds", 0))
-        schedule = Schedule(
+        schedule = self.build_schedule(node, workflow_id)
+        if schedule:
+            self.scheduler.update_schedule(schedule)
+
+    def build_schedule(self, node: dict, workflow_id: int):
+        """Turn a SchedulerNode's config into a Schedule; None when the config is unusable"""
+        config = node.get("custom_config") or {}
+        cron_expression = config.get("cron")
+        interval_seconds = config.get("interval_seconds", 10)
+        fire_times = None
+
+        # Spread workflows sharing a round interval over the jitter window. The
+        # offset shifts the whole grid, so the average frequency is unchanged.
+        jitter_window = config.get("jitter_seconds")
+        if jitter_window and interval_seconds and not cron_expression:
+            jitter_window = min(float(jitter_window), float(interval_seconds))
+        offset = Schedule.spread_offset(workflow_id, jitter_window)
+
+        if cron_expression:
+            # Precompute the next fire times so the scheduler never parses cron itself
+            try:
+                fire_times = self.scheduler.cron_fire_times(cron_expression, config.get("timezone"), offset=offset)
+            except (ValueError, KeyError) as e:
+                print(f"[SchedulerNodeHandler] ⚠️ Invalid cron '{cron_expression}' ({config.get('timezone')}) for workflow {workflow_id}: {e}")
+                return None
+            next_run = datetime.datetime.fromtimestamp(fire_times[0], datetime.timezone.utc)
+            interval_seconds = None
+        else:
+            next_run = datetime.datetime.utcnow() + datetime.timedelta(seconds=config.get("delay_seconds", 0) + offset)
+
+        return Schedule(
             workflow_id=workflow_id,
-            interval_seconds=config.get("interval_seconds", 10),
+            interval_seconds=interval_seconds,
             next_run=next_run,
             context=config.get("context"),
             max_occurrences=config.get("max_occurrences"),
             until=config.get("until"),
+            max_concurrency=config.get("max_concurrency"),
+            serialize_by=config.get("serialize_by"),
+            debounce_seconds=config.get("debounce_seconds"),
+            coalesce_by=config.get("coalesce_by"),
+            cron=cron_expression,
+            timezone=config.get("timezone"),
+            fire_times=fire_times,
+            misfire_policy=config.get("misfire_policy"),
+            misfire_max_catchup=config.get("misfire_max_catchup"),
+            jitter_seconds=jitter_window,
         )
-        self.scheduler.update_schedule(schedule)
 
     def cleanup(self, node: dict, workflow_id: int):
         """Called on workflow deletion/deactivation"""
@@ -5,8 +5,13 @@ from services.redis_service import RedisService
 from utils.token_security import decrypt_credentials
 from config import settings
 
+TELEGRAM_API_TIMEOUT = 10.0
+
 
 class TelegramTriggerHandler(BaseNodeHandler):
+    # Talks to the Telegram API, keep it off the scheduler loop
+    blocking = True
+
     def __init__(self, redis_service: RedisService):
         self.redis_service: RedisService = redis_service
         if not settings.ngrok_url:
@@ -27,6 +32,7 @@ class TelegramTriggerHandler(BaseNodeHandler):
         """
         Register a Telegram webhook for this workflow.
         Sets up the webhook with Telegram using the bot token from config.
+        API failures are raised so the side-effect pool can retry them.
         """
         config = node.get("custom_config", {})
         encrypted_bot_token = config.get("bot_token")
@@ -46,15 +52,13 @@ class TelegramTriggerHandler(BaseNodeHandler):
         webhook_url = f"{self.ngrok_url}/telegram/webhook/{workflow_id}/{node_id}"
         
         # Register webhook with Telegram
-        try:
-            self._set_telegram_webhook(bot_token, webhook_url)
-            print(f"[TelegramHandler] ✅ Registered webhook for workflow {workflow_id}, node {node_id} with URL: {webhook_url}")
-        except Exception as e:
-            print(f"[TelegramHandler] ❌ Failed to register webhook for workflow {workflow_id}, node {node_id}: {e}")
+        self._set_telegram_webhook(bot_token, webhook_url)
+        print(f"[TelegramHandler] ✅ Registered webhook for workflow {workflow_id}, node {node_id} with URL: {webhook_url}")
 
     def cleanup(self, node: dict, workflow_id: int):
         """
         Remove Telegram webhook when workflow is deleted/deactivated.
+        API failures are raised so the side-effect pool can retry them.
         """
         config = node.get("custom_config", {})
         encrypted_bot_token = config.get("bot_token")
@@ -69,16 +73,13 @@ class TelegramTriggerHandler(BaseNodeHandler):
             print(f"[TelegramHandler] Failed to decrypt bot_token for cleanup of workflow {workflow_id}")
             return
         
-        try:
-            self._delete_telegram_webhook(bot_token)
-            print(f"[TelegramHandler] ✅ Removed webhook for workflow {workflow_id}")
-        except Exception as e:
-            print(f"[TelegramHandler] ⚠️ Failed to remove webhook for workflow {workflow_id}: {e}")
+        self._delete_telegram_webhook(bot_token)
+        print(f"[TelegramHandler] ✅ Removed webhook for workflow {workflow_id}")
 
     def _set_telegram_webhook(self, bot_token: str, webhook_url: str):
         """Set the webhook URL for a Telegram bot"""
         url = f"https://api.telegram.org/bot{bot_token}/setWebhook"
-        with httpx.Client() as client:
+        with httpx.Client(timeout=TELEGRAM_API_TIMEOUT) as client:
             response = client.post(url, json={"url": webhook_url})
             response.raise_for_status()
             result = response.json()
@@ -88,7 +89,7 @@ class TelegramTriggerHandler(BaseNodeHandler):
     def _delete_telegram_webhook(self, bot_token: str):
         """Delete the webhook for a Telegram bot"""
         url = f"https://api.telegram.org/bot{bot_token}/deleteWebhook"
-        with httpx.Client() as client:
+        with httpx.Client(timeout=TELEGRAM_API_TIMEOUT) as client:
             response = client.post(url, json={"drop_pending_updates": True})
             response.raise_for_status()
 
@@ -1,5 +1,6 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from api.v1 import workflow_routes
 from api.v1 import auth_routes
 from api.v1 import node_routes
@@ -8,12 +9,29 @@ from api.v1 import workflow_connection_routes
 from api.v1 import credentials_routes
 from api.v1 import telegram_routes
 from config import settings
+from core.redis_pool import close_pools, get_async_redis, get_redis, pool_metrics
+from dependencies import SessionLocal, async_engine, node_catalog
+from core.workflow_versions import WorkflowVersionTracker
+from auth_dependencies import require_metrics_token
+from services.outbox_relay import OutboxRelay
+from services.redis_service import RedisService
 import nodes  # SUPER NEEDED, IMPORTS AND REGISTER ALL THE NODES
 from alembic.config import Config
 from alembic import command
 
 app = FastAPI()
 
+# Publishes the lifecycle events services commit to the outbox table
+outbox_relay = OutboxRelay(
+    SessionLocal,
+    RedisService(get_redis()),
+    batch_size=settings.outbox_relay_batch_size,
+    interval_seconds=settings.outbox_relay_interval_seconds
+)
+
+# Bumps the version behind the full workflow endpoint's ETag on every committed change
+workflow_version_tracker = WorkflowVersionTracker(get_redis(), get_async_redis())
+
 
 @app.on_event("startup")
 async def run_migrations():
@@ -26,13 +44,55 @@ async def run_migrations():
         print(f"Warning: Failed to run migrations on startup: {e}")
         print("Please run migrations manually with: alembic upgrade head")
 
+
+@app.on_event("startup")
+async def load_node_catalog():
+    """Load node definitions once migrations have seeded them"""
+    try:
+        await run_in_threadpool(node_catalog.load)
+    except Exception as e:
+        # The catalog loads on first use instead
+        print(f"Warning: Failed to load the node catalog: {e}")
+
+
+@app.on_event("startup")
+async def start_outbox_relay():
+    outbox_relay.start()
+
+
+@app.on_event("startup")
+async def start_workflow_version_tracker():
+    workflow_version_tracker.start()
+
+
+# Shutdown handlers run in order: stop the relay before its pool closes
+@app.on_event("shutdown")
+async def stop_outbox_relay():
+    outbox_relay.stop()
+
+
+@app.on_event("shutdown")
+async def stop_workflow_version_tracker():
+    workflow_version_tracker.stop()
+
+
+@app.on_event("shutdown")
+async def close_redis_pools():
+    await close_pools()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await async_engine.dispose()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],  # Restricted to specific methods
-    allow_headers=["Authorization", "Content-Type", "Accept"],  # Explicit allowed headers
+    allow_headers=["Authorization", "Content-Type", "Accept", "If-None-Match"],  # Explicit allowed headers
+    expose_headers=["ETag"],
     max_age=600,  # Cache preflight requests for 10 minutes
 )
 
@@ -48,3 +108,9 @@ app.include_router(telegram_routes.router)
 @app.get("/ping")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics/redis", dependencies=[Depends(require_metrics_token)])
+def redis_pool_metrics():
+    """Connection usage of this API process's Redis pools; internal, needs METRICS_TOKEN"""
+    return pool_metrics()
@@ -4,20 +4,50 @@ from services.scheduler_runner import SchedulerRunner
 from services.workflow_event_handler import WorkflowEventHandler
 from services.scheduler_service import SchedulerService
 from services.node_processor_service import NodeProcessorService  # renamed service
+from services.schedule_reconciler import ScheduleReconciler
+from services.side_effect_pool import SideEffectPool
+from dependencies import SessionLocal
 from config import settings
 
 if __name__ == "__main__":
     # Redis repo
     redis_repo = RedisRepository(settings.redis_url)
     # Core services
-    scheduler_service = SchedulerService(redis_repo)
+    scheduler_service = SchedulerService(
+        redis_repo,
+        claim_batch_size=settings.scheduler_claim_batch_size,
+        cron_lookahead=settings.scheduler_cron_lookahead,
+        misfire_grace_seconds=settings.scheduler_misfire_grace_seconds,
+        misfire_max_catchup=settings.scheduler_misfire_max_catchup,
+        max_triggers_per_second=settings.scheduler_max_triggers_per_second,
+        shard_count=settings.scheduler_shard_count,
+        shard_lease_seconds=settings.scheduler_shard_lease_seconds,
+        wheel_horizon_seconds=settings.scheduler_wheel_horizon_seconds
+    )
+    scheduler_service.migrate_legacy_schedules()
+
+    # Rebuild schedules lost with Redis (flush, failover) from the database
+    reconciler = ScheduleReconciler(
+        SessionLocal,
+        scheduler_service,
+        interval_seconds=settings.scheduler_reconcile_interval_seconds
+    )
+    reconciler.reconcile()
+
     redis_service = RedisService(redis_repo.r)
     # event_click_service = EventClickService(...)  # optional for other categories
 
+    # Slow handler side effects (e.g. Telegram setWebhook) run here, not on the scheduler loop
+    side_effects = SideEffectPool(
+        max_workers=settings.scheduler_side_effect_workers,
+        max_retries=settings.scheduler_side_effect_retries
+    )
+
     # Node processor service (delegates nodes to the correct handler)
     node_processor_service = NodeProcessorService(
         scheduler_service=scheduler_service,
-        redis_service=redis_service
+        redis_service=redis_service,
+        side_effects=side_effects
     )
 
     # Workflow event handler
@@ -30,7 +60,8 @@ if __name__ == "__main__":
     runner = SchedulerRunner(
         scheduler_service=scheduler_service,
         event_handler=event_handler,
-        redis_repo=redis_repo
+        redis_repo=redis_repo,
+        reconciler=reconciler
     )
 
     runner.run_forever()
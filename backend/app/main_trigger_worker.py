@@ -26,6 +26,17 @@ if __name__ == "__main__":
     }
 
     # --- Build and run worker
-    worker = TriggerWorker(executor, settings.redis_url, services=services)
+    worker = TriggerWorker(
+        executor,
+        settings.redis_url,
+        services=services,
+        concurrency_lease_seconds=settings.trigger_concurrency_lease_seconds,
+        lane_weights=settings.trigger_lane_weights,
+        batch_size=settings.trigger_batch_size,
+        drain_grace_seconds=settings.trigger_drain_grace_seconds,
+        run_ttl_seconds=settings.workflow_run_ttl_seconds,
+        scheduled_shards=settings.scheduler_shard_count
+    )
+    worker.install_signal_handlers()
     logger.log("TriggerWorker listening...")
     worker.listen()
\ No newline at end of file
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, BigInteger, String, JSON, DateTime, func
+from .base import Base
+
+class OutboxEventDB(Base):
+    __tablename__ = "outbox_events"
+
+    # Relayed in id order. Writers hold the workflow's row lock from before the
+    # insert to the commit, so a workflow's ids follow its commit order
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    event_type = Column(String(100), nullable=False)     # e.g. "workflow_activated"
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,8 +1,9 @@
 import datetime
 import json
+import zlib
 
 class Schedule:
-    def __init__(self, workflow_id, next_run, interval_seconds=None, until=None, max_occurrences=None, occurrences=0, context=None):
+    def __init__(self, workflow_id, next_run, interval_seconds=None, until=None, max_occurrences=None, occurrences=0, context=None, max_concurrency=None, serialize_by=None, debounce_seconds=None, coalesce_by=None, cron=None, timezone=None, fire_times=None, misfire_policy=None, misfire_max_catchup=None, jitter_seconds=None):
         self.workflow_id = workflow_id
         self.next_run = next_run
         self.interval_seconds = interval_seconds
@@ -10,26 +11,106 @@ class Schedule:
         self.max_occurrences = max_occurrences
         self.occurrences = occurrences
         self.context = context or {}
+        self.max_concurrency = max_concurrency
+        self.serialize_by = serialize_by
+        self.debounce_seconds = debounce_seconds
+        self.coalesce_by = coalesce_by
+        self.cron = cron
+        self.timezone = timezone
+        self.fire_times = fire_times or []  # precomputed cron fire times, epoch seconds
+        self.misfire_policy = misfire_policy
+        self.misfire_max_catchup = misfire_max_catchup
+        self.jitter_seconds = jitter_seconds
 
     def to_dict(self):
+        # Stored as a Redis hash the scheduler's claim script reads server-side,
+        # so it carries epoch timestamps next to the ISO strings and keeps the
+        # context pre-encoded.
         return {
             "workflow_id": self.workflow_id,
             "next_run": self.next_run.isoformat(),
-            "interval_seconds": self.interval_seconds,
+            "next_run_ts": self.next_run_timestamp(),
+            "interval_seconds": float(self.interval_seconds) if self.interval_seconds else None,
             "until": self.until,
-            "max_occurrences": self.max_occurrences,
+            "until_ts": self.until_timestamp(),
+            "max_occurrences": int(self.max_occurrences) if self.max_occurrences else None,
             "occurrences": self.occurrences,
-            "context": self.context
+            "context": json.dumps(self.context),
+            "max_concurrency": self.max_concurrency,
+            "serialize_by": self.serialize_by,
+            "debounce_seconds": self.debounce_seconds,
+            "coalesce_by": self.coalesce_by,
+            "cron": self.cron,
+            "timezone": self.timezone,
+            "fire_times": json.dumps(self.fire_times) if self.cron else None,
+            "misfire_policy": self.misfire_policy,
+            "misfire_max_catchup": int(self.misfire_max_catchup) if self.misfire_max_catchup else None,
+            "jitter_seconds": float(self.jitter_seconds) if self.jitter_seconds else None
         }
 
+    @staticmethod
+    def spread_offset(workflow_id, window) -> float:
+        """
+        Deterministic offset in [0, window) for a workflow, so schedules created
+        with the same round interval don't all fire on the same second.
+        """
+        try:
+            window = float(window or 0)
+        except (TypeError, ValueError):
+            return 0.0
+        if window <= 0:
+            return 0.0
+        bucket = zlib.crc32(str(workflow_id).encode()) / 0xFFFFFFFF
+        return round(bucket * window, 3)
+
+    def next_run_timestamp(self) -> float:
+        next_run = self.next_run
+        if next_run.tzinfo is None:
+            next_run = next_run.replace(tzinfo=datetime.timezone.utc)
+        return next_run.timestamp()
+
+    def until_timestamp(self):
+        """Epoch seconds of `until`; 0 when it can't be parsed so the schedule stops after one run"""
+        if not self.until:
+            return None
+        try:
+            until_dt = datetime.datetime.fromisoformat(self.until.replace("Z", "+00:00"))
+        except Exception as e:
+            print(f"[Schedule] ⚠️ Failed to parse 'until' ({self.until}): {e}")
+            return 0
+        if until_dt.tzinfo is None:
+            until_dt = until_dt.replace(tzinfo=datetime.timezone.utc)
+        return until_dt.timestamp()
+
     @staticmethod
     def from_dict(data):
+        if data.get("next_run_ts") is not None:
+            next_run = datetime.datetime.fromtimestamp(float(data["next_run_ts"]), datetime.timezone.utc)
+        else:
+            next_run = datetime.datetime.fromisoformat(data["next_run"])
+        context = data.get("context")
+        if isinstance(context, str):
+            context = json.loads(context)
+        fire_times = data.get("fire_times")
+        if isinstance(fire_times, str):
+            fire_times = json.loads(fire_times)
         return Schedule(
-            workflow_id=data["workflow_id"],
-            next_run=datetime.datetime.fromisoformat(data["next_run"]),
+            workflow_id=int(data["workflow_id"]),
+            next_run=next_run,
             interval_seconds=data.get("interval_seconds"),
             until=data.get("until"),
             max_occurrences=data.get("max_occurrences"),
-            occurrences=data.get("occurrences", 0),
-            context=data.get("context")
+            occurrences=int(data.get("occurrences", 0)),
+            context=context,
+            max_concurrency=data.get("max_concurrency"),
+            serialize_by=data.get("serialize_by"),
+            debounce_seconds=data.get("debounce_seconds"),
+            coalesce_by=data.get("coalesce_by"),
+            cron=data.get("cron"),
+            timezone=data.get("timezone"),
+            # an empty Lua table comes back as "{}"
+            fire_times=fire_times if isinstance(fire_times, list) else None,
+            misfire_policy=data.get("misfire_policy"),
+            misfire_max_catchup=data.get("misfire_max_catchup"),
+            jitter_seconds=data.get("jitter_seconds")
         )
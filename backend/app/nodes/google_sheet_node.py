@@ -1,4 +1,5 @@
 import json
+import re
 from core.node_factory import NodeFactory
 from core.logger import Logger
 from google.oauth2.credentials import Credentials
@@ -22,7 +23,6 @@ class GoogleSheetsExecutor:
         # === Extract Services ===
         services = context.get("services", {})
         logger: Logger = services.get("logger")
-        user_credential_service: UserCredentialService = services.get("user_credentials")
 
         user_id = config.get("user_id")
         operation = config.get("operation")
@@ -30,25 +30,7 @@ class GoogleSheetsExecutor:
         if not user_id or not operation:
             raise ValueError("Missing required config keys: 'user_id' and 'operation'")
 
-        # === Load User Credentials ===
-        creds_data = user_credential_service.get_credentials(user_id)
-        if not creds_data:
-            raise ValueError(f"No Google credentials found for user_id {user_id}")
-
-        client_id = settings.google_client_id
-        client_secret = settings.google_client_secret
-            
-        credentials = Credentials(
-            token=creds_data["access_token"],
-            refresh_token=creds_data.get("refresh_token"),
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=client_id,
-            client_secret=client_secret,
-            scopes=[creds_data.get("scope", "https://www.googleapis.com/auth/spreadsheets")]
-        )
-
-        service = build("sheets", "v4", credentials=credentials)
-        sheets = service.spreadsheets()
+        credentials, sheets = GoogleSheetsExecutor._build_sheets(user_id, services)
 
         logger.log(f"[GoogleSheetsNode] Running operation '{operation}'")
 
@@ -95,8 +77,90 @@ class GoogleSheetsExecutor:
             logger.log(f"[GoogleSheetsNode] Error: {e}")
             raise
 
+    @staticmethod
+    def run_batch(configs, contexts):
+        """
+        Run a micro-batch of items. `append_row` items that target the same
+        spreadsheet range are sent as one append request; every other item
+        runs on its own. Returns one result (or Exception) per item; an item
+        with bad input fails alone, and each appended item gets the part of
+        the response covering its own rows.
+        """
+        results = [None] * len(configs)
+        appends = {}
+
+        for i, config in enumerate(configs):
+            if config.get("operation") == "append_row" and config.get("user_id") and config.get("range"):
+                try:
+                    key = (
+                        config.get("user_id"),
+                        GoogleSheetsExecutor._extract_spreadsheet_id(config),
+                        config["range"],
+                    )
+                    GoogleSheetsExecutor._validate_rows(config.get("values"))
+                    appends.setdefault(key, []).append(i)
+                except Exception as e:
+                    results[i] = e
+                continue
+            try:
+                results[i] = GoogleSheetsExecutor.run(config, contexts[i])
+            except Exception as e:
+                results[i] = e
+
+        for (user_id, spreadsheet_id, range_name), indexes in appends.items():
+            services = contexts[indexes[0]].get("services", {})
+            logger: Logger = services.get("logger")
+            try:
+                _, sheets = GoogleSheetsExecutor._build_sheets(user_id, services)
+                values = []
+                for i in indexes:
+                    values.extend(configs[i]["values"])
+                logger.log(f"[GoogleSheetsNode] Appending {len(values)} rows from {len(indexes)} items in one request")
+                response = sheets.values().append(
+                    spreadsheetId=spreadsheet_id,
+                    range=range_name,
+                    valueInputOption="RAW",
+                    body={"values": values}
+                ).execute()
+                offset = 0
+                for i in indexes:
+                    rows = configs[i]["values"]
+                    results[i] = GoogleSheetsExecutor._slice_append_response(response, offset, rows)
+                    offset += len(rows)
+            except Exception as e:
+                logger.log(f"[GoogleSheetsNode] Batched append failed: {e}")
+                for i in indexes:
+                    results[i] = e
+
+        return results
+
     # === Helper Methods ===
 
+    @staticmethod
+    def _build_sheets(user_id, services):
+        """Build an authorized Sheets resource for the user; returns (credentials, sheets)"""
+        user_credential_service: UserCredentialService = services.get("user_credentials")
+
+        # === Load User Credentials ===
+        creds_data = user_credential_service.get_credentials(user_id)
+        if not creds_data:
+            raise ValueError(f"No Google credentials found for user_id {user_id}")
+
+        client_id = settings.google_client_id
+        client_secret = settings.google_client_secret
+            
+        credentials = Credentials(
+            token=creds_data["access_token"],
+            refresh_token=creds_data.get("refresh_token"),
+            token_uri="https://oauth2.googleapis.com/token",
+            client_id=client_id,
+            client_secret=client_secret,
+            scopes=[creds_data.get("scope", "https://www.googleapis.com/auth/spreadsheets")]
+        )
+
+        service = build("sheets", "v4", credentials=credentials)
+        return credentials, service.spreadsheets()
+
     @staticmethod
     def _create_spreadsheet(sheets, config):
         title = config.get("title", "New Spreadsheet")
@@ -225,6 +289,34 @@ class GoogleSheetsExecutor:
 
     # === Helpers ===
 
+    @staticmethod
+    def _validate_rows(values):
+        """`values` must be a list of rows, each a list of cells"""
+        if not isinstance(values, list) or not values:
+            raise ValueError("'values' must be a non-empty list of rows")
+        if not all(isinstance(row, list) for row in values):
+            raise ValueError("Each entry of 'values' must be a row (a list of cells)")
+
+    @staticmethod
+    def _slice_append_response(response, offset, rows):
+        """
+        The append response as it would read for `rows` alone, appended
+        `offset` rows into the batched request.
+        """
+        updates = dict(response.get("updates") or {})
+        updates["updatedRows"] = len(rows)
+        updates["updatedCells"] = sum(len(row) for row in rows)
+        updates["updatedColumns"] = max((len(row) for row in rows), default=0)
+
+        # e.g. "Sheet1!A5:C9" -> "Sheet1!A7:C8"
+        match = re.match(r"^(.*!)?([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?$", updates.get("updatedRange") or "")
+        if match:
+            sheet, first_col, first_row, last_col = match.group(1) or "", match.group(2), int(match.group(3)), match.group(4)
+            start = first_row + offset
+            updates["updatedRange"] = f"{sheet}{first_col}{start}:{last_col or first_col}{start + len(rows) - 1}"
+
+        return {**response, "updates": updates}
+
     @staticmethod
     def _extract_spreadsheet_id(config):
         """
@@ -1,10 +1,14 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from core.node_factory import NodeFactory
 from core.logger import Logger
 from services.user_credential_service import UserCredentialService
 from openai import OpenAI
 from openai import APIError, APIConnectionError, APITimeoutError, RateLimitError
 
+# Concurrent completions per user within one micro-batch
+LLM_BATCH_CONCURRENCY = 8
+
 
 def _load_format_output(config):
     format_output = config.get("format_output")
@@ -48,27 +52,56 @@ class LLMExecutor:
         # === Extract Services ===
         services = context.get("services", {})
         logger: Logger = services.get("logger")
-        user_credential_service: UserCredentialService = services.get("user_credentials")
 
-        user_id = config.get("user_id")
-        prompt = config.get("prompt")
-        model = config.get("model", "gpt-3.5-turbo")
-        temperature = config.get("temperature", 0.7)
-        max_tokens = config.get("max_tokens")
-        system_prompt = config.get("system_prompt")
-        format_output_schema = _load_format_output(config)
+        api_key = LLMExecutor._load_api_key(config, services)
+        logger.log(f"[LLMNode] Making request to OpenAI with model '{config.get('model', 'gpt-3.5-turbo')}'")
 
-        if format_output_schema:
-            json_instruction = "You must respond with valid JSON that matches the expected schema."
-            if system_prompt:
-                system_prompt = f"{system_prompt.strip()}\n\n{json_instruction}"
-            else:
-                system_prompt = json_instruction
+        # === Initialize OpenAI Client ===
+        client = OpenAI(api_key=api_key)
+        return LLMExecutor._complete(client, config, logger)
+
+    @staticmethod
+    def run_batch(configs, contexts):
+        """
+        Run a micro-batch of items. Credentials are loaded and the OpenAI client
+        is built once per user, and the chat completions (which take a single
+        conversation each) are sent concurrently over that client.
+        Returns one result (or Exception) per item.
+        """
+        results = [None] * len(configs)
+        by_user = {}
+        for i, config in enumerate(configs):
+            by_user.setdefault(config.get("user_id"), []).append(i)
+
+        for user_id, indexes in by_user.items():
+            services = contexts[indexes[0]].get("services", {})
+            logger: Logger = services.get("logger")
+            try:
+                api_key = LLMExecutor._load_api_key(configs[indexes[0]], services)
+            except Exception as e:
+                for i in indexes:
+                    results[i] = e
+                continue
+
+            logger.log(f"[LLMNode] Sending {len(indexes)} batched requests to OpenAI for user {user_id}")
+            client = OpenAI(api_key=api_key)
+            with ThreadPoolExecutor(max_workers=min(len(indexes), LLM_BATCH_CONCURRENCY)) as pool:
+                futures = {i: pool.submit(LLMExecutor._complete, client, configs[i], logger) for i in indexes}
+                for i, future in futures.items():
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        results[i] = e
+
+        return results
+
+    @staticmethod
+    def _load_api_key(config, services):
+        user_credential_service: UserCredentialService = services.get("user_credentials")
 
+        user_id = config.get("user_id")
         if not user_id:
             raise ValueError("Missing required config key: 'user_id'")
-        if not prompt:
-            raise ValueError("Missing required config key: 'prompt'")
 
         # === Load User Credentials ===
         # Get OpenAI credentials by user_id and service
@@ -82,11 +115,26 @@ class LLMExecutor:
         
         if not api_key:
             raise ValueError("OpenAI API key not found in credentials")
+        return api_key
+
+    @staticmethod
+    def _complete(client, config, logger: Logger):
+        prompt = config.get("prompt")
+        model = config.get("model", "gpt-3.5-turbo")
+        temperature = config.get("temperature", 0.7)
+        max_tokens = config.get("max_tokens")
+        system_prompt = config.get("system_prompt")
+        format_output_schema = _load_format_output(config)
 
-        logger.log(f"[LLMNode] Making request to OpenAI with model '{model}'")
+        if format_output_schema:
+            json_instruction = "You must respond with valid JSON that matches the expected schema."
+            if system_prompt:
+                system_prompt = f"{system_prompt.strip()}\n\n{json_instruction}"
+            else:
+                system_prompt = json_instruction
 
-        # === Initialize OpenAI Client ===
-        client = OpenAI(api_key=api_key)
+        if not prompt:
+            raise ValueError("Missing required config key: 'prompt'")
 
         # === Build messages array ===
         messages = []
@@ -4,9 +4,10 @@ from core.node_factory import NodeFactory
 class SchedulerNodeExecutor:
     @staticmethod
     def get_trigger_metadata(config):
-        """Return cron expression from config for workflow registration"""
+        """Return cron expression and its time zone from config for workflow registration"""
         return {
             "cron": config.get("cron"),
+            "timezone": config.get("timezone"),
         }
 
     @staticmethod
@@ -10,6 +10,26 @@ class TelegramTriggerNodeExecutor:
             "workflow_id": config.get("workflow_id"),
         }
 
+    @staticmethod
+    def expand_context(context):
+        """Rebuild the trigger outputs from the compact context the webhook enqueues"""
+        update = context.get("update") or {}
+        message = update.get("message") or {}
+        chat = message.get("chat") or {}
+        expanded = {
+            **context,
+            "message": message,
+            "chat_id": chat.get("id"),
+            "text": message.get("text"),
+            "from_user": message.get("from"),
+            "chat": chat,
+            "date": message.get("date"),
+        }
+        # Debounced runs carry every merged context
+        if "events" in context:
+            expanded["events"] = [TelegramTriggerNodeExecutor.expand_context(event) for event in context["events"]]
+        return expanded
+
     @staticmethod
     def run(config, context):
         # This should never run at runtime
@@ -0,0 +1,17 @@
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
+from models.db_models.outbox_event_db import OutboxEventDB
+from repositories.sqlalchemy_outbox_repository import OUTBOX_PENDING
+
+class AsyncSqlAlchemyOutboxRepository:
+    """Stages outbox events on an async session; OutboxRelay publishes them"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def add(self, event_type: str, payload: dict) -> None:
+        """
+        Stage an event; it commits with the repository call that commits the
+        change. Callers hold the workflow's row lock (get_for_update) first.
+        """
+        self.session.add(OutboxEventDB(event_type=event_type, payload=payload))
+        self.session.info[OUTBOX_PENDING] = True
@@ -0,0 +1,12 @@
+# repositories/async_sqlalchemy_user_repository.py
+from sqlalchemy import select # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
+from models.db_models.user_db import UserDB
+
+class AsyncSqlAlchemyUserRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_email(self, email: str):
+        result = await self.db.execute(select(UserDB).where(UserDB.email == email))
+        return result.scalars().first()
@@ -0,0 +1,108 @@
+from typing import List, Optional
+from sqlalchemy import select # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
+from models.db_models.workflow_nodes import WorkflowNode as WorkflowNodeDB
+from models.schemas.workflow_node import WorkflowNodeCreate, WorkflowNodeSchema
+from models.db_models.node_db import Node
+
+class AsyncSqlAlchemyWorkflowNodeRepository:
+    """Async counterpart of SqlAlchemyWorkflowNodeRepository for the async routes"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    # ------------------------
+    # Getters
+    # ------------------------
+    async def get_by_id(self, node_id: int) -> Optional[WorkflowNodeSchema]:
+        node_db = await self.session.get(WorkflowNodeDB, node_id)
+        return WorkflowNodeSchema.from_orm(node_db) if node_db else None
+
+    async def get_for_update(self, node_id: int) -> Optional[WorkflowNodeSchema]:
+        """Current row, locked until the transaction ends; take the workflow's lock first"""
+        result = await self.session.execute(
+            select(WorkflowNodeDB)
+            .where(WorkflowNodeDB.id == node_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        node_db = result.scalar_one_or_none()
+        return WorkflowNodeSchema.from_orm(node_db) if node_db else None
+
+    async def list_by_workflow(self, workflow_id: int) -> List[WorkflowNodeSchema]:
+        result = await self.session.execute(
+            select(WorkflowNodeDB).where(WorkflowNodeDB.workflow_id == workflow_id)
+        )
+        return [WorkflowNodeSchema.from_orm(node) for node in result.scalars().all()]
+
+    async def list_by_workflow_and_type(self, workflow_id: int, node_type: str) -> List[WorkflowNodeSchema]:
+        result = await self.session.execute(
+            select(WorkflowNodeDB, Node.type, Node.category)
+            .join(Node, WorkflowNodeDB.node_id == Node.id)
+            .where(
+                WorkflowNodeDB.workflow_id == workflow_id,
+                Node.type == node_type  # e.g. "trigger" or "action"
+            )
+            .order_by(WorkflowNodeDB.id)
+        )
+
+        nodes = []
+        for node_db, type_value, category_value in result.all():
+            node_schema = WorkflowNodeSchema.from_orm(node_db)
+            node_schema.node_type = type_value
+            node_schema.node_category = category_value
+            nodes.append(node_schema)
+
+        return nodes
+
+    # ------------------------
+    # Create
+    # ------------------------
+    async def add(self, node_data: WorkflowNodeCreate) -> WorkflowNodeSchema:
+        node_db = WorkflowNodeDB(**node_data.dict())
+        self.session.add(node_db)
+        await self.session.commit()
+        await self.session.refresh(node_db)
+
+        # Fetch related Node info
+        node_info = await self.session.get(Node, node_db.node_id)
+
+        node_schema = WorkflowNodeSchema.from_orm(node_db)
+        if node_info:
+            node_schema.node_type = node_info.type
+            node_schema.node_category = node_info.category
+
+        return node_schema
+
+    # ------------------------
+    # Update
+    # ------------------------
+    async def update(self, workflow_node: WorkflowNodeSchema) -> Optional[WorkflowNodeSchema]:
+        node_db = await self.session.get(WorkflowNodeDB, workflow_node.id)
+        if not node_db:
+            return None
+
+        # Update only if the field is not None
+        if workflow_node.name is not None:
+            node_db.name = workflow_node.name
+        if workflow_node.position_x is not None:
+            node_db.position_x = workflow_node.position_x
+        if workflow_node.position_y is not None:
+            node_db.position_y = workflow_node.position_y
+        if workflow_node.custom_config is not None:
+            node_db.custom_config = workflow_node.custom_config
+
+        await self.session.commit()
+        await self.session.refresh(node_db)
+        return WorkflowNodeSchema.from_orm(node_db)
+
+    # ------------------------
+    # Delete
+    # ------------------------
+    async def delete(self, node_id: int) -> bool:
+        node_db = await self.session.get(WorkflowNodeDB, node_id)
+        if not node_db:
+            return False
+        await self.session.delete(node_db)
+        await self.session.commit()
+        return True
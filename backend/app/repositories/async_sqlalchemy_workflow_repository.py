@@ -0,0 +1,43 @@
+from typing import Optional
+from sqlalchemy import select # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
+from sqlalchemy.orm import selectinload # type: ignore
+from models.db_models.workflow_db import WorkflowDB
+from models.db_models.workflow_nodes import WorkflowNode
+from models.schemas.workflow import Workflow
+
+class AsyncSqlAlchemyWorkflowRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_id(self, workflow_id: int) -> Optional[Workflow]:
+        wf = await self.session.get(WorkflowDB, workflow_id)
+        return Workflow.from_orm(wf) if wf else None
+
+    async def get_for_update(self, workflow_id: int) -> Optional[Workflow]:
+        """Current row, locked until the transaction ends; see SqlAlchemyWorkflowRepository"""
+        result = await self.session.execute(
+            select(WorkflowDB)
+            .where(WorkflowDB.id == workflow_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        wf = result.scalar_one_or_none()
+        return Workflow.from_orm(wf) if wf else None
+
+    async def get_full(self, workflow_id: int, user_id: Optional[int] = None) -> Optional[WorkflowDB]:
+        """
+        Workflow with its nodes (and their Node definitions) and connections,
+        eagerly loaded. With `user_id`, only if that user owns it.
+        """
+        query = select(WorkflowDB).where(WorkflowDB.id == workflow_id)
+        if user_id is not None:
+            query = query.where(WorkflowDB.user_id == user_id)
+        result = await self.session.execute(
+            query
+            .options(
+                selectinload(WorkflowDB.nodes).selectinload(WorkflowNode.node),
+                selectinload(WorkflowDB.connections),
+            )
+        )
+        return result.scalar_one_or_none()
@@ -1,25 +1,37 @@
-import redis
-from config import settings
+from core.redis_pool import get_redis
 
 class RedisRepository:
     def __init__(self, redis_url=None):
-        if redis_url:
-            self.r = redis.Redis.from_url(redis_url)
-        else:
-            self.r = redis.Redis.from_url(settings.redis_url)
+        # Shares the process-wide pool; defaults to settings.redis_url
+        self.r = get_redis(redis_url)
 
     def zadd(self, key, mapping):
         self.r.zadd(key, mapping)
 
-    def zrange(self, key, start, end):
-        return self.r.zrange(key, start, end)
+    def zrange(self, key, start, end, withscores=False):
+        return self.r.zrange(key, start, end, withscores=withscores)
 
-    def zrangebyscore(self, key, min_score, max_score):
-        return self.r.zrangebyscore(key, min_score, max_score)
+    def zrangebyscore(self, key, min_score, max_score, withscores=False):
+        return self.r.zrangebyscore(key, min_score, max_score, withscores=withscores)
 
     def zrem(self, key, value):
         self.r.zrem(key, value)
 
+    def zscan_iter(self, key):
+        return self.r.zscan_iter(key)
+
+    def scan_iter(self, match=None):
+        return self.r.scan_iter(match=match)
+
+    def smembers(self, key):
+        return self.r.smembers(key)
+
+    def hgetall(self, key):
+        return self.r.hgetall(key)
+
+    def pipeline(self, transaction=True):
+        return self.r.pipeline(transaction=transaction)
+
     def xadd(self, stream, mapping):
         self.r.xadd(stream, mapping)
 
@@ -0,0 +1,49 @@
+from typing import List
+from sqlalchemy import text # type: ignore
+from sqlalchemy.orm import Session # type: ignore
+from models.db_models.outbox_event_db import OutboxEventDB
+
+# Set on a session that staged outbox events, so the relay is woken on commit
+OUTBOX_PENDING = "outbox_pending"
+# Transaction-scoped advisory lock held by the relay publishing a batch
+OUTBOX_RELAY_LOCK_ID = 0x6F7574626F78  # "outbox"
+
+class SqlAlchemyOutboxRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, event_type: str, payload: dict) -> None:
+        """
+        Stage an event in the current transaction. It is not committed here:
+        the repository call that commits the change it describes commits it too.
+        Callers hold the workflow's row lock (get_for_update) first.
+        """
+        self.session.add(OutboxEventDB(event_type=event_type, payload=payload))
+        self.session.info[OUTBOX_PENDING] = True
+
+    def claim_batch(self, limit: int) -> List[OutboxEventDB]:
+        """
+        Committed events by id, locked until the transaction ends. Returns
+        nothing while another relay holds the relay lock, so API processes
+        don't publish batches concurrently. Events of other workflows may be
+        claimed out of commit order, never skipped: rows are deleted, not
+        tracked by a high-water mark.
+        """
+        locked = self.session.execute(
+            text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": OUTBOX_RELAY_LOCK_ID}
+        ).scalar()
+        if not locked:
+            return []
+        return (
+            self.session.query(OutboxEventDB)
+            .order_by(OutboxEventDB.id)
+            .limit(limit)
+            .with_for_update()
+            .all()
+        )
+
+    def delete(self, events: List[OutboxEventDB]) -> None:
+        self.session.query(OutboxEventDB).filter(
+            OutboxEventDB.id.in_([event.id for event in events])
+        ).delete(synchronize_session=False)
+        self.session.commit()
@@ -38,3 +38,15 @@ class SqlAlchemyUserCredentialRepository:
             .filter(UserCredentialDB.service == service)
             .first()
         )
+
+    def list_by_user_and_services(self, user_id: int, services: List[str]) -> List[UserCredentialDB]:
+        """Credentials of a user for any of `services`, oldest first"""
+        if not services:
+            return []
+        return (
+            self.db.query(UserCredentialDB)
+            .filter(UserCredentialDB.user_id == user_id)
+            .filter(UserCredentialDB.service.in_(services))
+            .order_by(UserCredentialDB.id)
+            .all()
+        )
@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
 from models.db_models.workflow_nodes import WorkflowNode as WorkflowNodeDB
 from models.schemas.workflow_node import WorkflowNodeCreate, WorkflowNodeSchema
 from models.db_models.node_db import Node
+from models.db_models.workflow_db import WorkflowDB
+from core.workflow_versions import mark_workflow_changed
 
 class SqlAlchemyWorkflowNodeRepository:
     def __init__(self, session: Session):
@@ -15,6 +17,17 @@ class SqlAlchemyWorkflowNodeRepository:
         node_db = self.session.query(WorkflowNodeDB).get(node_id)  # ✅ ORM model
         return WorkflowNodeSchema.from_orm(node_db) if node_db else None
 
+    def get_for_update(self, node_id: int) -> Optional[WorkflowNodeSchema]:
+        """Current row, locked until the transaction ends; take the workflow's lock first"""
+        node_db = (
+            self.session.query(WorkflowNodeDB)
+            .filter(WorkflowNodeDB.id == node_id)
+            .populate_existing()
+            .with_for_update()
+            .one_or_none()
+        )
+        return WorkflowNodeSchema.from_orm(node_db) if node_db else None
+
     def list_by_workflow(self, workflow_id: int) -> List[WorkflowNodeSchema]:
         nodes_db = (
             self.session.query(WorkflowNodeDB)  # ✅ ORM model
@@ -43,6 +56,26 @@ class SqlAlchemyWorkflowNodeRepository:
 
         return result
 
+    def list_active_triggers(self, category: Optional[str] = None) -> List[WorkflowNodeSchema]:
+        """Trigger nodes of every active workflow, in one query"""
+        query = (
+            self.session.query(WorkflowNodeDB, Node.type, Node.category)
+            .join(Node, WorkflowNodeDB.node_id == Node.id)
+            .join(WorkflowDB, WorkflowNodeDB.workflow_id == WorkflowDB.id)
+            .filter(WorkflowDB.is_active.is_(True), Node.type == "trigger")
+        )
+        if category:
+            query = query.filter(Node.category == category)
+
+        result = []
+        for node_db, type_value, category_value in query.all():
+            node_schema = WorkflowNodeSchema.from_orm(node_db)
+            node_schema.node_type = type_value
+            node_schema.node_category = category_value
+            result.append(node_schema)
+
+        return result
+
     # ------------------------
     # Create
     # ------------------------
@@ -107,4 +140,5 @@ class SqlAlchemyWorkflowNodeRepository:
         self.session.query(WorkflowNodeDB).filter(
             WorkflowNodeDB.workflow_id == workflow_id
         ).delete(synchronize_session=False)
+        mark_workflow_changed(self.session, workflow_id)
         self.session.commit()
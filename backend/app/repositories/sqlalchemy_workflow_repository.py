@@ -12,6 +12,21 @@ class SqlAlchemyWorkflowRepository(WorkflowRepository):
         wf = self.session.query(WorkflowDB).get(workflow_id)
         return Workflow.from_orm(wf) if wf else None
 
+    def get_for_update(self, workflow_id: int) -> Optional[Workflow]:
+        """
+        Current row, locked until the transaction ends. Transactions that stage
+        outbox events for a workflow take this first, so their events are
+        inserted (and numbered) in the order they commit.
+        """
+        wf = (
+            self.session.query(WorkflowDB)
+            .filter(WorkflowDB.id == workflow_id)
+            .populate_existing()
+            .with_for_update()
+            .one_or_none()
+        )
+        return Workflow.from_orm(wf) if wf else None
+
     def add(self, workflow: Workflow) -> None:
         wf_db = WorkflowDB(**workflow.dict())
         self.session.add(wf_db)
@@ -7,6 +7,10 @@ class WorkflowRepository(ABC):
     def get_by_id(self, workflow_id: int) -> Optional[Workflow]:
         pass
 
+    @abstractmethod
+    def get_for_update(self, workflow_id: int) -> Optional[Workflow]:
+        pass
+
     @abstractmethod
     def add(self, workflow: Workflow) -> None:
         pass
@@ -0,0 +1,74 @@
+from core.events import WORKFLOW_DELETED, WORKFLOW_UPDATED
+from fastapi import HTTPException # type: ignore
+from typing import List, Optional
+from models.schemas.workflow_node import WorkflowNodeCreate, WorkflowNodeUpdate, WorkflowNodeSchema
+from repositories.async_sqlalchemy_workflow_node_repository import AsyncSqlAlchemyWorkflowNodeRepository
+from core.node_catalog import NodeCatalog
+from repositories.async_sqlalchemy_workflow_repository import AsyncSqlAlchemyWorkflowRepository
+from repositories.async_sqlalchemy_outbox_repository import AsyncSqlAlchemyOutboxRepository
+from services.workflow_node_service import WorkflowNodeService
+
+class AsyncWorkflowNodeService:
+    """
+    Workflow node CRUD for the async routes. Shares the create/update rules
+    with WorkflowNodeService; only the I/O differs.
+    """
+
+    def __init__(
+            self,
+            workflow_node_repo: AsyncSqlAlchemyWorkflowNodeRepository,
+            node_catalog: NodeCatalog,
+            workflow_repo: AsyncSqlAlchemyWorkflowRepository,
+            outbox_repo: AsyncSqlAlchemyOutboxRepository,
+        ):
+        self.workflow_node_repo = workflow_node_repo
+        self.node_catalog = node_catalog
+        self.workflow_repo = workflow_repo
+        self.outbox_repo = outbox_repo
+
+    async def get_node(self, node_id: int) -> Optional[WorkflowNodeSchema]:
+        return await self.workflow_node_repo.get_by_id(node_id)
+
+    async def list_nodes_for_workflow(self, workflow_id: int) -> List[WorkflowNodeSchema]:
+        return await self.workflow_node_repo.list_by_workflow(workflow_id)
+
+    async def create_node(self, node_data: WorkflowNodeCreate) -> WorkflowNodeSchema:
+        if not node_data.name or len(node_data.name.strip()) == 0:
+            raise ValueError("Node name cannot be empty.")
+
+        db_node = await self.node_catalog.get_node_async(node_data.node_id)
+        if not db_node:
+            raise HTTPException(status_code=404, detail="Node not found")
+
+        node_data.custom_config = WorkflowNodeService.default_custom_config(db_node)
+        return await self.workflow_node_repo.add(node_data)
+
+    async def update_node(self, node_id: int, update_data: WorkflowNodeUpdate) -> Optional[WorkflowNodeSchema]:
+        node = await self.workflow_node_repo.get_by_id(node_id)
+        if not node:
+            return None
+
+        # Lock order and re-read as in WorkflowNodeService.update_node
+        workflow = await self.workflow_repo.get_for_update(node.workflow_id)
+        node = await self.workflow_node_repo.get_for_update(node_id)
+        if not node:
+            return None
+        db_node = await self.node_catalog.get_node_async(node.node_id)
+
+        event_payload = WorkflowNodeService.apply_update(node, update_data, workflow, db_node)
+        if event_payload:
+            # Staged, committed with the update
+            self.outbox_repo.add(WORKFLOW_UPDATED, event_payload)
+
+        return await self.workflow_node_repo.update(node)
+
+    async def delete_node(self, node_id: int) -> bool:
+        node = await self.workflow_node_repo.get_by_id(node_id)
+        if not node:
+            return False
+
+        # Notify the schedulers that a workflow node was deleted; committed with the
+        # delete, under the workflow's lock so it is numbered in commit order
+        await self.workflow_repo.get_for_update(node.workflow_id)
+        self.outbox_repo.add(WORKFLOW_DELETED, {"workflow_id": node.workflow_id})
+        return await self.workflow_node_repo.delete(node_id)
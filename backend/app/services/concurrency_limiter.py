@@ -0,0 +1,175 @@
+import time
+from typing import List, Optional, Tuple
+from redis import Redis # type: ignore
+import msgpack # type: ignore
+
+CONCURRENCY_KEY_PREFIX = "workflow_concurrency"
+
+# Wait list entries are the deferred entry's stream fields as a msgpack map,
+# which keeps a binary context intact; entries parked before that are JSON.
+_DECODE_WAITING = """
+local function decode_waiting(head)
+    if string.sub(head, 1, 1) == '{' then
+        return cjson.decode(head)
+    end
+    return cmsgpack.unpack(head)
+end
+"""
+
+# Gate acquisition. A gate is a sorted set of lease tokens (scored by the time
+# they were taken) plus a FIFO wait list of deferred stream entries. An entry
+# that can't get the gate is parked in the same step, so a release can't run
+# between the check and the park and leave it waiting with nobody to wake it.
+#   KEYS: [gate, waitlist, stream]
+#   ARGV: [token, now, lease_seconds, limit, promoted, parked_entry]
+_ACQUIRE_SCRIPT = _DECODE_WAITING + """
+local function park()
+    if ARGV[5] == '1' then
+        -- A promoted entry that lost the race keeps its place at the head
+        redis.call('LPUSH', KEYS[2], ARGV[6])
+    else
+        redis.call('RPUSH', KEYS[2], ARGV[6])
+    end
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', tonumber(ARGV[2]) - tonumber(ARGV[3]))
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+    return 1
+end
+local free = redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[4])
+if ARGV[5] ~= '1' and redis.call('LLEN', KEYS[2]) > 0 then
+    -- Older entries are waiting: keep FIFO order. If their holder's lease
+    -- expired nobody is going to release them, so wake the head up here.
+    if free then
+        local head = redis.call('LPOP', KEYS[2])
+        local fields = decode_waiting(head)
+        local args = {}
+        for k, v in pairs(fields) do
+            table.insert(args, k)
+            table.insert(args, tostring(v))
+        end
+        table.insert(args, 'promoted_gate')
+        table.insert(args, KEYS[1])
+        redis.call('XADD', KEYS[3], '*', unpack(args))
+    end
+    park()
+    return 0
+end
+if free then
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+    return 1
+end
+park()
+return 0
+"""
+
+# Gate release: drops the lease and re-enqueues the oldest deferred entry.
+#   KEYS: [gate, waitlist, stream]
+#   ARGV: [token]
+_RELEASE_SCRIPT = _DECODE_WAITING + """
+redis.call('ZREM', KEYS[1], ARGV[1])
+local head = redis.call('LPOP', KEYS[2])
+if head then
+    local fields = decode_waiting(head)
+    local args = {}
+    for k, v in pairs(fields) do
+        table.insert(args, k)
+        table.insert(args, tostring(v))
+    end
+    table.insert(args, 'promoted_gate')
+    table.insert(args, KEYS[1])
+    redis.call('XADD', KEYS[3], '*', unpack(args))
+    return 1
+end
+return 0
+"""
+
+
+def concurrency_fields(config: Optional[dict], context: Optional[dict]) -> dict:
+    """
+    Build the stream fields that carry a trigger node's concurrency settings.
+
+    `max_concurrency` bounds how many runs of the workflow execute at once and
+    `serialize_by` names a context field (e.g. "chat_id") whose value runs
+    one-at-a-time, in arrival order.
+    """
+    config = config or {}
+    context = context or {}
+    fields = {}
+
+    max_concurrency = config.get("max_concurrency")
+    if max_concurrency:
+        try:
+            if int(max_concurrency) > 0:
+                fields["max_concurrency"] = str(int(max_concurrency))
+        except (TypeError, ValueError):
+            print(f"[ConcurrencyLimiter] ⚠️ Ignoring invalid max_concurrency: {max_concurrency}")
+
+    serialize_by = config.get("serialize_by")
+    if serialize_by and context.get(serialize_by) is not None:
+        fields["concurrency_key"] = str(context.get(serialize_by))
+
+    return fields
+
+
+class ConcurrencyLimiter:
+    """
+    Redis-backed semaphores that bound concurrent runs of a workflow.
+
+    Entries that cannot get a slot are parked in a per-gate wait list and are
+    put back on the stream, oldest first, when a slot is released.
+    """
+
+    def __init__(self, redis_client: Redis, lease_seconds: int = 600):
+        self.r = redis_client
+        self.lease_seconds = lease_seconds
+        self._acquire = self.r.register_script(_ACQUIRE_SCRIPT)
+        self._release = self.r.register_script(_RELEASE_SCRIPT)
+
+    def gates_for(self, workflow_id: int, fields: dict) -> List[Tuple[str, int]]:
+        """
+        Return the (gate_key, limit) pairs an entry must hold, in acquisition order.
+        The per-key gate comes first so that entries waiting on the workflow-wide
+        limit already hold their place in the per-key order.
+        """
+        gates = []
+        concurrency_key = fields.get("concurrency_key")
+        if concurrency_key:
+            gates.append((f"{CONCURRENCY_KEY_PREFIX}:{workflow_id}:key:{concurrency_key}", 1))
+
+        max_concurrency = fields.get("max_concurrency")
+        if max_concurrency:
+            gates.append((f"{CONCURRENCY_KEY_PREFIX}:{workflow_id}", int(max_concurrency)))
+        return gates
+
+    def acquire(self, stream: str, workflow_id: int, token: str, fields: dict) -> Optional[str]:
+        """
+        Try to take every gate the entry needs.
+
+        Returns None when the run may start, otherwise the gate that is full;
+        the entry has then been parked on that gate's wait list.
+        """
+        promoted_gate = fields.get("promoted_gate")
+        now = time.time()
+        # What goes on a wait list if a gate is full
+        parked_entry = msgpack.packb(
+            {k: v for k, v in fields.items() if k != "promoted_gate"}, use_bin_type=True
+        )
+
+        for gate, limit in self.gates_for(workflow_id, fields):
+            waitlist = f"{gate}:waiting"
+            promoted = "1" if promoted_gate == gate else "0"
+            acquired = self._acquire(
+                keys=[gate, waitlist, stream],
+                args=[token, now, self.lease_seconds, limit, promoted, parked_entry],
+            )
+            if not acquired:
+                # Already parked on the wait list by the script
+                return gate
+        return None
+
+    def release(self, stream: str, workflow_id: int, token: str, fields: dict):
+        """Give back every gate held by the entry and wake up the next waiter of each."""
+        for gate, _ in self.gates_for(workflow_id, fields):
+            self._release(keys=[gate, f"{gate}:waiting", stream], args=[token])
+
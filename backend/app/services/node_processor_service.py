@@ -1,19 +1,34 @@
+from handlers.base_node_handler import BaseNodeHandler
 from handlers.node_handler_factory import NodeHandlerFactory
 from services.redis_service import RedisService
+from services.side_effect_pool import SideEffectPool
 
 
 class NodeProcessorService:
-    def __init__(self, scheduler_service, redis_service: RedisService):
+    def __init__(self, scheduler_service, redis_service: RedisService, side_effects: SideEffectPool = None):
         self.factory = NodeHandlerFactory(scheduler_service, redis_service)
+        self.side_effects = side_effects
 
     def process(self, node: dict, workflow_id: int):
         category = node.get("node_category")
         handler = self.factory.get_handler(category)
         if handler:
-            handler.handle(node, workflow_id)
+            self._dispatch(handler, handler.handle, node, workflow_id)
 
     def remove(self, node: dict, workflow_id: int):
         """Handle deletion / deactivation of a node"""
         category = node.get("node_category")
         handler = self.factory.get_handler(category)
-        handler.cleanup(node, workflow_id)
+        if handler:
+            self._dispatch(handler, handler.cleanup, node, workflow_id)
+
+    def _dispatch(self, handler: BaseNodeHandler, action, node: dict, workflow_id: int):
+        name = f"{type(handler).__name__}.{action.__name__} for workflow {workflow_id}"
+        if handler.blocking and self.side_effects:
+            # Keyed by workflow so its activations and removals stay in order
+            self.side_effects.submit(workflow_id, name, action, node, workflow_id)
+            return
+        try:
+            action(node, workflow_id)
+        except Exception as e:
+            print(f"[NodeProcessorService] ❌ {name} failed: {e}")
@@ -1,24 +1,36 @@
 from typing import List, Optional
-from models.schemas.node import NodeCreate, NodeUpdate
+from core.node_catalog import NodeCatalog
+from models.schemas.node import NodeCreate, NodeUpdate, NodeResponse
 from models.db_models.node_db import Node
 from repositories.sqlalchemy_node_repository import SqlAlchemyNodeRepository
 
 
 class NodeService:
-    def __init__(self, repository: SqlAlchemyNodeRepository):
+    """Reads come from the node catalog; writes go to the database and invalidate it"""
+
+    def __init__(self, repository: SqlAlchemyNodeRepository, catalog: NodeCatalog):
         self.repository = repository
+        self.catalog = catalog
 
-    def list_nodes(self, skip: int = 0, limit: int = 10) -> List[Node]:
-        return self.repository.list_nodes(skip=skip, limit=limit)
+    def list_nodes(self, skip: int = 0, limit: int = 10) -> List[NodeResponse]:
+        return self.catalog.list_nodes(skip=skip, limit=limit)
 
-    def get_node(self, node_id: int) -> Optional[Node]:
-        return self.repository.get_node(node_id)
+    def get_node(self, node_id: int) -> Optional[NodeResponse]:
+        return self.catalog.get_node(node_id)
 
     def create_node(self, node_data: NodeCreate) -> Node:
-        return self.repository.create_node(node_data)
+        node = self.repository.create_node(node_data)
+        self.catalog.invalidate()
+        return node
 
     def update_node(self, node_id: int, node_data: NodeUpdate) -> Optional[Node]:
-        return self.repository.update_node(node_id, node_data)
+        node = self.repository.update_node(node_id, node_data)
+        if node:
+            self.catalog.invalidate()
+        return node
 
     def delete_node(self, node_id: int) -> bool:
-        return self.repository.delete_node(node_id)
+        deleted = self.repository.delete_node(node_id)
+        if deleted:
+            self.catalog.invalidate()
+        return deleted
@@ -0,0 +1,92 @@
+import threading
+from typing import Callable
+from sqlalchemy import event # type: ignore
+from sqlalchemy.orm import Session # type: ignore
+from repositories.sqlalchemy_outbox_repository import SqlAlchemyOutboxRepository, OUTBOX_PENDING
+from services.redis_service import RedisService
+
+
+class OutboxRelay:
+    """
+    Moves committed outbox events onto the workflow event stream.
+
+    Services stage lifecycle events in the outbox table inside the
+    transaction that changes the workflow, so an event exists exactly when
+    its change does. This relay runs on a background thread of the API
+    process: it publishes pending rows in batches with one pipelined round
+    trip, then deletes them. A commit that staged events wakes it at once;
+    otherwise it polls every `interval_seconds`. Delivery is at least once:
+    a crash between publishing and deleting re-publishes the batch, which the
+    schedulers' event handling tolerates.
+
+    Events of one workflow are published in commit order. Every transaction
+    staging an event first locks the workflow's row (get_for_update) and
+    holds it until it commits, so a later writer inserts, and is numbered,
+    only after the earlier one is visible; publishing by id follows. Across
+    workflows there is no ordering.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            redis_service: RedisService,
+            batch_size: int = 100,
+            interval_seconds: float = 1.0
+        ):
+        self.session_factory = session_factory
+        self.redis_service = redis_service
+        self.batch_size = max(int(batch_size), 1)
+        self.interval_seconds = max(float(interval_seconds), 0.05)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        # On the Session class, so commits of async sessions (whose sync
+        # session is a plain Session) wake the relay too
+        event.listen(Session, "after_commit", self._after_commit)
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        event.remove(Session, "after_commit", self._after_commit)
+
+    def _after_commit(self, session: Session):
+        if session.info.pop(OUTBOX_PENDING, False):
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            try:
+                # Keep going while full batches come back
+                while self.relay_once() == self.batch_size:
+                    pass
+            except Exception as e:
+                print(f"[OutboxRelay] ⚠️ Failed to relay outbox events: {e}")
+
+    def relay_once(self) -> int:
+        """Publish and delete one batch; returns how many events it moved"""
+        session = self.session_factory()
+        try:
+            repo = SqlAlchemyOutboxRepository(session)
+            events = repo.claim_batch(self.batch_size)
+            if not events:
+                session.rollback()
+                return 0
+            self.redis_service.publish_events([
+                (e.event_type, e.payload, e.created_at.isoformat() if e.created_at else None)
+                for e in events
+            ])
+            repo.delete(events)
+            return len(events)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
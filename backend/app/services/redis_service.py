@@ -1,22 +1,39 @@
-import json
 from redis import Redis # type: ignore
 from datetime import datetime
+from core.events import WORKFLOW_EVENTS_STREAM, WORKFLOW_EVENTS_MAXLEN
+from core.codec import codec
 
 class RedisService:
-    def __init__(self, redis_client: Redis, channel_name: str = "workflow_events"):
+    def __init__(self, redis_client: Redis, stream_name: str = WORKFLOW_EVENTS_STREAM):
         self.redis_client = redis_client
-        self.channel_name = channel_name
+        self.stream_name = stream_name
 
-    def publish_event(self, event_type: str, payload: dict):
+    def publish_event(self, event_type: str, payload: dict) -> str:
         """
-        Publishes a structured event to Redis with standardized metadata.
+        Appends a structured lifecycle event to the workflow event stream.
+        Unlike pub/sub, it is kept until a scheduler has processed it.
         """
         message = {
             "type": event_type,
             "timestamp": datetime.utcnow().isoformat(),
-            "payload": payload,
+            "payload": codec.encode(payload),
         }
-        self.redis_client.publish(self.channel_name, json.dumps(message))
+        return self.redis_client.xadd(self.stream_name, message, maxlen=WORKFLOW_EVENTS_MAXLEN, approximate=True)
+
+    def publish_events(self, events: list) -> list:
+        """
+        Appends a batch of (event_type, payload, timestamp) lifecycle events,
+        in order, with a single round trip. A missing timestamp means now.
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        for event_type, payload, timestamp in events:
+            message = {
+                "type": event_type,
+                "timestamp": timestamp or datetime.utcnow().isoformat(),
+                "payload": codec.encode(payload),
+            }
+            pipe.xadd(self.stream_name, message, maxlen=WORKFLOW_EVENTS_MAXLEN, approximate=True)
+        return pipe.execute()
 
     def add_to_stream(self, stream_name: str, fields: dict) -> str:
         """
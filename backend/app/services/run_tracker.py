@@ -0,0 +1,172 @@
+# services/run_tracker.py
+# Run status for queued workflow executions. The execute endpoint creates a
+# run hash and queues the trigger; the worker records progress on it and
+# appends one event per finished node to the run's event stream, which the
+# status and server-sent-events endpoints read. Both keys expire after the
+# run TTL.
+import json
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+from core.codec import codec
+from core.trigger_lanes import LANE_INTERACTIVE, lane_stream
+from services.concurrency_limiter import concurrency_fields
+
+RUN_KEY_PREFIX = "workflow_run"
+RUN_EVENTS_KEY_PREFIX = "workflow_run_events"
+# Event streams are capped; a run reaching more nodes than this loses the oldest events
+RUN_EVENTS_MAXLEN = 1000
+
+RUN_QUEUED = "queued"
+RUN_RUNNING = "running"
+RUN_SUCCEEDED = "succeeded"
+RUN_FAILED = "failed"
+
+EVENT_RUN_STARTED = "run_started"
+EVENT_NODE_FINISHED = "node_finished"
+EVENT_RUN_FINISHED = "run_finished"
+
+
+def run_key(run_id: str) -> str:
+    return f"{RUN_KEY_PREFIX}:{run_id}"
+
+
+def run_events_key(run_id: str) -> str:
+    return f"{RUN_EVENTS_KEY_PREFIX}:{run_id}"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _decode(fields: dict) -> dict:
+    return {
+        (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+        for k, v in fields.items()
+    }
+
+
+class RunListener:
+    """
+    Worker side: records one run's progress. Passed to the executor, which
+    calls node_finished from its node threads.
+    """
+
+    def __init__(self, r, run_id: str, ttl_seconds: int = 86400):
+        self.r = r
+        self.run_id = run_id
+        self.ttl_seconds = ttl_seconds
+        self.failed_nodes = 0
+        self._lock = threading.Lock()
+
+    def _record(self, event: dict, mapping: Optional[dict] = None, counter: Optional[str] = None):
+        # One round trip: status fields, counters, the event and the TTLs
+        pipe = self.r.pipeline(transaction=False)
+        if mapping:
+            pipe.hset(run_key(self.run_id), mapping=mapping)
+        if counter:
+            pipe.hincrby(run_key(self.run_id), counter, 1)
+        pipe.xadd(run_events_key(self.run_id), event, maxlen=RUN_EVENTS_MAXLEN, approximate=True)
+        pipe.expire(run_key(self.run_id), self.ttl_seconds)
+        pipe.expire(run_events_key(self.run_id), self.ttl_seconds)
+        pipe.execute()
+
+    def run_started(self):
+        self._record({"event": EVENT_RUN_STARTED}, mapping={"status": RUN_RUNNING, "started_at": _now()})
+
+    def node_finished(self, node_id, error: Optional[str] = None):
+        event = {"event": EVENT_NODE_FINISHED, "node_id": str(node_id)}
+        if error:
+            with self._lock:
+                self.failed_nodes += 1
+            event.update(status=RUN_FAILED, error=error[:1000])
+        else:
+            event["status"] = RUN_SUCCEEDED
+        self._record(event, counter="nodes_failed" if error else "nodes_succeeded")
+
+    def run_finished(self, error: Optional[str] = None):
+        # A run with a failed node failed, even though the executor carried on with the other branches
+        status = RUN_FAILED if error or self.failed_nodes else RUN_SUCCEEDED
+        mapping = {"status": status, "finished_at": _now()}
+        event = {"event": EVENT_RUN_FINISHED, "status": status}
+        if error:
+            mapping["error"] = event["error"] = error[:1000]
+        self._record(event, mapping=mapping)
+
+
+class AsyncRunTracker:
+    """API side: queues runs and reads their status and events"""
+
+    def __init__(self, r, ttl_seconds: int = 86400):
+        self.r = r
+        self.ttl_seconds = ttl_seconds
+
+    async def enqueue(self, workflow_id: int, user_id: int, context: dict, trigger_config: Optional[dict] = None) -> dict:
+        """
+        Create the run and queue it on the interactive lane in one round trip.
+        `trigger_config` is the workflow's trigger node config, whose
+        concurrency settings apply to manual runs as to triggered ones.
+        """
+        run_id = uuid.uuid4().hex
+        pipe = self.r.pipeline(transaction=True)
+        pipe.hset(run_key(run_id), mapping={
+            "run_id": run_id,
+            "workflow_id": str(workflow_id),
+            "user_id": str(user_id),
+            "status": RUN_QUEUED,
+            "queued_at": _now(),
+            "nodes_succeeded": 0,
+            "nodes_failed": 0,
+        })
+        pipe.expire(run_key(run_id), self.ttl_seconds)
+        pipe.xadd(lane_stream(LANE_INTERACTIVE), {
+            "workflow_id": str(workflow_id),
+            "context": codec.encode(context),
+            "run_id": run_id,
+            **concurrency_fields(trigger_config, context),
+        })
+        entry_id = (await pipe.execute())[-1]
+        if isinstance(entry_id, bytes):
+            entry_id = entry_id.decode()
+        return {"run_id": run_id, "entry_id": entry_id}
+
+    async def get(self, run_id: str) -> Optional[dict]:
+        run = await self.r.hgetall(run_key(run_id))
+        if not run:
+            return None
+        run = _decode(run)
+        for field in ("workflow_id", "user_id", "nodes_succeeded", "nodes_failed"):
+            if field in run:
+                run[field] = int(run[field])
+        return run
+
+    async def events(self, run_id: str, block_ms: int = 15000, after_id: Optional[str] = None) -> AsyncIterator[Optional[dict]]:
+        """
+        Every event of the run after `after_id` (default: all of them), then
+        new ones as they arrive, ending after the run_finished event. Yields
+        None when nothing arrived for `block_ms`, so callers can keep their
+        connection alive. Each blocking read holds a connection for up to
+        `block_ms`: give the tracker a client on the stream pool.
+        """
+        key = run_events_key(run_id)
+        last_id = after_id or "0"
+        entries = await self.r.xrange(key, min=f"({last_id}" if after_id else "-")
+        while True:
+            for entry_id, fields in entries:
+                last_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                event = {"id": last_id, **_decode(fields)}
+                yield event
+                if event.get("event") == EVENT_RUN_FINISHED:
+                    return
+            response = await self.r.xread({key: last_id}, block=block_ms)
+            entries = response[0][1] if response else []
+            if not entries:
+                yield None
+
+
+def sse_message(event: Optional[dict]) -> str:
+    """Server-sent-events framing; None becomes a keep-alive comment"""
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"id: {event['id']}\nevent: {event.get('event', 'message')}\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,153 @@
+import threading
+import time
+from typing import Callable
+from sqlalchemy.orm import Session # type: ignore
+from repositories.sqlalchemy_workflow_node_repository import SqlAlchemyWorkflowNodeRepository
+from handlers.scheduler_handler import SchedulerNodeHandler
+from services.scheduler_service import SchedulerService
+
+SCHEDULER_NODE_CATEGORY = "SchedulerNode"
+
+
+class ScheduleReconciler:
+    """
+    Brings the Redis schedule sets back in line with Postgres.
+
+    Schedules only live in Redis, so a flush or a failover without persistence
+    silently stops every scheduled workflow. A reconciliation pass reads the
+    SchedulerNode triggers of all active workflows in one query, re-registers
+    the ones missing from Redis and drops schedules whose workflow is no
+    longer active, both as pipelined writes. Schedules that ran to their end
+    are left alone.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            scheduler_service: SchedulerService,
+            interval_seconds: float = 300
+        ):
+        self.session_factory = session_factory
+        self.scheduler = scheduler_service
+        self.handler = SchedulerNodeHandler(scheduler_service)
+        self.interval_seconds = max(float(interval_seconds), 0)
+        self.next_run_at = 0.0
+
+        # The periodic pass reads on its own thread, so a slow query never
+        # delays due fires; the scheduler loop applies what it found
+        # (apply_pending), which keeps the timing wheel single-threaded.
+        self._thread = None
+        self._stop = threading.Event()
+        self._pending = None
+        self._applied = threading.Event()
+        # Workflows whose events the loop handled since the current pass took
+        # its snapshot; the pass's view of them is stale, so it leaves them alone
+        self._touched = None
+        self._touched_lock = threading.Lock()
+
+    def start(self):
+        """Periodic passes on a background thread; disabled with a zero interval"""
+        if not self.interval_seconds:
+            return
+        self.next_run_at = time.time() + self.interval_seconds
+        self._thread = threading.Thread(target=self._run, name="schedule-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.wait(max(self.next_run_at - time.time(), 0)):
+            self.next_run_at = time.time() + self.interval_seconds
+            plan = self.plan()
+            if plan is None:
+                continue
+            self._applied.clear()
+            self._pending = plan
+            # One pass at a time: wait for the loop to apply this one
+            while not self._applied.wait(1):
+                if self._stop.is_set():
+                    return
+
+    def apply_pending(self):
+        """Called by the scheduler loop: applies the last background pass, if any"""
+        plan, self._pending = self._pending, None
+        if plan is not None:
+            self.apply(plan)
+            self._applied.set()
+
+    def note_event(self, workflow_id):
+        """Called by the scheduler loop for every workflow event it handles"""
+        with self._touched_lock:
+            if self._touched is not None:
+                self._touched.add(str(workflow_id))
+
+    def reconcile(self):
+        """A full pass on the calling thread, as done at startup"""
+        plan = self.plan()
+        if plan is not None:
+            self.apply(plan)
+
+    def plan(self):
+        """Compare Redis with the database; returns (missing schedules, orphan ids, desired count) or None"""
+        with self._touched_lock:
+            self._touched = set()
+
+        # Redis before the database: a schedule is registered only after its
+        # workflow's commit, so anything in this snapshot is already visible to
+        # the query below. Read the other way round, a workflow activated in
+        # between would be in Redis but not in `desired` and removed as an orphan.
+        try:
+            scheduled = self.scheduler.scheduled_workflow_ids()
+            completed = self.scheduler.completed_workflow_ids()
+        except Exception as e:
+            print(f"[ScheduleReconciler] ⚠️ Failed to read schedules from Redis: {e}")
+            return None
+
+        session = self.session_factory()
+        try:
+            triggers = SqlAlchemyWorkflowNodeRepository(session).list_active_triggers(SCHEDULER_NODE_CATEGORY)
+        except Exception as e:
+            print(f"[ScheduleReconciler] ⚠️ Failed to read active schedules from the database: {e}")
+            return None
+        finally:
+            session.close()
+
+        # One SchedulerNode per workflow, like the event path
+        desired = {str(node.workflow_id): node for node in triggers}
+
+        missing = [
+            self.handler.build_schedule(
+                {
+                    "node_id": node.id,
+                    "node_type": node.node_type,
+                    "node_category": node.node_category,
+                    "custom_config": node.custom_config,
+                },
+                node.workflow_id
+            )
+            for workflow_id, node in desired.items()
+            if workflow_id not in scheduled and workflow_id not in completed
+        ]
+        missing = [schedule for schedule in missing if schedule]
+        orphans = scheduled - desired.keys()
+        return missing, orphans, len(desired)
+
+    def apply(self, plan):
+        missing, orphans, desired_count = plan
+        with self._touched_lock:
+            touched, self._touched = self._touched or set(), None
+        missing = [schedule for schedule in missing if str(schedule.workflow_id) not in touched]
+        orphans = orphans - touched
+
+        if missing:
+            self.scheduler.register_schedules(missing)
+        if orphans:
+            self.scheduler.remove_schedules(orphans)
+
+        print(
+            f"[ScheduleReconciler] 🔁 {desired_count} active schedules in the database: "
+            f"re-registered {len(missing)}, removed {len(orphans)} orphans"
+        )
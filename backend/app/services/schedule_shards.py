@@ -0,0 +1,99 @@
+import math
+import os
+import socket
+import time
+from typing import List
+from redis import Redis # type: ignore
+
+SHARD_LEASE_PREFIX = "scheduler_shard_lease"
+SCHEDULER_REPLICAS_ZSET = "scheduler_replicas"
+
+# Extends a lease only while we still hold it.
+#   KEYS: [lease]
+#   ARGV: [replica_id, lease_ms]
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Gives a lease up only if it is still ours.
+#   KEYS: [lease]
+#   ARGV: [replica_id]
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class ShardLeaseManager:
+    """
+    Splits the schedule shards between scheduler replicas.
+
+    Every replica heartbeats into a shared sorted set and holds an expiring
+    lease per shard it owns. On each rebalance it keeps at most its fair share
+    (shards / live replicas, rounded up), gives back the surplus and picks up
+    free shards, so ownership converges when replicas join or leave.
+    """
+
+    def __init__(self, redis_client: Redis, shard_count: int = 1, lease_seconds: float = 15, replica_id: str = None):
+        self.r = redis_client
+        self.shard_count = max(int(shard_count), 1)
+        self.lease_seconds = max(float(lease_seconds), 1)
+        self.replica_id = replica_id or f"scheduler-{socket.gethostname()}-{os.getpid()}"
+        self.owned: List[int] = []
+        self.next_rebalance_at = 0.0
+        self._renew = self.r.register_script(_RENEW_SCRIPT)
+        self._release = self.r.register_script(_RELEASE_SCRIPT)
+
+    @staticmethod
+    def lease_key(shard: int) -> str:
+        return f"{SHARD_LEASE_PREFIX}:{shard}"
+
+    def live_replicas(self) -> int:
+        now = time.time()
+        self.r.zremrangebyscore(SCHEDULER_REPLICAS_ZSET, "-inf", now - self.lease_seconds)
+        return max(self.r.zcard(SCHEDULER_REPLICAS_ZSET), 1)
+
+    def rebalance(self) -> List[int]:
+        """Heartbeat, renew held leases and move towards a fair share of shards"""
+        lease_ms = int(self.lease_seconds * 1000)
+        self.r.zadd(SCHEDULER_REPLICAS_ZSET, {self.replica_id: time.time()})
+        fair_share = math.ceil(self.shard_count / self.live_replicas())
+
+        owned = [
+            shard for shard in self.owned
+            if self._renew(keys=[self.lease_key(shard)], args=[self.replica_id, lease_ms])
+        ]
+
+        # Give back the surplus so a replica that just joined can pick it up
+        while len(owned) > fair_share:
+            shard = owned.pop()
+            self._release(keys=[self.lease_key(shard)], args=[self.replica_id])
+
+        # Start from a replica-specific shard so fresh replicas don't all race for shard 0
+        start = hash(self.replica_id) % self.shard_count
+        for i in range(self.shard_count):
+            if len(owned) >= fair_share:
+                break
+            shard = (start + i) % self.shard_count
+            if shard in owned:
+                continue
+            if self.r.set(self.lease_key(shard), self.replica_id, nx=True, px=lease_ms):
+                owned.append(shard)
+
+        if sorted(owned) != sorted(self.owned):
+            print(f"[ShardLeaseManager] {self.replica_id} owns shards {sorted(owned)} of {self.shard_count}")
+        self.owned = sorted(owned)
+        # Renew well before the lease runs out
+        self.next_rebalance_at = time.time() + self.lease_seconds / 3
+        return self.owned
+
+    def release_all(self):
+        for shard in self.owned:
+            self._release(keys=[self.lease_key(shard)], args=[self.replica_id])
+        self.r.zrem(SCHEDULER_REPLICAS_ZSET, self.replica_id)
+        self.owned = []
@@ -1,51 +1,188 @@
 import time
-import json
+import socket
+import threading
+import redis # type: ignore
+from core.events import WORKFLOW_EVENTS_STREAM, SCHEDULER_EVENTS_GROUP
+from core.codec import codec
 from services.workflow_event_handler import WorkflowEventHandler
 from services.scheduler_service import SchedulerService
+from services.schedule_reconciler import ScheduleReconciler
+from services.trigger_coalescer import SCHEDULER_WAKEUP_CHANNEL, SCHEDULER_WAKEUP_MAXLEN
+from core.trigger_lanes import slot_tag
 from repositories.redis_repository import RedisRepository
 
-WORKFLOW_EVENT_CHANNEL = "workflow_events"
+# Upper bound on a single sleep, in case a deadline was added without a wake-up
+MAX_IDLE_SECONDS = 30.0
+# Events read per call
+EVENT_BATCH_SIZE = 100
+# Events left unacked this long by a consumer are taken over (it likely died)
+EVENT_CLAIM_IDLE_MS = 60000
+# How often the scheduler-wide firing metrics (lateness included) are logged
+METRICS_LOG_INTERVAL_SECONDS = 60
+# Pause before resubscribing to wake-ups after losing the connection
+WAKEUP_RESUBSCRIBE_SECONDS = 1.0
 
 class SchedulerRunner:
     def __init__(
-            self, 
-            scheduler_service: SchedulerService, 
-            event_handler: WorkflowEventHandler, 
-            redis_repo: RedisRepository
+            self,
+            scheduler_service: SchedulerService,
+            event_handler: WorkflowEventHandler,
+            redis_repo: RedisRepository,
+            reconciler: ScheduleReconciler = None,
+            consumer_name: str = None
         ):
         self.scheduler = scheduler_service
         self.event_handler = event_handler
-        self.pubsub = redis_repo.pubsub(ignore_subscribe_messages=True)
-        self.pubsub.subscribe(WORKFLOW_EVENT_CHANNEL)
+        self.reconciler = reconciler
+        self.r = redis_repo.r
+        # Stable across restarts of the same container, so our own pending events replay
+        self.consumer_name = consumer_name or f"scheduler-{socket.gethostname()}"
+        self._metrics_log_at = 0.0
+        # Wake-ups for this replica's shards, relayed from the pub/sub channel
+        # so one blocking read waits on them and on events alike. Tagged with
+        # the events stream's slot, since that read spans both.
+        self.wakeup_inbox = f"scheduler_wakeup:{slot_tag(WORKFLOW_EVENTS_STREAM)}:{self.consumer_name}"
+
+        # Events published before the first scheduler ever started are still processed;
+        # wake-ups only matter from now on
+        for stream_name, start_id in ((WORKFLOW_EVENTS_STREAM, "0"), (self.wakeup_inbox, "$")):
+            try:
+                self.r.xgroup_create(stream_name, SCHEDULER_EVENTS_GROUP, id=start_id, mkstream=True)
+            except redis.exceptions.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
 
     def run_forever(self):
         print("[SchedulerRunner]  Scheduler running...")
-        last_pubsub_check = time.time()
+
+        # Replay events we read but never acked before a restart, plus any
+        # a dead replica left behind
+        self._handle_entries(self._read_events({WORKFLOW_EVENTS_STREAM: "0"}))
+        self._claim_abandoned_events()
+
+        # Periodic reconciliation reads on its own thread; its results are applied below
+        if self.reconciler:
+            self.reconciler.start()
+        threading.Thread(target=self._relay_wakeups, name="scheduler-wakeups", daemon=True).start()
 
         while True:
-            # 1️⃣ Process due schedules
+            # 1️⃣ Keep our shard leases, then process due schedules and flush closed debounce windows
+            self.scheduler.maintain_shards()
+            if self.reconciler:
+                self.reconciler.apply_pending()
             self.scheduler.process_due_schedules()
+            self.scheduler.coalescer.flush_due()
+            self._log_metrics_if_due()
+
+            # 2️⃣ Block until the next deadline, or until an event or wake-up arrives,
+            # then keep reading until the backlog is drained
+            timeout = self._seconds_until_next_deadline()
+            streams = {WORKFLOW_EVENTS_STREAM: ">", self.wakeup_inbox: ">"}
+            entries = self._read_events(streams, block_ms=int(timeout * 1000))
+            while entries:
+                self._handle_entries(entries)
+                entries = self._read_events(streams)
 
-            # 2️⃣ Check pub/sub messages periodically
-            if time.time() - last_pubsub_check >= 0.5:
-                message = self.pubsub.get_message(timeout=0.1)
+    def _relay_wakeups(self):
+        """
+        Copy the wake-ups meant for this replica (its shards' and the webhook
+        lane's debounce windows) into its inbox. Every replica hears every
+        wake-up; a missed one only delays the flush until the next idle check.
+        """
+        while True:
+            try:
+                pubsub = self.r.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(SCHEDULER_WAKEUP_CHANNEL)
+                for message in pubsub.listen():
+                    tag = message.get("data")
+                    tag = tag.decode() if isinstance(tag, bytes) else tag
+                    if tag in self.scheduler.wakeup_tags():
+                        self.r.xadd(self.wakeup_inbox, {"tag": tag}, maxlen=SCHEDULER_WAKEUP_MAXLEN, approximate=True)
+            except Exception as e:
+                print(f"[SchedulerRunner] ⚠️ Wake-up subscription lost, resubscribing: {e}")
+                time.sleep(WAKEUP_RESUBSCRIBE_SECONDS)
+
+    def _log_metrics_if_due(self):
+        now = time.time()
+        if now < self._metrics_log_at:
+            return
+        self._metrics_log_at = now + METRICS_LOG_INTERVAL_SECONDS
+        try:
+            m = self.scheduler.metrics()
+        except Exception as e:
+            print(f"[SchedulerRunner] ⚠️ Failed to read scheduler metrics: {e}")
+            return
+        print(
+            f"[SchedulerRunner] 📊 claimed {int(m.get('claimed', 0))}, fired {int(m.get('fired', 0))}, "
+            f"skipped {int(m.get('skipped', 0))}, misfired {int(m.get('misfired', 0))}, "
+            f"lateness avg {m['lateness_seconds_avg']:.3f}s max {m.get('lateness_seconds_max', 0):.3f}s"
+        )
 
-                if message and message.get("type") == "message":
-                    data = message["data"]
-                    if isinstance(data, bytes):
-                        data = data.decode("utf-8")
-                    print("[SchedulerRunner] Received message:", data) 
-                    # Parse JSON and separate type & payload
-                    try:
-                        event = json.loads(data)
-                        event_type = event.get("type")
-                        payload = event.get("payload", {})
+    def _read_events(self, streams: dict, block_ms: int = None):
+        # block=0 would wait forever, a zero timeout means don't block
+        return self.r.xreadgroup(
+            groupname=SCHEDULER_EVENTS_GROUP,
+            consumername=self.consumer_name,
+            streams=streams,
+            count=EVENT_BATCH_SIZE,
+            block=block_ms or None
+        )
+
+    def _claim_abandoned_events(self):
+        start_id = "0-0"
+        while True:
+            result = self.r.xautoclaim(
+                WORKFLOW_EVENTS_STREAM, SCHEDULER_EVENTS_GROUP, self.consumer_name,
+                min_idle_time=EVENT_CLAIM_IDLE_MS, start_id=start_id, count=EVENT_BATCH_SIZE
+            )
+            start_id, entries = result[0], result[1]
+            if entries:
+                print(f"[SchedulerRunner] Took over {len(entries)} abandoned events")
+                self._handle_entries([(WORKFLOW_EVENTS_STREAM, entries)])
+            if not entries or start_id in (b"0-0", "0-0"):
+                return
 
-                        self.event_handler.handle_event(event_type, payload)
+    def _seconds_until_next_deadline(self) -> float:
+        deadlines = [
+            ts for ts in (
+                self.scheduler.next_due_timestamp(),
+                self.scheduler.coalescer.next_flush_timestamp(),
+                self.scheduler.next_maintenance_timestamp(),
+            )
+            if ts is not None
+        ]
+        if not deadlines:
+            return MAX_IDLE_SECONDS
+        return min(max(min(deadlines) - time.time(), 0.0), MAX_IDLE_SECONDS)
 
-                    except json.JSONDecodeError:
-                        print("[SchedulerRunner]  Failed to decode message:", data)
+    def _handle_entries(self, entries):
+        for stream, messages in entries or []:
+            stream_name = stream.decode() if isinstance(stream, bytes) else stream
+            entry_ids = []
+            for entry_id, fields in messages:
+                entry_ids.append(entry_id)
+                if stream_name == self.wakeup_inbox or not fields:
+                    continue  # wake-ups only cut the sleep short; empty fields are trimmed entries
+                self._handle_event(entry_id, fields)
+            if entry_ids:
+                self.r.xack(stream_name, SCHEDULER_EVENTS_GROUP, *entry_ids)
 
-                last_pubsub_check = time.time()
+    def _handle_event(self, entry_id, fields):
+        fields = {(k.decode() if isinstance(k, bytes) else k): v for k, v in fields.items()}
+        event_type = fields.get("type")
+        event_type = event_type.decode() if isinstance(event_type, bytes) else event_type
+        print("[SchedulerRunner] Received event:", event_type, entry_id)
+        # Decode the payload (binary or legacy JSON) and dispatch
+        try:
+            payload = codec.decode(fields.get("payload")) or {}
+        except ValueError:
+            print("[SchedulerRunner]  Failed to decode event:", fields)
+            return
 
-            time.sleep(1)
\ No newline at end of file
+        if self.reconciler and payload.get("workflow_id"):
+            self.reconciler.note_event(payload["workflow_id"])
+        try:
+            self.event_handler.handle_event(event_type, payload)
+        except Exception as e:
+            # Acked anyway so a poison event can't wedge the stream; reconciliation repairs the schedules
+            print(f"[SchedulerRunner] ❌ Failed to handle event {entry_id}: {e}")
@@ -1,32 +1,448 @@
 import json
+import time
 import datetime
+from redis.exceptions import WatchError # type: ignore
+from core import cron
+from core.timing_wheel import TimingWheel
 from models.schemas.schedule import Schedule
+from core.trigger_lanes import LANE_WEBHOOK, lane_stream, scheduled_stream, shard_tag, slot_tag
+from services.concurrency_limiter import concurrency_fields
+from services.trigger_coalescer import TriggerCoalescer, SCHEDULER_WAKEUP_CHANNEL
+from services.schedule_shards import ShardLeaseManager
 
+# Sorted set of workflow ids scored by their next run; the schedule itself
+# lives in a hash per workflow. With more than one shard, every key of a shard
+# (set, hashes, trigger stream, debounce windows, metrics, completed set)
+# carries the shard's hash tag, so a shard lives in one Redis Cluster slot and
+# shards spread over the cluster. A single shard keeps the original names.
 WORKFLOW_SCHEDULES_ZSET = "workflow_schedules_zset"
-WORKFLOW_TRIGGERS_STREAM = "workflow_triggers"
+WORKFLOW_SCHEDULE_PREFIX = "workflow_schedule"
+SCHEDULER_METRICS_HASH = "scheduler_metrics"
+# Workflows whose schedule ran to its end, so reconciliation doesn't restart them
+WORKFLOW_SCHEDULES_COMPLETED = "workflow_schedules_completed"
+
+# What to do with runs missed while the scheduler was behind or down
+MISFIRE_FIRE_ONCE = "fire_once"  # collapse them into one run
+MISFIRE_FIRE_ALL = "fire_all"    # replay them, up to the catch-up cap
+MISFIRE_SKIP = "skip"            # drop them, wait for the next slot
+
+# Claims the given workflow ids that are still due, emits their triggers
+# (straight onto the stream, or into their debounce buffer) and moves them to
+# their next slot on the schedule's grid, all in one atomic call. Schedules
+# that fell behind are handled by their misfire policy. Every key the script
+# touches comes in KEYS and, with more than one shard, carries the shard's
+# hash tag, so it runs on Redis Cluster. Returns
+# {workflow_id, occurrences, done, refill, fires, lateness, next_run} per
+# claimed schedule; refill flags cron schedules running low on precomputed
+# fire times.
+#   KEYS: [schedules_zset, stream, debounce_zset, metrics_hash, completed_set,
+#          then schedule_hash, debounce_buffer per workflow id]
+#   ARGV: [now, refill_below, misfire_grace, misfire_max_catchup,
+#          wakeup_channel, slot_tag, workflow_id...]
+_CLAIM_DUE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local fired = {}
+
+for i = 7, #ARGV do
+    local workflow_id = ARGV[i]
+    local key = KEYS[6 + (i - 7) * 2]
+    local buffer = KEYS[7 + (i - 7) * 2]
+    local score = redis.call('ZSCORE', KEYS[1], workflow_id)
+    local due = score and tonumber(score)
+    local flat = {}
+    if due and due <= now then flat = redis.call('HGETALL', key) end
+    local s = {}
+    for j = 1, #flat, 2 do
+        s[flat[j]] = flat[j + 1]
+    end
+
+    if not due or due > now then
+        -- fired, rescheduled or removed since it was picked
+    elseif #flat == 0 then
+        -- hash removed behind our back, drop the orphaned member
+        redis.call('ZREM', KEYS[1], workflow_id)
+    else
+        local scheduled = tonumber(s.next_run_ts) or now
+        local lateness = math.max(now - scheduled, 0)
+        local until_ts = tonumber(s.until_ts)
+        local max_occurrences = tonumber(s.max_occurrences)
+        local occurrences = tonumber(s.occurrences) or 0
+
+        -- Slots due by now (missed ones included) and the next slot, on the
+        -- schedule's own grid rather than relative to when we got here
+        local missed = 1
+        local last_slot = scheduled
+        local next_run = nil
+        local refill = 0
+
+        if s.cron then
+            -- cron schedules consume their precomputed fire times
+            local remaining = {}
+            local due_slots = 0
+            for _, t in ipairs(cjson.decode(s.fire_times or '[]')) do
+                if t > now then
+                    table.insert(remaining, t)
+                else
+                    due_slots = due_slots + 1
+                    last_slot = math.max(last_slot, t)
+                end
+            end
+            missed = math.max(due_slots, 1)
+            redis.call('HSET', key, 'fire_times', cjson.encode(remaining))
+            next_run = remaining[1]
+            if #remaining < tonumber(ARGV[2]) then refill = 1 end
+        else
+            local interval = tonumber(s.interval_seconds)
+            if interval and interval > 0 then
+                local behind = math.floor((now - scheduled) / interval)
+                if behind < 0 then behind = 0 end
+                missed = behind + 1
+                if until_ts and until_ts >= scheduled then
+                    missed = math.min(missed, math.floor((until_ts - scheduled) / interval) + 1)
+                end
+                last_slot = scheduled + behind * interval
+                next_run = scheduled + (behind + 1) * interval
+            end
+        end
+
+        -- Misfire policy decides how many of the due slots actually run
+        local grace = tonumber(ARGV[3])
+        local misfired = missed > 1 or lateness > grace
+        local fires = 1
+        if misfired then
+            local policy = s.misfire_policy or 'fire_once'
+            if policy == 'fire_all' then
+                fires = math.min(missed, tonumber(s.misfire_max_catchup) or tonumber(ARGV[4]))
+            elseif policy == 'skip' then
+                if now - last_slot > grace then fires = 0 end
+            end
+        end
+        if max_occurrences and max_occurrences > 0 then
+            fires = math.max(math.min(fires, max_occurrences - occurrences), 0)
+        end
+
+        local context = s.context or '{}'
+        local fields = {workflow_id = workflow_id}
+        if s.trigger_fields then
+            for k, v in pairs(cjson.decode(s.trigger_fields)) do
+                fields[k] = tostring(v)
+            end
+        end
+
+        for _ = 1, fires do
+            if s.debounce_key then
+                local item = cjson.encode({stream = KEYS[2], fields = fields, context = context})
+                if redis.call('RPUSH', buffer, item) == 1 then
+                    local flush_at = now + tonumber(s.debounce_seconds)
+                    redis.call('ZADD', KEYS[3], flush_at, buffer)
+                    redis.call('PUBLISH', ARGV[5], ARGV[6])
+                end
+            else
+                local args = {}
+                for k, v in pairs(fields) do
+                    table.insert(args, k)
+                    table.insert(args, v)
+                end
+                table.insert(args, 'context')
+                table.insert(args, context)
+                redis.call('XADD', KEYS[2], '*', unpack(args))
+            end
+        end
+        occurrences = redis.call('HINCRBY', key, 'occurrences', fires)
+
+        -- Lateness metrics, per schedule and per shard
+        redis.call('HSET', key, 'last_lateness', lateness)
+        redis.call('HINCRBY', KEYS[4], 'claimed', 1)
+        redis.call('HINCRBY', KEYS[4], 'fired', fires)
+        redis.call('HINCRBY', KEYS[4], 'skipped', missed - fires)
+        if misfired then redis.call('HINCRBY', KEYS[4], 'misfired', 1) end
+        redis.call('HINCRBYFLOAT', KEYS[4], 'lateness_seconds_total', lateness)
+        if lateness > (tonumber(redis.call('HGET', KEYS[4], 'lateness_seconds_max')) or 0) then
+            redis.call('HSET', KEYS[4], 'lateness_seconds_max', lateness)
+        end
+
+        local done = 0
+        if not s.cron and not next_run then done = 1 end
+        if next_run and until_ts and next_run > until_ts then done = 1 end
+        if max_occurrences and max_occurrences > 0 and occurrences >= max_occurrences then done = 1 end
+
+        if done == 1 then
+            refill = 0
+            redis.call('ZREM', KEYS[1], workflow_id)
+            redis.call('DEL', key)
+            redis.call('SADD', KEYS[5], workflow_id)
+        elseif next_run then
+            redis.call('ZADD', KEYS[1], next_run, workflow_id)
+            redis.call('HSET', key, 'next_run_ts', next_run)
+        else
+            -- out of precomputed fire times; the refill puts it back
+            redis.call('ZREM', KEYS[1], workflow_id)
+        end
+
+        local scheduled_next = ''
+        if done == 0 and next_run then scheduled_next = tostring(next_run) end
+        table.insert(fired, {workflow_id, occurrences, done, refill, fires, tostring(lateness), scheduled_next})
+    end
+end
+
+return fired
+"""
 
 class SchedulerService:
-    def __init__(self, redis_repo):
+    def __init__(
+            self,
+            redis_repo,
+            trigger_coalescer: TriggerCoalescer = None,
+            claim_batch_size: int = 500,
+            cron_lookahead: int = 20,
+            misfire_grace_seconds: float = 60,
+            misfire_max_catchup: int = 10,
+            max_triggers_per_second: float = 0,
+            shard_count: int = 1,
+            shard_lease_seconds: float = 15,
+            wheel_horizon_seconds: float = 0
+        ):
         self.redis = redis_repo
+        self.coalescer = trigger_coalescer or TriggerCoalescer(redis_repo.r)
+        self.claim_batch_size = max(int(claim_batch_size), 1)
+        self.cron_lookahead = max(int(cron_lookahead), 2)
+        self.misfire_grace_seconds = max(float(misfire_grace_seconds), 0)
+        self.misfire_max_catchup = max(int(misfire_max_catchup), 1)
+
+        # Token bucket capping triggers emitted per second (0 = no cap). Schedules
+        # over budget stay due and are picked up once it refills.
+        self.max_triggers_per_second = max(float(max_triggers_per_second), 0)
+        self._budget = self.max_triggers_per_second
+        self._budget_at = time.monotonic()
+        self._throttled_until = None
+        self._claim_due = redis_repo.r.register_script(_CLAIM_DUE_SCRIPT)
+
+        # A single shard keeps the original key and needs no leases: the claim
+        # script alone stops replicas from double-firing.
+        self.shard_count = max(int(shard_count), 1)
+        self.shards = (
+            ShardLeaseManager(redis_repo.r, self.shard_count, lease_seconds=shard_lease_seconds)
+            if self.shard_count > 1 else None
+        )
+
+        # Optional in-memory timing wheel holding the schedules due within the
+        # horizon. They fire when the wheel expires them, with one claim call
+        # per batch, instead of range-scanning Redis every loop. Reloaded from
+        # Redis every half horizon and whenever shard ownership changes.
+        self.wheel_horizon_seconds = max(float(wheel_horizon_seconds), 0)
+        self.wheel = TimingWheel() if self.wheel_horizon_seconds else None
+        self._wheel_shards = {}  # workflow_id -> shard it was loaded from
+        self._wheel_horizon_end = 0.0
+        self._next_wheel_load = 0.0
+
+        self._update_flush_streams()
+
+    def _tagged(self, name: str, shard: int) -> str:
+        """`name` for one shard; a single shard keeps the original, untagged key"""
+        if self.shard_count == 1:
+            return name
+        return f"{name}:{shard_tag(shard)}"
+
+    def shard_of(self, workflow_id) -> int:
+        return int(workflow_id) % self.shard_count
+
+    def schedule_key(self, workflow_id) -> str:
+        if self.shard_count == 1:
+            return f"{WORKFLOW_SCHEDULE_PREFIX}:{workflow_id}"
+        return f"{WORKFLOW_SCHEDULE_PREFIX}:{shard_tag(self.shard_of(workflow_id))}:{workflow_id}"
+
+    def shard_zset(self, shard: int) -> str:
+        return self._tagged(WORKFLOW_SCHEDULES_ZSET, shard)
+
+    def shard_stream(self, shard: int) -> str:
+        return scheduled_stream(shard, self.shard_count)
+
+    def metrics_key(self, shard: int) -> str:
+        return self._tagged(SCHEDULER_METRICS_HASH, shard)
+
+    def completed_key(self, shard: int) -> str:
+        return self._tagged(WORKFLOW_SCHEDULES_COMPLETED, shard)
+
+    def debounce_buffer(self, workflow_id) -> str:
+        # A workflow has one schedule with a fixed context, so one buffer covers its fires
+        return self.coalescer.buffer_key(self.shard_stream(self.shard_of(workflow_id)), workflow_id, {}, {})
+
+    def zset_key(self, workflow_id) -> str:
+        """The schedule set holding a workflow"""
+        return self.shard_zset(self.shard_of(workflow_id))
+
+    def owned_shards(self) -> list:
+        """Shards this replica fires from"""
+        if not self.shards:
+            return [0]
+        return list(self.shards.owned)
+
+    def owned_zsets(self) -> list:
+        """Schedule sets this replica fires from"""
+        return [self.shard_zset(shard) for shard in self.owned_shards()]
+
+    def _update_flush_streams(self):
+        # Debounce windows this replica closes: webhook triggers' (every replica
+        # races for those, the claim is atomic) and its own shards'
+        self.coalescer.streams = [lane_stream(LANE_WEBHOOK)] + [self.shard_stream(shard) for shard in self.owned_shards()]
+
+    def wakeup_tags(self) -> set:
+        """Slot tags of the wake-ups this replica acts on"""
+        return {slot_tag(stream) for stream in self.coalescer.streams}
+
+    def maintain_shards(self):
+        """Renew shard leases and rebalance when due; a no-op with a single shard"""
+        if self.shards and time.time() >= self.shards.next_rebalance_at:
+            owned = list(self.shards.owned)
+            if self.shards.rebalance() != owned:
+                self._next_wheel_load = 0.0  # reload the wheel for the new shards
+                self._update_flush_streams()
+
+    def next_maintenance_timestamp(self):
+        return self.shards.next_rebalance_at if self.shards else None
+
+    def _hash_fields(self, schedule: Schedule) -> dict:
+        """
+        Hash fields for a schedule: its dict plus everything the claim script
+        needs to emit the trigger without calling back into Python. Unset
+        values are left out, hashes can't hold None.
+        """
+        data = schedule.to_dict()
+        trigger_fields = concurrency_fields(
+            {"max_concurrency": schedule.max_concurrency, "serialize_by": schedule.serialize_by},
+            schedule.context
+        )
+        if trigger_fields:
+            data["trigger_fields"] = json.dumps(trigger_fields)
+
+        config = {"debounce_seconds": schedule.debounce_seconds, "coalesce_by": schedule.coalesce_by}
+        window = self.coalescer.window(config)
+        data["debounce_seconds"] = window or None
+        if window:
+            data["debounce_key"] = self.debounce_buffer(schedule.workflow_id)
+        return {k: v for k, v in data.items() if v is not None}
 
     def register_schedule(self, schedule: Schedule):
-        score = schedule.next_run.timestamp()
-        self.redis.zadd(WORKFLOW_SCHEDULES_ZSET, {json.dumps(schedule.to_dict()): score})
+        self.register_schedules([schedule])
         print(f"[SchedulerService] ✅ Registered schedule for workflow {schedule.workflow_id} at {schedule.next_run}")
 
-    def remove_schedule(self, workflow_id):
-        schedules = self.redis.zrange(WORKFLOW_SCHEDULES_ZSET, 0, -1)
-        removed = False
+    def _completed_keys(self, workflow_id) -> list:
+        # Sharded, a workflow may still sit in the set from before sharding
+        keys = [self.completed_key(self.shard_of(workflow_id))]
+        if self.shard_count > 1:
+            keys.append(WORKFLOW_SCHEDULES_COMPLETED)
+        return keys
+
+    def register_schedules(self, schedules: list):
+        """
+        Write any number of schedules in one pipeline, then wake the replicas
+        owning their shards: the new deadline may be earlier than the one they
+        sleep until. Not a transaction, as schedules of several shards span
+        several cluster slots; a claim landing between the delete and the
+        write drops the member, which the ZADD right after puts back.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        tags = set()
+        for schedule in schedules:
+            workflow_id = str(schedule.workflow_id)
+            key = self.schedule_key(workflow_id)
+            pipe.delete(key)  # don't inherit fields the new schedule leaves unset
+            pipe.hset(key, mapping=self._hash_fields(schedule))
+            pipe.zadd(self.zset_key(workflow_id), {workflow_id: schedule.next_run_timestamp()})
+            for completed in self._completed_keys(workflow_id):
+                pipe.srem(completed, workflow_id)
+            tags.add(slot_tag(self.shard_stream(self.shard_of(workflow_id))))
+        for tag in tags:
+            pipe.publish(SCHEDULER_WAKEUP_CHANNEL, tag)
+        pipe.execute()
+        for schedule in schedules:
+            self._wheel_track(str(schedule.workflow_id), schedule.next_run_timestamp())
+
+    def remove_schedules(self, workflow_ids) -> int:
+        """Drop any number of schedules in one pipeline; returns how many existed"""
+        workflow_ids = [str(workflow_id) for workflow_id in workflow_ids]
+        pipe = self.redis.pipeline(transaction=False)
+        for workflow_id in workflow_ids:
+            pipe.zrem(self.zset_key(workflow_id), workflow_id)
+        for workflow_id in workflow_ids:
+            pipe.delete(self.schedule_key(workflow_id))
+            for completed in self._completed_keys(workflow_id):
+                pipe.srem(completed, workflow_id)
+        results = pipe.execute()
+        for workflow_id in workflow_ids:
+            self._wheel_track(workflow_id, None)
+        return sum(1 for removed in results[:len(workflow_ids)] if removed)
+
+    def scheduled_workflow_ids(self) -> set:
+        """Ids of every workflow with a schedule, across all shards"""
+        return {
+            member.decode() if isinstance(member, bytes) else member
+            for shard in range(self.shard_count)
+            for member, _ in self.redis.zscan_iter(self.shard_zset(shard))
+        }
+
+    def completed_workflow_ids(self) -> set:
+        keys = {self.completed_key(shard) for shard in range(self.shard_count)} | {WORKFLOW_SCHEDULES_COMPLETED}
+        return {
+            member.decode() if isinstance(member, bytes) else member
+            for key in keys
+            for member in self.redis.smembers(key)
+        }
+
+    def get_schedule(self, workflow_id):
+        data = self.redis.hgetall(self.schedule_key(workflow_id))
+        if not data:
+            return None
+        return Schedule.from_dict({
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in data.items()
+        })
 
-        for raw in schedules:
-            raw_str = raw.decode() if isinstance(raw, bytes) else raw
+    def cron_fire_times(self, expression: str, timezone: str = None, after: float = None, offset: float = 0) -> list:
+        """The next `cron_lookahead` fire times of a cron schedule, shifted by its spread offset"""
+        if after is not None:
+            after -= offset
+        return [t + offset for t in cron.next_fire_times(expression, timezone, after=after, count=self.cron_lookahead)]
+
+    def _refill_fire_times(self, workflow_id):
+        """Top up a cron schedule's precomputed fire times, outside the claim script"""
+        key = self.schedule_key(workflow_id)
+        with self.redis.pipeline() as pipe:
             try:
-                data = json.loads(raw_str)
-                if str(data.get("workflow_id")) == str(workflow_id):
-                    self.redis.zrem(WORKFLOW_SCHEDULES_ZSET, raw)
-                    removed = True
-            except json.JSONDecodeError:
-                continue
+                pipe.watch(key)
+                expression, timezone, raw_times, until_ts, jitter_seconds = [
+                    v.decode() if isinstance(v, bytes) else v
+                    for v in pipe.hmget(key, "cron", "timezone", "fire_times", "until_ts", "jitter_seconds")
+                ]
+                if not expression:
+                    return  # removed meanwhile
+
+                fire_times = json.loads(raw_times) if raw_times else []
+                if not isinstance(fire_times, list):
+                    fire_times = []  # an empty Lua table comes back as "{}"
+                after = max(fire_times[-1] if fire_times else 0, time.time())
+                offset = Schedule.spread_offset(workflow_id, jitter_seconds)
+                fire_times += self.cron_fire_times(expression, timezone, after=after, offset=offset)[:self.cron_lookahead - len(fire_times)]
+
+                pipe.multi()
+                if until_ts is not None and fire_times[0] > float(until_ts):
+                    pipe.zrem(self.zset_key(workflow_id), str(workflow_id))
+                    pipe.delete(key)
+                    pipe.sadd(self.completed_key(self.shard_of(workflow_id)), str(workflow_id))
+                    pipe.execute()
+                    print(f"[SchedulerService] 🏁 Schedule complete for workflow {workflow_id}")
+                    return
+                pipe.hset(key, mapping={"fire_times": json.dumps(fire_times), "next_run_ts": fire_times[0]})
+                pipe.zadd(self.zset_key(workflow_id), {str(workflow_id): fire_times[0]}, nx=True)
+                pipe.execute()
+                self._wheel_track(str(workflow_id), fire_times[0])
+            except WatchError:
+                pass  # another replica fired or refilled it first, it'll be flagged again if needed
+            except Exception as e:
+                print(f"[SchedulerService] ⚠️ Failed to refill cron fire times for workflow {workflow_id}: {e}")
+
+    def remove_schedule(self, workflow_id):
+        removed = self.remove_schedules([workflow_id])
 
         if removed:
             print(f"[SchedulerService] ❌ Removed all schedules for workflow {workflow_id}")
@@ -34,59 +450,233 @@ class SchedulerService:
             print(f"[SchedulerService] ⚠️ No schedules found to remove for workflow {workflow_id}")
 
     def update_schedule(self, schedule):
-        # Remove old schedules for this workflow
-        self.remove_schedule(schedule.workflow_id)
-
-        # Register new schedule with updated interval
+        # Registering overwrites the workflow's hash and score in place
         self.register_schedule(schedule)
 
-    def process_due_schedules(self):
-        now_ts = datetime.datetime.now(datetime.timezone.utc).timestamp()
-        due = self.redis.zrangebyscore(WORKFLOW_SCHEDULES_ZSET, 0, now_ts)
-
-        for raw in due:
-            raw_str = raw.decode() if isinstance(raw, bytes) else raw
-            data = json.loads(raw_str)
-            schedule = Schedule.from_dict(data)
-
-            # Trigger workflow
-            self.redis.xadd(WORKFLOW_TRIGGERS_STREAM, {
-                "workflow_id": schedule.workflow_id,
-                "context": json.dumps(schedule.context)
-            })
-            print(f"[SchedulerService] 🔔 Triggered workflow {schedule.workflow_id} (occurrence {schedule.occurrences + 1})")
-
-            # Increment occurrences
-            schedule.occurrences += 1
-            stop = False
-
-            if schedule.interval_seconds:
-                # ✅ Use UTC-aware datetime
-                next_run = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=schedule.interval_seconds)
-                schedule.next_run = next_run
-
-                # Handle 'until' safely
-                if schedule.until:
+    def migrate_legacy_schedules(self) -> int:
+        """
+        Bring schedules written under an older layout in line, once at startup:
+        whole JSON blobs in the sorted set (before per-workflow hashes) become
+        hashes, and ids sitting in another set than their shard's (after the
+        shard count changed) are moved over with their score and hash.
+        """
+        migrated = 0
+        zsets = [WORKFLOW_SCHEDULES_ZSET] + [
+            key.decode() if isinstance(key, bytes) else key
+            for key in self.redis.r.scan_iter(match=f"{WORKFLOW_SCHEDULES_ZSET}:*", _type="zset")
+        ]
+        for zset in zsets:
+            # Sets named by a shard tag keep tagged hashes; the untagged set and
+            # the numbered sets from before hash tags kept plain ones
+            tag = zset[len(WORKFLOW_SCHEDULES_ZSET) + 1:]
+            hash_prefix = f"{WORKFLOW_SCHEDULE_PREFIX}:{tag}" if tag.startswith("{") else WORKFLOW_SCHEDULE_PREFIX
+            for raw, score in self.redis.zscan_iter(zset):
+                raw_str = raw.decode() if isinstance(raw, bytes) else raw
+                if raw_str.startswith("{"):
                     try:
-                        until_dt = datetime.datetime.fromisoformat(schedule.until.replace("Z", "+00:00"))
-                        if next_run > until_dt:
-                            stop = True
-                    except Exception as e:
-                        print(f"[SchedulerService] ⚠️ Failed to parse 'until' ({schedule.until}): {e}")
-                        stop = True
-
-                if schedule.max_occurrences and schedule.occurrences >= schedule.max_occurrences:
-                    stop = True
-            else:
-                stop = True
+                        schedule = Schedule.from_dict(json.loads(raw_str))
+                    except (json.JSONDecodeError, KeyError, ValueError) as e:
+                        print(f"[SchedulerService] ⚠️ Dropping unreadable schedule member: {e}")
+                        self.redis.zrem(zset, raw)
+                        continue
+                    self.redis.zrem(zset, raw)
+                    self.register_schedule(schedule)
+                    migrated += 1
+                elif zset != self.zset_key(raw_str):
+                    old_key = f"{hash_prefix}:{raw_str}"
+                    data = self.redis.hgetall(old_key)
+                    if data:
+                        data = {
+                            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+                            for k, v in data.items()
+                        }
+                        self.register_schedule(Schedule.from_dict(data))
+                    else:
+                        self.redis.zadd(self.zset_key(raw_str), {raw_str: score})
+                    self.redis.zrem(zset, raw)
+                    if old_key != self.schedule_key(raw_str):
+                        self.redis.delete(old_key)
+                    migrated += 1
 
-            # Remove old schedule entry first
-            self.redis.zrem(WORKFLOW_SCHEDULES_ZSET, raw_str)
+        if migrated:
+            print(f"[SchedulerService] 🔁 Migrated {migrated} schedules to the current layout")
+        return migrated
 
-            if not stop:
-                self.redis.zadd(
-                    WORKFLOW_SCHEDULES_ZSET,
-                    {json.dumps(schedule.to_dict()): schedule.next_run.timestamp()}
-                )
+    def metrics(self) -> dict:
+        """
+        Scheduler-wide counters kept by the claim script: schedules claimed,
+        runs fired and skipped, misfires, and total/max lateness in seconds.
+        Summed over the shards' hashes (max taken for the max).
+        """
+        keys = {self.metrics_key(shard) for shard in range(self.shard_count)} | {SCHEDULER_METRICS_HASH}
+        metrics = {}
+        for key in keys:
+            for k, v in self.redis.hgetall(key).items():
+                k = k.decode() if isinstance(k, bytes) else k
+                if k == "lateness_seconds_max":
+                    metrics[k] = max(metrics.get(k, 0.0), float(v))
+                else:
+                    metrics[k] = metrics.get(k, 0.0) + float(v)
+        claimed = metrics.get("claimed", 0)
+        metrics["lateness_seconds_avg"] = metrics.get("lateness_seconds_total", 0) / claimed if claimed else 0.0
+        return metrics
+
+    def next_due_timestamp(self):
+        """Score of the earliest owned schedule (or the end of a rate-limit pause), None when nothing is scheduled"""
+        if self.wheel:
+            firsts = [ts for ts in (self.wheel.next_deadline(), self._next_wheel_load) if ts is not None]
+            return max(min(firsts), self._throttled_until or 0)
+
+        firsts = [
+            first[0][1]
+            for first in (self.redis.zrange(zset, 0, 0, withscores=True) for zset in self.owned_zsets())
+            if first
+        ]
+        if not firsts:
+            return None
+        if self._throttled_until:
+            return max(min(firsts), self._throttled_until)
+        return min(firsts)
+
+    def _claim_budget(self) -> int:
+        """How many schedules the next claim may take under the emit rate cap"""
+        if not self.max_triggers_per_second:
+            return self.claim_batch_size
+
+        now = time.monotonic()
+        rate = self.max_triggers_per_second
+        # Room for at least one trigger, or a rate below 1/s could never fire
+        self._budget = min(self._budget + (now - self._budget_at) * rate, max(rate, 1))
+        self._budget_at = now
+        if self._budget < 1:
+            self._throttled_until = time.time() + (1 - self._budget) / rate
+            return 0
+        self._throttled_until = None
+        return min(self.claim_batch_size, int(self._budget))
+
+    def process_due_schedules(self) -> int:
+        """
+        Fire every due schedule in the sets this replica owns. Each script call
+        claims, triggers and reschedules up to `claim_batch_size` schedules
+        atomically, so several scheduler replicas can run side by side without
+        double-firing.
+        """
+        if self.wheel:
+            return self._process_wheel()
+
+        fired_total = 0
+        for shard in self.owned_shards():
+            fired, throttled = self._process_shard(shard)
+            fired_total += fired
+            if throttled:
+                break  # over the emit rate cap, the rest stays due
+        return fired_total
+
+    def _process_shard(self, shard: int):
+        """Drain one shard's schedule set; returns (claimed, throttled)"""
+        fired_total = 0
+        while True:
+            limit = self._claim_budget()
+            if not limit:
+                return fired_total, True
+
+            # The script takes each schedule's hash in KEYS, so the due ids are
+            # picked here and re-checked there
+            now_ts = datetime.datetime.now(datetime.timezone.utc).timestamp()
+            workflow_ids = [
+                member.decode() if isinstance(member, bytes) else member
+                for member in self.redis.r.zrangebyscore(self.shard_zset(shard), "-inf", now_ts, start=0, num=limit)
+            ]
+            if not workflow_ids:
+                return fired_total, False
+            fired_total += self._claim(shard, workflow_ids)
+            if len(workflow_ids) < limit:
+                return fired_total, False
+
+    def _claim(self, shard: int, workflow_ids: list) -> int:
+        """One claim script call over the given ids of one shard"""
+        stream = self.shard_stream(shard)
+        keys = [
+            self.shard_zset(shard), stream, TriggerCoalescer.debounce_zset(stream),
+            self.metrics_key(shard), self.completed_key(shard)
+        ]
+        for workflow_id in workflow_ids:
+            keys += [self.schedule_key(workflow_id), self.debounce_buffer(workflow_id)]
+        now_ts = datetime.datetime.now(datetime.timezone.utc).timestamp()
+        fired = self._claim_due(
+            keys=keys,
+            args=[
+                now_ts, self.cron_lookahead // 2, self.misfire_grace_seconds, self.misfire_max_catchup,
+                SCHEDULER_WAKEUP_CHANNEL, slot_tag(stream), *workflow_ids
+            ]
+        )
+
+        for workflow_id, occurrences, done, refill, fires, lateness, next_run in fired:
+            workflow_id = workflow_id.decode() if isinstance(workflow_id, bytes) else workflow_id
+            next_run = next_run.decode() if isinstance(next_run, bytes) else next_run
+            lateness = float(lateness)
+            if fires == 0:
+                print(f"[SchedulerService] ⏭️ Skipped missed run of workflow {workflow_id} ({lateness:.1f}s late)")
+            elif fires > 1:
+                print(f"[SchedulerService] 🔔 Caught up {fires} missed runs of workflow {workflow_id} ({lateness:.1f}s late)")
             else:
-                print(f"[SchedulerService] 🏁 Schedule complete for workflow {schedule.workflow_id}")
+                print(f"[SchedulerService] 🔔 Triggered workflow {workflow_id} (occurrence {occurrences}, {lateness:.3f}s late)")
+            if done:
+                print(f"[SchedulerService] 🏁 Schedule complete for workflow {workflow_id}")
+            if refill:
+                self._refill_fire_times(workflow_id)
+            if self.wheel and next_run:
+                self._wheel_track(workflow_id, float(next_run))
+            self._budget -= fires
+        return len(fired)
+
+    def _load_wheel(self):
+        """Refill the timing wheel with every owned schedule due within the horizon"""
+        now = time.time()
+        self._wheel_horizon_end = now + self.wheel_horizon_seconds
+        self.wheel.clear()
+        self._wheel_shards.clear()
+        for shard in self.owned_shards():
+            for member, score in self.redis.zrangebyscore(self.shard_zset(shard), "-inf", self._wheel_horizon_end, withscores=True):
+                workflow_id = member.decode() if isinstance(member, bytes) else member
+                self.wheel.add(workflow_id, score)
+                self._wheel_shards[workflow_id] = shard
+        self._next_wheel_load = now + self.wheel_horizon_seconds / 2
+        print(f"[SchedulerService] 🛞 Loaded {len(self.wheel)} schedules due in the next {self.wheel_horizon_seconds:.0f}s")
+
+    def _wheel_track(self, workflow_id: str, next_run):
+        """Keep the wheel in step with a schedule that was (re)registered, fired or removed"""
+        if not self.wheel:
+            return
+        shard = self.shard_of(workflow_id)
+        if next_run is None or next_run > self._wheel_horizon_end or shard not in self.owned_shards():
+            self.wheel.remove(workflow_id)
+            self._wheel_shards.pop(workflow_id, None)
+            return
+        self.wheel.add(workflow_id, next_run)
+        self._wheel_shards[workflow_id] = shard
+
+    def _process_wheel(self) -> int:
+        """Claim, in batches, whatever the wheel expired"""
+        if time.time() >= self._next_wheel_load:
+            self._load_wheel()
+
+        by_shard = {}
+        for workflow_id in self.wheel.advance():
+            shard = self._wheel_shards.pop(workflow_id, None)
+            if shard is not None:
+                by_shard.setdefault(shard, []).append(workflow_id)
+
+        fired_total = 0
+        for shard, workflow_ids in by_shard.items():
+            while workflow_ids:
+                limit = self._claim_budget()
+                if not limit:
+                    # Over the emit rate cap: put the rest back, they expire again next tick
+                    for workflow_id in workflow_ids:
+                        self._wheel_track(workflow_id, time.time())
+                    workflow_ids = []
+                    continue
+                batch, workflow_ids = workflow_ids[:limit], workflow_ids[limit:]
+                fired_total += self._claim(shard, batch)
+        return fired_total
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable
+
+
+class SideEffectPool:
+    """
+    Runs slow trigger-registration side effects (external API calls) off the
+    scheduler loop.
+
+    Concurrency is bounded by the worker count. Tasks sharing a key (the
+    workflow id) run one after another in submission order, so a deactivation
+    can't overtake the activation it undoes. Failed tasks are retried with
+    exponential backoff.
+    """
+
+    def __init__(self, max_workers: int = 4, max_retries: int = 3, backoff_seconds: float = 1.0):
+        self.executor = ThreadPoolExecutor(max_workers=max(int(max_workers), 1), thread_name_prefix="side-effect")
+        self.max_retries = max(int(max_retries), 0)
+        self.backoff_seconds = backoff_seconds
+        self._queues = {}  # key -> deque of pending (name, fn, args)
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, name: str, fn: Callable, *args):
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is not None:
+                queue.append((name, fn, args))  # a drain for this key is already running
+                return
+            self._queues[key] = deque([(name, fn, args)])
+        self.executor.submit(self._drain, key)
+
+    def _drain(self, key):
+        while True:
+            with self._lock:
+                queue = self._queues[key]
+                if not queue:
+                    del self._queues[key]
+                    return
+                name, fn, args = queue.popleft()
+            self._run(name, fn, args)
+
+    def _run(self, name: str, fn: Callable, args: tuple):
+        for attempt in range(self.max_retries + 1):
+            try:
+                fn(*args)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"[SideEffectPool] ❌ {name} failed after {attempt + 1} attempts: {e}")
+                    return
+                delay = self.backoff_seconds * 2 ** attempt
+                print(f"[SideEffectPool] ⚠️ {name} failed ({e}), retrying in {delay:.0f}s")
+                time.sleep(delay)
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -4,9 +4,14 @@ from typing import Dict, Optional
 from fastapi import HTTPException
 from utils.token_security import decrypt_credentials
 from repositories.sqlalchemy_workflow_node_repository import SqlAlchemyWorkflowNodeRepository
+from repositories.async_sqlalchemy_workflow_node_repository import AsyncSqlAlchemyWorkflowNodeRepository
 from services.redis_service import RedisService
+from core.trigger_lanes import LANE_WEBHOOK, lane_stream
+from services.concurrency_limiter import concurrency_fields
+from services.trigger_coalescer import AsyncTriggerCoalescer
 
-WORKFLOW_TRIGGERS_STREAM = "workflow_triggers"
+WORKFLOW_TRIGGERS_STREAM = lane_stream(LANE_WEBHOOK)
+TELEGRAM_TRIGGER_CATEGORY = "TelegramTriggerNode"
 
 
 class TelegramService:
@@ -55,43 +60,58 @@ class TelegramService:
         
         return webhook_info
 
-    def process_webhook(self, workflow_id: int, node_id: int, update_data: Dict) -> Dict:
-        """
-        Receives Telegram webhook messages and triggers the associated workflow.
-        This method processes incoming updates from Telegram and publishes them to Redis.
-        """
-        # Extract message data
+    @staticmethod
+    def webhook_context(update_data: Dict) -> Optional[Dict]:
+        """Trigger context for a Telegram update, or None when it carries no message"""
         message = update_data.get("message", {})
         if not message:
-            # This might be an edited message or other update type
-            print(f"[TelegramService] Received non-message update: {update_data}")
-            return {"ok": True}
-        
-        # Build context with message data
-        chat_data = message.get("chat", {})
-        chat_id = chat_data.get("id")
-        text = message.get("text")
-        
-        context = {
-            "message": message,
-            "chat_id": chat_id,
-            "text": text,
-            "from_user": message.get("from"),
-            "chat": chat_data,
-            "date": message.get("date"),
+            return None
+
+        # The update is carried once; the worker rebuilds message, chat and
+        # from_user from it (TelegramTriggerNodeExecutor.expand_context).
+        # The scalars stay for serialize_by / coalesce_by.
+        return {
             "update": update_data,
+            "chat_id": message.get("chat", {}).get("id"),
+            "text": message.get("text"),
+            "date": message.get("date"),
         }
-        
+
+
+class AsyncTelegramWebhookService:
+    """
+    Webhook intake: receives Telegram updates and triggers the associated
+    workflow through the webhook lane, without blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        workflow_node_repo: AsyncSqlAlchemyWorkflowNodeRepository,
+        trigger_coalescer: AsyncTriggerCoalescer
+    ):
+        self.workflow_node_repo = workflow_node_repo
+        self.trigger_coalescer = trigger_coalescer
+
+    async def process_webhook(self, workflow_id: int, node_id: int, update_data: Dict) -> Dict:
+        context = TelegramService.webhook_context(update_data)
+        if context is None:
+            print(f"[TelegramService] Received non-message update: {update_data}")
+            return {"ok": True}
+
         print(f"[TelegramService] Received message for workflow {workflow_id}, node {node_id}")
-        print(f"[TelegramService] Message: {message.get('text', 'No text')}")
-        
-        # Add to Redis stream to trigger workflow
-        self.redis_service.add_to_stream(WORKFLOW_TRIGGERS_STREAM, {
-            "workflow_id": str(workflow_id),
-            "context": json.dumps(context)
-        })
-        
+
+        # Concurrency and debounce settings live on the trigger node
+        workflow_node = await self.workflow_node_repo.get_by_id(node_id)
+        node_config = (workflow_node.custom_config if workflow_node else None) or {}
+
+        await self.trigger_coalescer.submit(
+            WORKFLOW_TRIGGERS_STREAM,
+            workflow_id,
+            context,
+            config=node_config,
+            fields={**concurrency_fields(node_config, context), "trigger": TELEGRAM_TRIGGER_CATEGORY},
+        )
+
         print(f"[TelegramService] ✅ Triggered workflow {workflow_id} via Redis stream")
-        
-        return {"ok": True}
 
+        return {"ok": True}
@@ -0,0 +1,214 @@
+import time
+from typing import Optional
+from redis import Redis # type: ignore
+from redis.asyncio import Redis as AsyncRedis # type: ignore
+from core.codec import codec
+from core.trigger_lanes import slot_tag
+
+# Windows are tracked per target stream, in a sorted set sharing the stream's
+# Redis Cluster slot with the buffers, so the scripts below touch one slot.
+# The untagged set holds windows opened before that and is still drained.
+WORKFLOW_DEBOUNCE_ZSET = "workflow_debounce_zset"
+WORKFLOW_DEBOUNCE_PREFIX = "workflow_debounce"
+# Pub/sub channel announcing a new deadline (a window armed, a schedule
+# registered) with the slot tag of the keys concerned. Every scheduler replica
+# hears it, unlike a consumer group, and relays the ones it handles to the
+# capped inbox stream it blocks on.
+SCHEDULER_WAKEUP_CHANNEL = "scheduler_wakeup"
+SCHEDULER_WAKEUP_MAXLEN = 1000
+# How long a scheduler holds a closed window it is flushing; if it dies
+# before the merged trigger is emitted, the window falls due again after this
+FLUSH_LEASE_SECONDS = 30
+
+# Buffers one trigger and arms the window when the buffer was empty. Arming
+# also wakes the schedulers, which otherwise sleep until their next known deadline.
+#   KEYS: [buffer, debounce_zset]
+#   ARGV: [item, flush_at, wakeup_channel, slot_tag]
+_BUFFER_SCRIPT = """
+local size = redis.call('RPUSH', KEYS[1], ARGV[1])
+if size == 1 then
+    redis.call('ZADD', KEYS[2], ARGV[2], KEYS[1])
+    redis.call('PUBLISH', ARGV[3], ARGV[4])
+end
+return size
+"""
+
+# Leases a due buffer: pushes its deadline out to the lease end and returns
+# its items, leaving them in place until the merged trigger is emitted.
+#   KEYS: [buffer, debounce_zset]
+#   ARGV: [now, lease_until]
+_LEASE_SCRIPT = """
+local due = redis.call('ZSCORE', KEYS[2], KEYS[1])
+if not due or tonumber(due) > tonumber(ARGV[1]) then
+    return {}
+end
+local items = redis.call('LRANGE', KEYS[1], 0, -1)
+if #items == 0 then
+    redis.call('ZREM', KEYS[2], KEYS[1])
+else
+    redis.call('ZADD', KEYS[2], ARGV[2], KEYS[1])
+end
+return items
+"""
+
+# Emits the merged trigger of a leased buffer and drops the items it merged,
+# in one call, so a trigger is never lost between the two. Items buffered
+# during the lease stay and are flushed right away. Returns 0 when the lease
+# was lost (expired and taken by another scheduler).
+#   KEYS: [buffer, debounce_zset, stream]
+#   ARGV: [lease_until, item_count, now, field, value, ...]
+_FINISH_SCRIPT = """
+local leased = redis.call('ZSCORE', KEYS[2], KEYS[1])
+if not leased or tonumber(leased) ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('XADD', KEYS[3], '*', unpack(ARGV, 4))
+redis.call('LTRIM', KEYS[1], tonumber(ARGV[2]), -1)
+if redis.call('LLEN', KEYS[1]) > 0 then
+    redis.call('ZADD', KEYS[2], ARGV[3], KEYS[1])
+else
+    redis.call('ZREM', KEYS[2], KEYS[1])
+end
+return 1
+"""
+
+
+class TriggerCoalescer:
+    """
+    Sits between trigger producers and the workflow stream.
+
+    Trigger nodes that set `debounce_seconds` have their triggers buffered; all
+    triggers for the same workflow (and `coalesce_by` value, if set) arriving
+    within the window are merged into a single run. The merged context is the
+    latest event's context plus an `events` list with every buffered context.
+    `streams` are the target streams whose windows flush_due closes.
+    """
+
+    def __init__(self, redis_client: Redis, streams: Optional[list] = None):
+        self.r = redis_client
+        self.streams = list(streams or [])
+        self._buffer = self.r.register_script(_BUFFER_SCRIPT)
+        self._lease = self.r.register_script(_LEASE_SCRIPT)
+        self._finish = self.r.register_script(_FINISH_SCRIPT)
+
+    def submit(self, stream: str, workflow_id: int, context: dict, config: Optional[dict] = None, fields: Optional[dict] = None):
+        """Enqueue a trigger, either straight onto the stream or into its debounce window."""
+        config = config or {}
+        fields = {"workflow_id": str(workflow_id), **(fields or {})}
+
+        window = self.window(config)
+        if not window:
+            fields["context"] = codec.encode(context)
+            return self.r.xadd(stream, fields)
+
+        buffer_key = self.buffer_key(stream, workflow_id, context, config)
+        item = codec.encode({"stream": stream, "fields": fields, "context": context})
+        size = self._buffer(
+            keys=[buffer_key, self.debounce_zset(stream)],
+            args=[item, time.time() + window, SCHEDULER_WAKEUP_CHANNEL, slot_tag(stream)]
+        )
+        print(f"[TriggerCoalescer] Buffered trigger for workflow {workflow_id} ({size} pending in window)")
+        return None
+
+    @staticmethod
+    def debounce_zset(stream: str) -> str:
+        """Open windows of triggers bound for `stream`, scored by when they close"""
+        return f"{WORKFLOW_DEBOUNCE_ZSET}:{slot_tag(stream)}"
+
+    @staticmethod
+    def buffer_key(stream: str, workflow_id: int, context: dict, config: dict) -> str:
+        """Redis list collecting the triggers of one debounce window"""
+        buffer_key = f"{WORKFLOW_DEBOUNCE_PREFIX}:{slot_tag(stream)}:{workflow_id}"
+        coalesce_by = config.get("coalesce_by")
+        if coalesce_by and context.get(coalesce_by) is not None:
+            buffer_key = f"{buffer_key}:{context.get(coalesce_by)}"
+        return buffer_key
+
+    def _debounce_zsets(self) -> list:
+        return [self.debounce_zset(stream) for stream in self.streams] + [WORKFLOW_DEBOUNCE_ZSET]
+
+    def next_flush_timestamp(self):
+        """When the earliest open window closes, or None when nothing is buffered"""
+        pipe = self.r.pipeline(transaction=False)
+        for zset in self._debounce_zsets():
+            pipe.zrange(zset, 0, 0, withscores=True)
+        firsts = [first[0][1] for first in pipe.execute() if first]
+        return min(firsts) if firsts else None
+
+    def flush_due(self, batch_size: int = 100) -> int:
+        """Emit one merged trigger for every debounce window that has closed."""
+        flushed = 0
+        for zset in self._debounce_zsets():
+            flushed += self._flush_zset(zset, batch_size)
+        return flushed
+
+    def _flush_zset(self, zset: str, batch_size: int) -> int:
+        due = self.r.zrangebyscore(zset, 0, time.time(), start=0, num=batch_size)
+        flushed = 0
+
+        for buffer_key in due:
+            lease_until = time.time() + FLUSH_LEASE_SECONDS
+            items = self._lease(keys=[buffer_key, zset], args=[time.time(), lease_until])
+            if not items:
+                continue  # another scheduler is flushing it, or it was empty
+
+            events = [codec.decode(item) for item in items]
+            for event in events:
+                # Items buffered by the scheduler script carry the context pre-encoded
+                if isinstance(event["context"], (str, bytes)):
+                    event["context"] = codec.decode(event["context"])
+            latest = events[-1]
+            context = {
+                **latest["context"],
+                "events": [event["context"] for event in events],
+                "event_count": len(events),
+            }
+            args = [lease_until, len(items), time.time()]
+            for k, v in {**latest["fields"], "context": codec.encode(context)}.items():
+                args += [k, v]
+            if not self._finish(keys=[buffer_key, zset, latest["stream"]], args=args):
+                print(f"[TriggerCoalescer] ⚠️ Lost the flush lease on {buffer_key}, another scheduler emits it")
+                continue
+            print(f"[TriggerCoalescer] 🔔 Coalesced {len(events)} triggers for workflow {latest['fields']['workflow_id']}")
+            flushed += 1
+
+        return flushed
+
+    @staticmethod
+    def window(config: dict) -> float:
+        try:
+            return max(float(config.get("debounce_seconds") or 0), 0)
+        except (TypeError, ValueError):
+            print(f"[TriggerCoalescer] ⚠️ Ignoring invalid debounce_seconds: {config.get('debounce_seconds')}")
+            return 0
+
+
+class AsyncTriggerCoalescer:
+    """
+    Producer side of TriggerCoalescer for async code: same stream entries and
+    debounce buffers, written with an asyncio client. Windows are still
+    flushed by the scheduler's TriggerCoalescer.
+    """
+
+    def __init__(self, redis_client: AsyncRedis):
+        self.r = redis_client
+        self._buffer = self.r.register_script(_BUFFER_SCRIPT)
+
+    async def submit(self, stream: str, workflow_id: int, context: dict, config: Optional[dict] = None, fields: Optional[dict] = None):
+        """Enqueue a trigger, either straight onto the stream or into its debounce window."""
+        config = config or {}
+        fields = {"workflow_id": str(workflow_id), **(fields or {})}
+
+        window = TriggerCoalescer.window(config)
+        if not window:
+            fields["context"] = codec.encode(context)
+            return await self.r.xadd(stream, fields)
+
+        buffer_key = TriggerCoalescer.buffer_key(stream, workflow_id, context, config)
+        item = codec.encode({"stream": stream, "fields": fields, "context": context})
+        size = await self._buffer(
+            keys=[buffer_key, TriggerCoalescer.debounce_zset(stream)],
+            args=[item, time.time() + window, SCHEDULER_WAKEUP_CHANNEL, slot_tag(stream)]
+        )
+        print(f"[TriggerCoalescer] Buffered trigger for workflow {workflow_id} ({size} pending in window)")
+        return None
@@ -1,6 +1,26 @@
 from core.logger import Logger
 from core.executor import WorkflowExecutor
-import redis, json, os
+from core.trigger_lanes import (
+    TRIGGER_LANE_ORDER, TRIGGER_DEAD_LETTER_STREAM, TRIGGER_DEAD_LETTER_MAXLEN, RESERVED_CONTEXT_KEYS, lane_streams
+)
+from core.codec import codec
+from core.node_factory import NodeFactory
+from core.redis_pool import get_redis
+from services.concurrency_limiter import ConcurrencyLimiter
+from services.run_tracker import RunListener
+import redis, json, os, signal, socket, threading, time
+
+# Per-consumer list of entries handed over by a draining peer
+HANDOFF_KEY_PREFIX = "workflow_worker_handoff"
+# A consumer that read within this window counts as alive for handoffs
+PEER_MAX_IDLE_MS = 30000
+# How often pending entries of dead consumers are looked for
+RECLAIM_INTERVAL_SECONDS = 30
+# Admitted and running entries are re-claimed by their consumer this often,
+# which resets their idle time while it is alive
+HEARTBEAT_INTERVAL_SECONDS = 10
+# An entry idle this long missed several heartbeats: its consumer is gone
+RECLAIM_IDLE_MS = 60000
 
 class TriggerWorker:
     def __init__(
@@ -9,31 +29,143 @@ class TriggerWorker:
         redis_url="redis://localhost:6379/0",
         group_name="workflow_group",
         consumer_name=None,
-        services=None
+        services=None,
+        concurrency_lease_seconds=600,
+        lane_weights=None,
+        batch_size=1,
+        drain_grace_seconds=30,
+        run_ttl_seconds=86400,
+        scheduled_shards=1
     ):
         self.executor = executor
-        self.r = redis.Redis.from_url(redis_url)
-        self.stream_name = "workflow_triggers"
+        self.r = get_redis(redis_url)
         self.group_name = group_name
-        self.consumer_name = consumer_name or f"consumer-{os.getpid()}"
+        # Unique across containers (their pids are all alike), stable across a restart of the same one
+        self.consumer_name = consumer_name or f"consumer-{socket.gethostname()}-{os.getpid()}"
         self.services = services or {}  # ✅ injected services
+        self.limiter = ConcurrencyLimiter(self.r, lease_seconds=concurrency_lease_seconds)
+        self.run_ttl_seconds = run_ttl_seconds
+        self._reclaim_at = 0.0
 
-        # create group if not exists
-        try:
-            self.r.xgroup_create(self.stream_name, self.group_name, id="0", mkstream=True)
-        except redis.exceptions.ResponseError as e:
-            if "BUSYGROUP" not in str(e):
-                raise
+        # Graceful drain state
+        self.drain_grace_seconds = drain_grace_seconds
+        self._draining = threading.Event()
+        self._in_flight = {}  # entry_id -> stream_name, admitted but not started yet
+        self._running = {}  # entry_id -> stream_name, the batch being executed
+        self._heartbeat_stop = threading.Event()
+        self._in_flight_lock = threading.Lock()
+
+        # Lane streams in priority order with the number of entries read per round.
+        # Scaling every lane by batch_size keeps the lane ratios while letting
+        # same-workflow entries of one read run as a micro-batch. The scheduled
+        # lane has a stream per scheduler shard, which split the lane's share.
+        lane_weights = lane_weights or {}
+        self.batch_size = max(int(batch_size), 1)
+        self.lanes = []
+        for lane in TRIGGER_LANE_ORDER:
+            streams = lane_streams(lane, max(int(scheduled_shards), 1))
+            share = max(int(lane_weights.get(lane, 1)), 1) * self.batch_size
+            self.lanes += [(stream_name, -(-share // len(streams))) for stream_name in streams]
+
+        # create group on every lane if not exists
+        for stream_name, _ in self.lanes:
+            try:
+                self.r.xgroup_create(stream_name, self.group_name, id="0", mkstream=True)
+            except redis.exceptions.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    def install_signal_handlers(self):
+        """Drain on SIGTERM/SIGINT instead of dying mid-run"""
+        signal.signal(signal.SIGTERM, self._on_shutdown_signal)
+        signal.signal(signal.SIGINT, self._on_shutdown_signal)
+
+    def _on_shutdown_signal(self, signum, frame):
+        if self._draining.is_set():
+            return
+        self.request_shutdown()
+
+    def request_shutdown(self):
+        """
+        Stop reading new entries and let the in-flight batch finish. If it is
+        still running after the grace period, its entries and the admitted
+        ones are handed to a peer and the process exits.
+        """
+        logger: Logger = self.services.get("logger")
+        logger.log(f"Draining {self.consumer_name}, grace period {self.drain_grace_seconds}s")
+        self._draining.set()
+        watchdog = threading.Timer(self.drain_grace_seconds, self._on_grace_expired)
+        watchdog.daemon = True
+        watchdog.start()
+
+    def _on_grace_expired(self):
+        # The running batch is cut short by the exit below, so its entries are
+        # handed back with the waiting ones and run again from the start by the
+        # peer; nothing here executes them after the hand-back.
+        logger: Logger = self.services.get("logger")
+        self._heartbeat_stop.set()
+        with self._in_flight_lock:
+            waiting, self._in_flight = self._in_flight, {}
+            running = dict(self._running)
+        logger.log(
+            f"Grace period over: handing back {len(waiting)} waiting entries "
+            f"and {len(running)} interrupted running ones"
+        )
+        self._hand_back({**waiting, **running}, logger)
+        os._exit(0)
+
+    def _heartbeat(self):
+        """
+        XCLAIM (JUSTID) every admitted and running entry to this consumer,
+        which resets its idle time: however long a run takes, peers only
+        reclaim entries whose consumer stopped heartbeating
+        """
+        logger: Logger = self.services.get("logger")
+        while not self._heartbeat_stop.wait(HEARTBEAT_INTERVAL_SECONDS):
+            with self._in_flight_lock:
+                entries = {**self._in_flight, **self._running}
+            by_stream = {}
+            for entry_id, stream_name in entries.items():
+                by_stream.setdefault(stream_name, []).append(entry_id)
+            for stream_name, entry_ids in by_stream.items():
+                try:
+                    self.r.xclaim(
+                        stream_name, self.group_name, self.consumer_name,
+                        min_idle_time=0, message_ids=entry_ids, justid=True
+                    )
+                except Exception as e:
+                    logger.log(f"Heartbeat for {len(entry_ids)} entries on {stream_name} failed: {e}")
 
     def listen(self):
         logger: Logger = self.services.get("logger")
         logger.log(f"Listening as {self.consumer_name}...")
-        while True:
+        threading.Thread(target=self._heartbeat, name="trigger-heartbeat", daemon=True).start()
+        while not self._draining.is_set():
+            # Entries a draining peer passed to us go first, they are already late
+            handled = self._process_handoffs(logger)
+            handled += self._reclaim_abandoned(logger)
+
+            # One weighted round: up to each lane's share of entries, highest priority first
+            for stream_name, share in self.lanes:
+                if self._draining.is_set():
+                    break
+                msgs = self.r.xreadgroup(
+                    groupname=self.group_name,
+                    consumername=self.consumer_name,
+                    streams={stream_name: ">"},
+                    count=share
+                )
+                handled += self._handle_messages(msgs, logger)
+
+            if handled or self._draining.is_set():
+                continue
+
+            # All lanes idle: block on all of them until something arrives
             msgs = self.r.xreadgroup(
                 groupname=self.group_name,
                 consumername=self.consumer_name,
-                streams={self.stream_name: ">"},
-                count=1,
+                streams={stream_name: ">" for stream_name, _ in self.lanes},
+                count=self.batch_size,
                 block=5000
             )
 
@@ -41,18 +173,226 @@ class TriggerWorker:
                 logger.log("No messages yet...")
                 continue
 
-            for stream, entries in msgs:
-                for entry_id, fields in entries:
-                    workflow_id = int(fields[b'workflow_id'])
-                    context = json.loads(fields[b'context'])
-
-                    # ✅ Inject shared services
-                    context["services"] = {**context.get("services", {}), **self.services}
-
-                    try:
-                        logger.log(f"Executing workflow {workflow_id}")
-                        self.executor.execute_workflow(workflow_id, context)
-                        self.r.xack(self.stream_name, self.group_name, entry_id)
-                        logger.log(f"Workflow {workflow_id} done, acked {entry_id}")
-                    except Exception as e:
-                        logger.log(f"Workflow {workflow_id} failed: {e}")
+            self._handle_messages(msgs, logger)
+
+        self._heartbeat_stop.set()
+        logger.log(f"{self.consumer_name} drained, exiting")
+
+    def _handle_messages(self, msgs, logger: Logger) -> int:
+        handled = 0
+        for stream, entries in msgs or []:
+            stream_name = stream.decode() if isinstance(stream, bytes) else stream
+
+            if self._draining.is_set():
+                # Read after the shutdown request: leave them to the peers
+                entry_ids = [e.decode() if isinstance(e, bytes) else e for e, _ in entries]
+                self._hand_back({entry_id: stream_name for entry_id in entry_ids}, self.services.get("logger"))
+                continue
+
+            # Group runnable entries by workflow so they execute as one micro-batch
+            batches = {}
+            for entry_id, raw_fields in entries:
+                handled += 1
+                entry = self._admit_entry(stream_name, entry_id, raw_fields, logger)
+                if entry:
+                    batches.setdefault(entry["workflow_id"], []).append(entry)
+
+            for workflow_id, batch in batches.items():
+                self._run_batch(stream_name, workflow_id, batch, logger)
+        return handled
+
+    def _admit_entry(self, stream_name, entry_id, raw_fields, logger: Logger):
+        """
+        Decode an entry and take its concurrency slots; returns None if it was
+        deferred or, being malformed, dead-lettered
+        """
+        entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+        try:
+            fields = {}
+            for k, v in raw_fields.items():
+                k = k.decode() if isinstance(k, bytes) else k
+                # The context stays encoded, it may be binary
+                fields[k] = v.decode() if isinstance(v, bytes) and k != "context" else v
+            workflow_id = int(fields["workflow_id"])
+        except Exception as e:
+            self._dead_letter(stream_name, entry_id, raw_fields, e, logger)
+            return None
+
+        # The token survives re-enqueues so held slots follow the run
+        fields.setdefault("run_token", entry_id)
+        token = fields["run_token"]
+
+        blocked_gate = self.limiter.acquire(stream_name, workflow_id, token, fields)
+        if blocked_gate:
+            # Parked on the gate's wait list; it comes back when a slot frees up
+            self.r.xack(stream_name, self.group_name, entry_id)
+            logger.log(f"Workflow {workflow_id} deferred, {blocked_gate} is full")
+            return None
+
+        try:
+            context = self._build_context(fields)
+        except Exception as e:
+            self.limiter.release(stream_name, workflow_id, token, fields)
+            self._dead_letter(stream_name, entry_id, raw_fields, e, logger)
+            return None
+
+        with self._in_flight_lock:
+            self._in_flight[entry_id] = stream_name
+
+        return {"id": entry_id, "workflow_id": workflow_id, "token": token, "fields": fields, "context": context}
+
+    def _build_context(self, fields) -> dict:
+        context = codec.decode(fields.get("context"))
+        if context is None:
+            context = {}
+        if not isinstance(context, dict):
+            raise ValueError(f"context must be a mapping, got {type(context).__name__}")
+
+        # Triggers that enqueue a compact context rebuild their outputs from it
+        trigger = NodeFactory.executors.get(fields.get("trigger"))
+        if hasattr(trigger, "expand_context"):
+            context = trigger.expand_context(context)
+
+        # Reserved keys are the worker's to fill, whatever the trigger sent
+        for key in RESERVED_CONTEXT_KEYS:
+            context.pop(key, None)
+
+        # ✅ Inject shared services
+        context["services"] = dict(self.services)
+        return context
+
+    def _dead_letter(self, stream_name, entry_id, raw_fields, error, logger: Logger):
+        """Move an entry that can never run to the dead-letter stream and ack it"""
+        logger.log(f"Dead-lettering entry {entry_id} from {stream_name}: {error}")
+        pipe = self.r.pipeline(transaction=True)
+        pipe.xadd(
+            TRIGGER_DEAD_LETTER_STREAM,
+            {**raw_fields, "source_stream": stream_name, "source_id": entry_id, "error": str(error)[:1000]},
+            maxlen=TRIGGER_DEAD_LETTER_MAXLEN,
+            approximate=True
+        )
+        pipe.xack(stream_name, self.group_name, entry_id)
+        pipe.execute()
+
+    def _run_batch(self, stream_name, workflow_id, batch, logger: Logger):
+        with self._in_flight_lock:
+            # Entries handed back by the grace watchdog belong to a peer now
+            batch = [entry for entry in batch if self._in_flight.pop(entry["id"], None)]
+            entry_ids = [entry["id"] for entry in batch]
+            self._running.update((entry_id, stream_name) for entry_id in entry_ids)
+        if not batch:
+            return
+        # Runs queued through the execute endpoint report their progress
+        listeners = [
+            RunListener(self.r, entry["fields"]["run_id"], self.run_ttl_seconds) if entry["fields"].get("run_id") else None
+            for entry in batch
+        ]
+        try:
+            logger.log(f"Executing workflow {workflow_id} from {stream_name} ({len(batch)} trigger(s))")
+            self._notify_runs(listeners, "run_started", logger)
+            self.executor.execute_workflow_batch(workflow_id, [entry["context"] for entry in batch], listeners)
+            self._notify_runs(listeners, "run_finished", logger)
+            self.r.xack(stream_name, self.group_name, *entry_ids)
+            logger.log(f"Workflow {workflow_id} done, acked {entry_ids}")
+        except Exception as e:
+            logger.log(f"Workflow {workflow_id} failed: {e}")
+            self._notify_runs(listeners, "run_finished", logger, error=str(e))
+        finally:
+            for entry in batch:
+                self.limiter.release(stream_name, workflow_id, entry["token"], entry["fields"])
+            with self._in_flight_lock:
+                for entry_id in entry_ids:
+                    self._running.pop(entry_id, None)
+
+    def _notify_runs(self, listeners, method, logger: Logger, **kwargs):
+        # Run tracking is best effort, it never fails the run itself
+        for listener in listeners:
+            if listener:
+                try:
+                    getattr(listener, method)(**kwargs)
+                except Exception as e:
+                    logger.log(f"Could not record {method} for run {listener.run_id}: {e}")
+
+    def _hand_back(self, entries: dict, logger: Logger):
+        """
+        XCLAIM unfinished entries (entry_id -> stream) to the most recently
+        active peer and queue them on its handoff list. With no live peer they
+        are queued for this consumer name, which a restart of the same container
+        reuses; otherwise they are reclaimed once idle.
+        """
+        by_stream = {}
+        for entry_id, stream_name in entries.items():
+            by_stream.setdefault(stream_name, []).append(entry_id)
+
+        for stream_name, entry_ids in by_stream.items():
+            peer = self._pick_peer(stream_name) or self.consumer_name
+            if peer != self.consumer_name:
+                self.r.xclaim(stream_name, self.group_name, peer, min_idle_time=0, message_ids=entry_ids)
+            self.r.rpush(
+                f"{HANDOFF_KEY_PREFIX}:{peer}",
+                *[json.dumps({"stream": stream_name, "id": entry_id}) for entry_id in entry_ids]
+            )
+            logger.log(f"Handed {len(entry_ids)} entries on {stream_name} to {peer}")
+
+    def _pick_peer(self, stream_name):
+        try:
+            consumers = self.r.xinfo_consumers(stream_name, self.group_name)
+        except redis.exceptions.ResponseError:
+            return None
+        peers = []
+        for consumer in consumers:
+            name = consumer["name"].decode() if isinstance(consumer["name"], bytes) else consumer["name"]
+            if name != self.consumer_name and consumer["idle"] < PEER_MAX_IDLE_MS:
+                peers.append((consumer["idle"], name))
+        return min(peers)[1] if peers else None
+
+    def _reclaim_abandoned(self, logger: Logger) -> int:
+        """
+        Every RECLAIM_INTERVAL_SECONDS, XAUTOCLAIM entries whose consumer
+        stopped heartbeating (it died) and run them here
+        """
+        if time.monotonic() < self._reclaim_at:
+            return 0
+        self._reclaim_at = time.monotonic() + RECLAIM_INTERVAL_SECONDS
+
+        handled = 0
+        for stream_name, share in self.lanes:
+            start_id = "0-0"
+            while not self._draining.is_set():
+                result = self.r.xautoclaim(
+                    stream_name, self.group_name, self.consumer_name,
+                    min_idle_time=RECLAIM_IDLE_MS, start_id=start_id, count=share
+                )
+                start_id, entries = result[0], result[1]
+                # Entries trimmed from the stream come back without fields and can't run
+                trimmed = [entry_id for entry_id, fields in entries if not fields]
+                if trimmed:
+                    self.r.xack(stream_name, self.group_name, *trimmed)
+                entries = [(entry_id, fields) for entry_id, fields in entries if fields]
+                if entries:
+                    logger.log(f"Reclaimed {len(entries)} abandoned entries from {stream_name}")
+                    handled += self._handle_messages([(stream_name, entries)], logger)
+                if start_id in (b"0-0", "0-0"):
+                    break
+        return handled
+
+    def _process_handoffs(self, logger: Logger) -> int:
+        handled = 0
+        handoff_key = f"{HANDOFF_KEY_PREFIX}:{self.consumer_name}"
+        while not self._draining.is_set():
+            raw = self.r.lpop(handoff_key)
+            if not raw:
+                break
+            item = json.loads(raw)
+            stream_name, entry_id = item["stream"], item["id"]
+
+            # Skip entries the previous owner managed to ack before exiting
+            if not self.r.xpending_range(stream_name, self.group_name, min=entry_id, max=entry_id, count=1):
+                continue
+            entries = self.r.xrange(stream_name, min=entry_id, max=entry_id)
+            if not entries:
+                continue
+
+            logger.log(f"Resuming handed-off entry {entry_id} from {stream_name}")
+            handled += self._handle_messages([(stream_name, entries)], logger)
+        return handled
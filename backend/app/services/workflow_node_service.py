@@ -8,9 +8,10 @@ from services.redis_service import RedisService
 from repositories.sqlalchemy_user_credential_repository import SqlAlchemyUserCredentialRepository
 from repositories.sqlalchemy_workflow_repository import SqlAlchemyWorkflowRepository
 from repositories.sqlalchemy_workflow_node_repository import SqlAlchemyWorkflowNodeRepository
-from repositories.sqlalchemy_node_repository import SqlAlchemyNodeRepository
+from core.node_catalog import NodeCatalog
 from repositories.sqlalchemy_workflow_connection_repository import SqlAlchemyWorkflowConnectionRepository
-from models.db_models.node_db import Node
+from repositories.sqlalchemy_outbox_repository import SqlAlchemyOutboxRepository
+from models.schemas.node import NodeResponse
 from utils.token_security import decrypt_credentials, encrypt_credentials
 from dynamic_outputs import DynamicOutputRegistry
 
@@ -18,18 +19,20 @@ class WorkflowNodeService:
     def __init__(
             self, 
             workflow_node_repo: SqlAlchemyWorkflowNodeRepository, 
-            node_repo: SqlAlchemyNodeRepository,
+            node_catalog: NodeCatalog,
             workflow_repo: SqlAlchemyWorkflowRepository,
             credentials_repo: SqlAlchemyUserCredentialRepository,
             redis_service: RedisService,
             workflow_connection_repo: SqlAlchemyWorkflowConnectionRepository,
+            outbox_repo: SqlAlchemyOutboxRepository,
         ):
         self.workflow_node_repo = workflow_node_repo
-        self.node_repo = node_repo 
+        self.node_catalog = node_catalog
         self.workflow_repo = workflow_repo
         self.credentials_repo = credentials_repo
         self.redis_service = redis_service
         self.workflow_connection_repo = workflow_connection_repo
+        self.outbox_repo = outbox_repo
 
     def _resolve_outputs(self, config_metadata: Dict[str, Any], node_config: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
         outputs_def = config_metadata.get("outputs", [])
@@ -89,19 +92,21 @@ class WorkflowNodeService:
         for parent_id in parent_node_ids:
             parent_workflow_node = self.workflow_node_repo.get_by_id(parent_id)
             if parent_workflow_node:
-                parent_node = self.node_repo.get_node(parent_workflow_node.node_id)
+                parent_node = self.node_catalog.get_node(parent_workflow_node.node_id)
                 if parent_node:
-                    config_metadata = parent_node.config_metadata or {}
-                    outputs = self._resolve_outputs(config_metadata, parent_workflow_node.custom_config)
-                    parent_outputs.append({
-                        "parent_id": parent_id,
-                        "parent_name": parent_workflow_node.name,
-                        "parent_node_type": parent_node.type,
-                        "outputs": outputs
-                    })
+                    parent_outputs.append(self._parent_output(parent_workflow_node, parent_node))
         
         return parent_outputs
 
+    def _parent_output(self, parent_workflow_node: WorkflowNodeSchema, parent_node: NodeResponse) -> dict:
+        config_metadata = parent_node.config_metadata or {}
+        return {
+            "parent_id": parent_workflow_node.id,
+            "parent_name": parent_workflow_node.name,
+            "parent_node_type": parent_node.type,
+            "outputs": self._resolve_outputs(config_metadata, parent_workflow_node.custom_config)
+        }
+
     # ------------------------
     # Create
     # ------------------------
@@ -111,11 +116,18 @@ class WorkflowNodeService:
             raise ValueError("Node name cannot be empty.")
 
         # 2. Fetch the Node definition
-        db_node = self.node_repo.get_node(node_data.node_id)
+        db_node = self.node_catalog.get_node(node_data.node_id)
         if not db_node:
             raise HTTPException(status_code=404, detail="Node not found")
 
         # 3. Build default custom_config from config_metadata
+        node_data.custom_config = self.default_custom_config(db_node)
+
+        # 4. Save WorkflowNode
+        return self.workflow_node_repo.add(node_data)
+
+    @staticmethod
+    def default_custom_config(db_node: NodeResponse) -> dict:
         config_metadata = db_node.config_metadata or {}
         custom_config = {}
 
@@ -124,11 +136,7 @@ class WorkflowNodeService:
             default_value = input_def.get("default")
             custom_config[field_name] = default_value if default_value is not None else None
 
-        # 4. Set the custom_config
-        node_data.custom_config = custom_config
-
-        # 5. Save WorkflowNode
-        return self.workflow_node_repo.add(node_data)
+        return custom_config
 
     # ------------------------
     # Update
@@ -138,14 +146,35 @@ class WorkflowNodeService:
         if not node:
             return None
 
-        workflow = self.workflow_repo.get_by_id(node.workflow_id)
+        # Workflow lock first, then the node re-read under it: events of one
+        # workflow are inserted in commit order and built from current state
+        workflow = self.workflow_repo.get_for_update(node.workflow_id)
+        node = self.workflow_node_repo.get_for_update(node_id)
+        if not node:
+            return None
+        db_node = self.node_catalog.get_node(node.node_id)
+
+        event_payload = self.apply_update(node, update_data, workflow, db_node)
+        if event_payload:
+            # Staged, committed with the update
+            self.outbox_repo.add(WORKFLOW_UPDATED, event_payload)
+
+        updated_node = self.workflow_node_repo.update(node)
 
+        return updated_node
+
+    @staticmethod
+    def apply_update(node: WorkflowNodeSchema, update_data: WorkflowNodeUpdate, workflow: Optional[Workflow], db_node: Optional[NodeResponse]) -> Optional[dict]:
+        """
+        Apply `update_data` to `node`, encrypting a Telegram bot token and
+        stamping the owner's user_id. Returns the WORKFLOW_UPDATED payload when
+        the schedulers must be told, else None.
+        """
         # Apply updates
         for field, value in update_data.dict(exclude_unset=True).items():
             setattr(node, field, value)
 
         # Handle special encryption for TelegramTriggerNode bot_token
-        db_node = self.node_repo.get_node(node.node_id)
         if db_node and db_node.category == "TelegramTriggerNode" and node.custom_config:
             node.custom_config = dict(node.custom_config)  # ensure it's mutable
             # Encrypt bot_token if present
@@ -157,7 +186,7 @@ class WorkflowNodeService:
                         # Encrypt the token
                         encrypted_token = encrypt_credentials({"token": bot_token})
                         node.custom_config["bot_token"] = encrypted_token
-                        print(f"[WorkflowNodeService] Encrypted bot_token for node {node_id}")
+                        print(f"[WorkflowNodeService] Encrypted bot_token for node {node.id}")
                 except Exception as e:
                     print(f"[WorkflowNodeService] Warning: Failed to encrypt bot_token: {e}")
 
@@ -168,25 +197,20 @@ class WorkflowNodeService:
                 node.custom_config = dict(node.custom_config)  # ensure it's mutable
             node.custom_config["user_id"] = workflow.user_id
 
-        updated_node = self.workflow_node_repo.update(node)
-
         # ✅ If workflow is active, notify scheduler
-        if workflow and workflow.is_active and db_node.type == "trigger":
-            event_payload = {
+        if workflow and workflow.is_active and db_node and db_node.type == "trigger":
+            return {
                 "workflow_id": workflow.id,
                 "nodes": [
                     {
-                        "node_id": updated_node.id,
+                        "node_id": node.id,
                         "node_type": db_node.type,
                         "node_category": db_node.category,
-                        "custom_config": updated_node.custom_config,
+                        "custom_config": node.custom_config,
                     }
                 ],
             }
-
-            self.redis_service.publish_event(WORKFLOW_UPDATED, event_payload)
-
-        return updated_node
+        return None
 
 
     # ------------------------
@@ -197,13 +221,11 @@ class WorkflowNodeService:
         if not node:
             return False
 
-        deleted = self.workflow_node_repo.delete(node_id)
-
-        if deleted:
-            # Notify Redis that a workflow node was deleted
-            self.redis_service.publish_event(WORKFLOW_DELETED, {"workflow_id": node.workflow_id})
-
-        return deleted
+        # Notify the schedulers that a workflow node was deleted; committed with the
+        # delete, under the workflow's lock so it is numbered in commit order
+        self.workflow_repo.get_for_update(node.workflow_id)
+        self.outbox_repo.add(WORKFLOW_DELETED, {"workflow_id": node.workflow_id})
+        return self.workflow_node_repo.delete(node_id)
 
     def delete_all_nodes_in_workflow(self, workflow_id: int) -> None:
         self.workflow_node_repo.delete_by_workflow(workflow_id)
@@ -221,10 +243,84 @@ class WorkflowNodeService:
         if not workflow_node:
             raise HTTPException(status_code=404, detail="WorkflowNode not found")
 
-        node: Node = self.node_repo.get_node(workflow_node.node_id)
+        node: NodeResponse = self.node_catalog.get_node(workflow_node.node_id)
         if not node:
             raise HTTPException(status_code=404, detail="Node definition not found")
 
+        credentials = (node.config_metadata or {}).get("credentials")
+        hasCred = False
+        if(credentials):
+            workflow: Workflow = self.workflow_repo.get_by_id(workflow_node.workflow_id)
+            auth = self.credentials_repo.get_by_user_and_service(workflow.user_id, credentials.get("name"))
+            hasCred = self._has_credentials(credentials, auth)
+
+        # Get parent outputs
+        parents_outputs = self.get_parent_outputs(workflow_node_id)
+
+        return self._build_ui_schema(workflow_node, node, hasCred, parents_outputs)
+
+    def get_workflow_ui_schemas(self, workflow_id: int) -> List[dict]:
+        """
+        UI schemas of every node of a workflow, from at most four queries
+        whatever its size: the workflow, its nodes, its connections and the
+        owner's credentials, the last one skipped when no node takes any.
+        Definitions come from the node catalog (no query), parent outputs from
+        an in-memory adjacency map, and each credential is decrypted and
+        checked once. The route's ownership check adds one more on an owner
+        cache miss.
+        """
+        workflow: Workflow = self.workflow_repo.get_by_id(workflow_id)
+        if not workflow:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+
+        rows = [
+            (workflow_node, self.node_catalog.get_node(workflow_node.node_id))
+            for workflow_node in self.workflow_node_repo.list_by_workflow(workflow.id)
+        ]
+        rows = [(workflow_node, node) for workflow_node, node in rows if node]
+        connections = self.workflow_connection_repo.list_by_workflow_id(workflow.id)
+        nodes_by_id = {workflow_node.id: (workflow_node, node) for workflow_node, node in rows}
+
+        # Parents in connection order, like get_parent_outputs
+        parents_by_child: Dict[int, List[int]] = {}
+        for connection in connections:
+            parents_by_child.setdefault(connection.to_step_id, []).append(connection.from_step_id)
+
+        credential_defs = [
+            (node.config_metadata or {}).get("credentials") for _, node in rows
+        ]
+        services = {c.get("name") for c in credential_defs if c}
+        auth_by_service = {}
+        for auth in self.credentials_repo.list_by_user_and_services(workflow.user_id, list(services)):
+            # First match, like get_by_user_and_service
+            auth_by_service.setdefault(auth.service, auth)
+
+        has_cred_cache: Dict[tuple, bool] = {}
+        schemas = []
+        for (workflow_node, node), credentials in zip(rows, credential_defs):
+            hasCred = False
+            if credentials:
+                cache_key = (
+                    credentials.get("name"),
+                    credentials.get("type"),
+                    tuple(credentials.get("scopes", [])),
+                )
+                if cache_key not in has_cred_cache:
+                    has_cred_cache[cache_key] = self._has_credentials(
+                        credentials, auth_by_service.get(credentials.get("name"))
+                    )
+                hasCred = has_cred_cache[cache_key]
+
+            parents_outputs = [
+                self._parent_output(*nodes_by_id[parent_id])
+                for parent_id in parents_by_child.get(workflow_node.id, [])
+                if parent_id in nodes_by_id
+            ]
+            schemas.append(self._build_ui_schema(workflow_node, node, hasCred, parents_outputs))
+
+        return schemas
+
+    def _build_ui_schema(self, workflow_node: WorkflowNodeSchema, node: NodeResponse, hasCred: bool, parents_outputs: List[dict]) -> dict:
         config_metadata = node.config_metadata or {}
         custom_config = workflow_node.custom_config or {}
 
@@ -237,48 +333,6 @@ class WorkflowNodeService:
 
         outputs = self._resolve_outputs(config_metadata, custom_config)
 
-        credentials = config_metadata.get("credentials")
-        hasCred = False
-        if(credentials):
-            credentials_name = credentials.get("name")
-            credentials_type = credentials.get("type")  # "oauth2" or "api_key"
-
-            workflow: Workflow = self.workflow_repo.get_by_id(workflow_node.workflow_id)
-
-            auth = self.credentials_repo.get_by_user_and_service(workflow.user_id, credentials_name)
-            
-            if(auth):
-                cred = decrypt_credentials(auth.credentials)
-                
-                # Handle OAuth credentials (with scope)
-                if credentials_type == "oauth2" or auth.auth_type == "oauth2":
-                    metadata_scope = credentials.get("scopes", [])
-                    scope = cred.get("scope")
-                    if scope:
-                        scope_list = set(scope.split())
-                        metadata_set = set(metadata_scope)
-                        if metadata_set.issubset(scope_list):
-                            hasCred = True
-                # Handle API key credentials (no scope, just check if api_key exists)
-                elif credentials_type == "api_key" or auth.auth_type == "api_key":
-                    api_key = cred.get("api_key")
-                    if api_key:
-                        hasCred = True
-                # Fallback: if no type specified, check for scope (OAuth) or api_key
-                else:
-                    if cred.get("scope"):
-                        metadata_scope = credentials.get("scopes", [])
-                        scope = cred.get("scope")
-                        scope_list = set(scope.split())
-                        metadata_set = set(metadata_scope)
-                        if metadata_set.issubset(scope_list):
-                            hasCred = True
-                    elif cred.get("api_key"):
-                        hasCred = True
-
-        # Get parent outputs
-        parents_outputs = self.get_parent_outputs(workflow_node_id)
-
         return {
             "id": workflow_node.id,
             "name": node.name,
@@ -288,8 +342,44 @@ class WorkflowNodeService:
             "position_y": workflow_node.position_y,
             "inputs": inputs,
             "outputs": outputs,
-            "credentials": credentials,
+            "credentials": config_metadata.get("credentials"),
             "hasCredentials": hasCred,
             "linkable_fields": config_metadata.get("linkable_fields", []),
             "parents_outputs": parents_outputs
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def _has_credentials(credentials: dict, auth) -> bool:
+        """Whether the stored credential `auth` satisfies the node's credentials definition"""
+        if not auth:
+            return False
+
+        credentials_type = credentials.get("type")  # "oauth2" or "api_key"
+        cred = decrypt_credentials(auth.credentials)
+
+        # Handle OAuth credentials (with scope)
+        if credentials_type == "oauth2" or auth.auth_type == "oauth2":
+            metadata_scope = credentials.get("scopes", [])
+            scope = cred.get("scope")
+            if scope:
+                scope_list = set(scope.split())
+                metadata_set = set(metadata_scope)
+                if metadata_set.issubset(scope_list):
+                    return True
+        # Handle API key credentials (no scope, just check if api_key exists)
+        elif credentials_type == "api_key" or auth.auth_type == "api_key":
+            api_key = cred.get("api_key")
+            if api_key:
+                return True
+        # Fallback: if no type specified, check for scope (OAuth) or api_key
+        else:
+            if cred.get("scope"):
+                metadata_scope = credentials.get("scopes", [])
+                scope = cred.get("scope")
+                scope_list = set(scope.split())
+                metadata_set = set(metadata_scope)
+                if metadata_set.issubset(scope_list):
+                    return True
+            elif cred.get("api_key"):
+                return True
+        return False
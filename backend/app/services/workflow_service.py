@@ -2,6 +2,7 @@ from typing import List, Optional
 from services.redis_service import RedisService
 from repositories.sqlalchemy_workflow_node_repository import SqlAlchemyWorkflowNodeRepository
 from repositories.workflow_repository import WorkflowRepository
+from repositories.sqlalchemy_outbox_repository import SqlAlchemyOutboxRepository
 from models.schemas.workflow import Workflow
 from core.events import WORKFLOW_ACTIVATED, WORKFLOW_DEACTIVATED, WORKFLOW_DELETED
 
@@ -11,10 +12,13 @@ class WorkflowService:
         repository: WorkflowRepository,
         wn_repository: SqlAlchemyWorkflowNodeRepository,
         redis_service: RedisService,  # Redis dependency injected
+        outbox_repository: SqlAlchemyOutboxRepository,
     ):
         self.repository = repository
         self.wn_repository = wn_repository
         self.redis_service = redis_service
+        # Lifecycle events are committed with the change and relayed to Redis by OutboxRelay
+        self.outbox = outbox_repository
 
     def get_workflow(self, workflow_id: int) -> Optional[Workflow]:
         return self.repository.get_by_id(workflow_id)
@@ -28,7 +32,8 @@ class WorkflowService:
         return self.repository.list_all()
 
     def update_workflow_fields(self, workflow_id: int, update_fields: dict) -> Optional[Workflow]:
-        wf_db = self.repository.get_by_id(workflow_id)
+        # Locked until the commit, so activation events go out in commit order
+        wf_db = self.repository.get_for_update(workflow_id)
         if not wf_db:
             return None
 
@@ -41,8 +46,6 @@ class WorkflowService:
                 if field == "is_active" and value != old_is_active:
                     is_active_changed = True
 
-        self.repository.update(wf_db)
-
         if is_active_changed:
             nodes = self.wn_repository.list_by_workflow_and_type(workflow_id, "trigger")
             event_payload = {
@@ -58,17 +61,19 @@ class WorkflowService:
                 ],
             }
             event_type = WORKFLOW_ACTIVATED if wf_db.is_active else WORKFLOW_DEACTIVATED
-            self.redis_service.publish_event(event_type, event_payload)
+            self.outbox.add(event_type, event_payload)
+
+        # Commits the event together with the change
+        self.repository.update(wf_db)
 
         return wf_db
 
     def delete_workflow(self, workflow_id: int) -> bool:
-        wf = self.repository.get_by_id(workflow_id)
+        wf = self.repository.get_for_update(workflow_id)
         if not wf:
             return False
 
-        self.redis_service.publish_event(WORKFLOW_DELETED, {"workflow_id": workflow_id})
-
+        self.outbox.add(WORKFLOW_DELETED, {"workflow_id": workflow_id})
         self.repository.delete(workflow_id)
         return True
     
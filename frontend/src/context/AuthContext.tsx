@@ -95,6 +95,15 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
   };
 
   const logout = () => {
+    const storedToken = localStorage.getItem("token");
+    if (storedToken) {
+      // Revoke it server-side too; logging out locally doesn't wait for that
+      callApi("/auth/logout", "POST", undefined, {
+        headers: {
+          Authorization: `Bearer ${storedToken}`,
+        },
+      }).catch(() => {});
+    }
     localStorage.removeItem("token");
     setToken(null);
     setEmail(undefined);